@@ -0,0 +1,6 @@
+"""
+================================================================================
+🧰 FINANK - FERRAMENTAS DE DESENVOLVIMENTO
+================================================================================
+Scripts que NÃO fazem parte do app: servidor simulado, benchmarks etc.
+"""
@@ -0,0 +1,311 @@
+"""
+================================================================================
+⏱️ FINANK - BENCHMARK DAS PÁGINAS
+================================================================================
+Roda cada página do app "sem tela" (com o AppTest do próprio Streamlit) contra o
+servidor simulado (ferramentas/servidor_simulado.py) e mede:
+1. Tempo "a frio": todos os caches vazios (st.cache_data, cache_swr e o
+   histórico em disco). É o que o primeiro usuário do dia sente.
+2. Tempo "a quente": a mesma página de novo, com os caches cheios (mediana de
+   algumas repetições). É o que todo mundo sente depois.
+3. Pico de memória (tracemalloc) de uma renderização a frio.
+4. Quantas chamadas saíram para os "sites" em cada renderização.
+
+Os resultados são comparados com um arquivo de base (JSON). Se alguma página
+ficar mais lenta, mais pesada ou fizer mais chamadas que a base, o script avisa
+e termina com erro (código 1).
+
+Também há cenários "em escala": uma carteira.csv com 100 mil lançamentos e
+universos de 200 ativos nos scanners de ações e do comparador.
+
+Como usar:
+    python -m ferramentas.benchmark_paginas                  # compara com a base
+    python -m ferramentas.benchmark_paginas --salvar-base    # grava uma nova base
+    python -m ferramentas.benchmark_paginas --cenarios carteira carteira_100k
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PADRAO = os.path.join(RAIZ, "ferramentas", "benchmark_base.json")
+
+
+# Universo de N ativos inventados (o servidor simulado responde qualquer código)
+def _universo(n, sufixo="3.SA", prefixo="SIM"):
+    return [f"{prefixo}{i:03d}{sufixo}" for i in range(n)]
+
+
+# ==============================================================================
+# CENÁRIOS
+# ==============================================================================
+# pagina: arquivo a renderizar
+# entradas: {rótulo do campo de texto: valor} preenchidos depois da 1ª execução
+# carteira: (linhas, ativos) da carteira.csv gerada para o cenário
+# universos: {NOME_DA_LISTA: [...]} trocados no código da página antes de rodar
+# escala: cenário pesado (pulado com --sem-escala)
+CENARIOS = {
+    "home": {"pagina": "home.py"},
+    "carteira": {"pagina": "pages/carteira.py", "carteira": (60, 12)},
+    "comparador": {"pagina": "pages/comparador.py", "entradas": {"Lutador 1": "PETR4", "Lutador 2": "VALE3"}},
+    "ações": {"pagina": "pages/ações.py"},
+    "ações_detetive": {"pagina": "pages/ações.py", "entradas": {"Código do Ativo:": "PETR4"}},
+    "FIIS": {"pagina": "pages/FIIS.py", "entradas": {"Código do Fundo:": "MXRF11"}},
+    "cripto": {"pagina": "pages/cripto.py", "entradas": {"Criptomoeda:": "BTC"}},
+    "tesouro": {"pagina": "pages/tesouro.py"},
+    "simulador": {"pagina": "pages/simulador.py"},
+    "carteira_100k": {"pagina": "pages/carteira.py", "carteira": (100_000, 200), "escala": True},
+    "ações_200": {
+        "pagina": "pages/ações.py", "escala": True,
+        "universos": {"CESTA_ACOES_BR": _universo(200), "CESTA_ETFS": _universo(200, "11.SA", "SIME"),
+                      "CESTA_BDRS": _universo(200, "34.SA", "SIMB")},
+    },
+    "comparador_200": {
+        "pagina": "pages/comparador.py", "escala": True,
+        "universos": {"UNIV_ACOES": _universo(200), "UNIV_FIIS": _universo(200, "11.SA", "SIMF")},
+    },
+}
+
+# Acima disso (fração da base) é regressão...
+TOLERANCIA_PADRAO = 0.25
+# ...desde que a diferença também passe destes mínimos (evita alarme por ruído)
+FOLGA_SEGUNDOS = 0.05
+FOLGA_MB = 2.0
+
+
+# ==============================================================================
+# PREPARAÇÃO
+# ==============================================================================
+
+# O app lê as configurações na importação, então isso roda ANTES de importar o motor
+def _preparar_ambiente(pasta_trabalho, url_simulador):
+    os.environ["FINANK_SIMULADOR"] = url_simulador
+    os.environ["FINANK_DADOS"] = os.path.join(pasta_trabalho, "finank_dados")
+    os.environ["FINANK_TRADUCAO"] = "0"
+    os.environ.pop("FINANK_GRAVACAO", None)
+    if RAIZ not in sys.path: sys.path.insert(0, RAIZ)
+
+
+# Gera uma carteira.csv com 'linhas' lançamentos espalhados por 'n_ativos' ativos
+def gerar_carteira(caminho, linhas, n_ativos, semente=42):
+    sorteio = np.random.default_rng(semente)
+    tipos = np.array(["Ação", "FII", "Cripto", "Tesouro Direto", "Renda Fixa", "ETF", "BDR"])
+    tipo_por_ativo = tipos[np.arange(n_ativos) % len(tipos)]
+    nomes = {
+        "Ação": lambda i: f"SIM{i:03d}3", "FII": lambda i: f"SIMF{i:03d}11", "Cripto": lambda i: f"C{i:03d}",
+        "Tesouro Direto": lambda i: f"TESOURO IPCA+ {2029 + i % 30}", "Renda Fixa": lambda i: f"CDB BANCO {i:03d}",
+        "ETF": lambda i: f"SIME{i:03d}11", "BDR": lambda i: f"SIMB{i:03d}34",
+    }
+    ativos = np.array([nomes[t](i) for i, t in enumerate(tipo_por_ativo)])
+
+    qual = sorteio.integers(0, n_ativos, linhas)
+    datas = pd.Timestamp.today().normalize() - pd.to_timedelta(sorteio.integers(1, 5 * 365, linhas), unit="D")
+    tipo = tipo_por_ativo[qual]
+    renda_fixa = np.isin(tipo, ["Tesouro Direto", "Renda Fixa"])
+    df = pd.DataFrame({
+        "Data": datas.strftime("%Y-%m-%d"),
+        "Ativo": ativos[qual],
+        "Tipo": tipo,
+        # 1 em cada 10 lançamentos é venda (pequena, para a posição não zerar)
+        "Operacao": np.where(sorteio.random(linhas) < 0.1, "Venda", "Compra"),
+        "Quantidade": np.where(renda_fixa, 1.0, sorteio.integers(1, 100, linhas).astype(float)),
+        "Preco": np.round(np.where(renda_fixa, sorteio.uniform(500, 3000, linhas), sorteio.uniform(5, 300, linhas)), 2),
+        "Taxa": np.where(renda_fixa, np.round(sorteio.uniform(6, 14, linhas), 2), 0.0),
+    })
+    df.loc[df["Operacao"] == "Venda", "Quantidade"] = np.minimum(df["Quantidade"], 1.0)
+    df.sort_values("Data").to_csv(caminho, index=False)
+
+
+# Troca as listas de ativos no código da página (ex.: CESTA_ACOES_BR = [...200 ativos...])
+def _codigo_com_universos(caminho_pagina, universos):
+    with open(caminho_pagina, encoding="utf-8") as arquivo:
+        codigo = arquivo.read()
+    for nome, lista in universos.items():
+        codigo, trocas = re.subn(rf"^{nome} = \[.*?\]", f"{nome} = {lista!r}", codigo, count=1, flags=re.M | re.S)
+        if not trocas: raise ValueError(f"{nome} não encontrado em {caminho_pagina}")
+    return codigo
+
+
+# ==============================================================================
+# MEDIÇÃO
+# ==============================================================================
+
+# Esvazia todos os caches do app (memória e disco), menos a carteira.csv
+def _esvaziar_caches():
+    import streamlit as st
+    from motor.cache import limpar_cache_swr
+    from motor import carteiras, disjuntor, proventos, risco
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    limpar_cache_swr()
+    carteiras.limpar_memoria()
+    risco.limpar_memoria()
+    proventos.limpar_memoria()
+    disjuntor.limpar_memoria() # Um disjuntor aberto num cenário faria o próximo pular a internet
+    shutil.rmtree(os.environ["FINANK_DADOS"], ignore_errors=True)
+
+
+def _total_chamadas():
+    from ferramentas.servidor_simulado import Simulador
+    with Simulador.trava:
+        return sum(Simulador.contagem.values())
+
+
+# Uma renderização completa: roda a página, preenche os campos e roda de novo.
+# Devolve (segundos, chamadas externas, exceções mostradas na tela).
+def renderizar(cenario, timeout):
+    from streamlit.testing.v1 import AppTest
+    caminho = os.path.join(RAIZ, cenario["pagina"])
+    if cenario.get("universos"):
+        app = AppTest.from_string(_codigo_com_universos(caminho, cenario["universos"]), default_timeout=timeout)
+    else:
+        app = AppTest.from_file(caminho, default_timeout=timeout)
+
+    chamadas_antes = _total_chamadas()
+    inicio = time.perf_counter()
+    app.run()
+    if cenario.get("entradas"):
+        for rotulo, valor in cenario["entradas"].items():
+            campo = next(w for w in app.text_input if w.label == rotulo)
+            campo.set_value(valor)
+        app.run()
+    segundos = time.perf_counter() - inicio
+    return segundos, _total_chamadas() - chamadas_antes, [e.message for e in app.exception]
+
+
+def medir(nome, cenario, pasta_trabalho, repeticoes, timeout):
+    pasta = os.path.join(pasta_trabalho, nome)
+    os.makedirs(pasta, exist_ok=True)
+    os.chdir(pasta) # A carteira.csv é lida da pasta atual
+    if cenario.get("carteira"):
+        gerar_carteira(os.path.join(pasta, "carteira.csv"), *cenario["carteira"])
+
+    _esvaziar_caches()
+    frio, chamadas_frio, erros = renderizar(cenario, timeout)
+
+    quentes, chamadas_quente = [], 0
+    for _ in range(repeticoes):
+        segundos, chamadas_quente, _ = renderizar(cenario, timeout)
+        quentes.append(segundos)
+
+    # Memória numa passada separada: o tracemalloc deixa tudo mais lento
+    _esvaziar_caches()
+    tracemalloc.start()
+    renderizar(cenario, timeout)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "frio_s": round(frio, 3),
+        "quente_s": round(statistics.median(quentes), 3),
+        "pico_memoria_mb": round(pico / 2**20, 1),
+        "chamadas_frio": chamadas_frio,
+        "chamadas_quente": chamadas_quente,
+        "excecoes": erros,
+    }
+
+
+# ==============================================================================
+# COMPARAÇÃO COM A BASE
+# ==============================================================================
+
+def comparar(resultados, base, tolerancia):
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = base.get(nome)
+        if not anterior: continue
+        for metrica, folga in (("frio_s", FOLGA_SEGUNDOS), ("quente_s", FOLGA_SEGUNDOS), ("pico_memoria_mb", FOLGA_MB)):
+            novo, velho = atual[metrica], anterior.get(metrica)
+            if velho is not None and novo > velho * (1 + tolerancia) and novo - velho > folga:
+                regressoes.append(f"{nome}: {metrica} {velho} -> {novo}")
+        for metrica in ("chamadas_frio", "chamadas_quente"):
+            if anterior.get(metrica) is not None and atual[metrica] > anterior[metrica]:
+                regressoes.append(f"{nome}: {metrica} {anterior[metrica]} -> {atual[metrica]}")
+        if atual["excecoes"] and not anterior.get("excecoes"):
+            regressoes.append(f"{nome}: a página passou a mostrar exceções ({atual['excecoes'][0][:80]})")
+    return regressoes
+
+
+def _imprimir(resultados):
+    print(f"{'cenário':<16}{'frio (s)':>10}{'quente (s)':>12}{'pico (MB)':>11}{'chamadas frio/quente':>23}")
+    for nome, r in resultados.items():
+        alerta = "  ⚠️ exceção na página" if r["excecoes"] else ""
+        print(f"{nome:<16}{r['frio_s']:>10.3f}{r['quente_s']:>12.3f}{r['pico_memoria_mb']:>11.1f}"
+              f"{r['chamadas_frio']:>14}/{r['chamadas_quente']:<8}{alerta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das páginas do Finank")
+    parser.add_argument("--cenarios", nargs="*", help=f"quais rodar (padrão: todos). Opções: {', '.join(CENARIOS)}")
+    parser.add_argument("--sem-escala", action="store_true", help="pula os cenários pesados (100k lançamentos, 200 ativos)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="renderizações a quente (vale a mediana)")
+    parser.add_argument("--latencia", type=float, default=30, help="latência do servidor simulado em ms")
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de uma renderização (s)")
+    parser.add_argument("--base", default=BASE_PADRAO, help="arquivo JSON de base")
+    parser.add_argument("--salvar-base", action="store_true", help="grava os resultados como nova base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    args = parser.parse_args()
+
+    escolhidos = args.cenarios or [n for n, c in CENARIOS.items() if not (args.sem_escala and c.get("escala"))]
+    desconhecidos = set(escolhidos) - set(CENARIOS)
+    if desconhecidos: parser.error(f"cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    pasta_trabalho = tempfile.mkdtemp(prefix="finank-bench-")
+    pasta_original = os.getcwd()
+    if RAIZ not in sys.path: sys.path.insert(0, RAIZ)
+    from ferramentas.servidor_simulado import iniciar
+    servidor = iniciar(porta=0, latencia=args.latencia, variacao=args.latencia / 5, em_segundo_plano=True)
+    _preparar_ambiente(pasta_trabalho, f"http://127.0.0.1:{servidor.server_address[1]}")
+
+    # Importa as bibliotecas pesadas antes: o 1º cenário não deve pagar por elas
+    import plotly.express, plotly.graph_objects, bs4, streamlit.testing.v1  # noqa: F401
+
+    resultados = {}
+    try:
+        for nome in escolhidos:
+            print(f"⏱️  {nome}...", flush=True)
+            resultados[nome] = medir(nome, CENARIOS[nome], pasta_trabalho, args.repeticoes, args.timeout)
+    finally:
+        os.chdir(pasta_original)
+        servidor.shutdown()
+        shutil.rmtree(pasta_trabalho, ignore_errors=True)
+
+    print()
+    _imprimir(resultados)
+
+    if args.salvar_base:
+        base = {}
+        if os.path.exists(args.base):
+            with open(args.base, encoding="utf-8") as arquivo: base = json.load(arquivo)
+        base.update(resultados)
+        with open(args.base, "w", encoding="utf-8") as arquivo:
+            json.dump(base, arquivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Base salva em {args.base}")
+        return 0
+
+    if not os.path.exists(args.base):
+        print("\nSem arquivo de base para comparar (use --salvar-base).")
+        return 0
+    with open(args.base, encoding="utf-8") as arquivo:
+        regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+    if regressoes:
+        print("\n🔴 Regressões em relação à base:")
+        for r in regressoes: print(f"  - {r}")
+        return 1
+    print("\n🟢 Nenhuma regressão em relação à base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+================================================================================
+⏱️ FINANK - BENCHMARK DO CÁLCULO DE POSIÇÃO
+================================================================================
+Mede quanto tempo leva para transformar o livro de lançamentos em posições
+("Comprei 10, Vendi 2" -> "Tenho 8") com carteiras grandes:
+1. calcular_posicao_atual (pandas, usado pelo armazenamento CSV).
+2. ArmazenamentoSQLite.posicoes (lê a tabela de posições, mantida a cada lançamento).
+3. ArmazenamentoSQLite.reconstruir_posicoes (refaz a tabela somando tudo no banco).
+
+Como usar:
+    python -m ferramentas.benchmark_posicao                      # 10 mil, 100 mil e 1 milhão de linhas
+    python -m ferramentas.benchmark_posicao --linhas 1000000 --ativos 500
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Melhor tempo (e o resultado) de algumas execuções
+def _cronometrar(funcao, repeticoes):
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cálculo de posição da carteira")
+    parser.add_argument("--linhas", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--ativos", type=int, default=500)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="finank-posicao-")
+    os.environ["FINANK_DADOS"] = pasta
+    if RAIZ not in sys.path: sys.path.insert(0, RAIZ)
+    from ferramentas.benchmark_paginas import gerar_carteira
+    from motor.armazenamento import ArmazenamentoSQLite, calcular_posicao_atual
+
+    print(f"{'linhas':>10}{'pandas (s)':>14}{'sqlite (s)':>14}{'recalcular (s)':>16}{'posições':>10}")
+    try:
+        for linhas in args.linhas:
+            caminho_csv = os.path.join(pasta, f"carteira_{linhas}.csv")
+            gerar_carteira(caminho_csv, linhas, args.ativos)
+            df = pd.read_csv(caminho_csv)
+            banco = ArmazenamentoSQLite(f"carteira_{linhas}.db", importar_de=caminho_csv)
+
+            melhor_pd, resumo = _cronometrar(lambda: calcular_posicao_atual(df), args.repeticoes)
+            melhor_sql, _ = _cronometrar(banco.posicoes, args.repeticoes)
+            melhor_rec, _ = _cronometrar(banco.reconstruir_posicoes, args.repeticoes)
+            print(f"{linhas:>10}{melhor_pd:>14.3f}{melhor_sql:>14.3f}{melhor_rec:>16.3f}{len(resumo):>10}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+================================================================================
+🧪 FINANK - SERVIDOR SIMULADO (YAHOO, TESOURO, COINGECKO, GOOGLE NEWS, BCB)
+================================================================================
+Para testar o Finank com centenas de sessões ao mesmo tempo, não dá para usar
+os sites de verdade: o Yahoo e a CoinGecko bloqueiam a gente rapidinho.
+
+Este servidor local responde com os MESMOS formatos que o app lê:
+1. Tesouro Direto: `TrsrBdTradgList` (preços e taxas dos títulos).
+2. CoinGecko: `simple/price` (preço e variação 24h).
+3. alternative.me: índice de Medo e Ganância.
+4. Google News: RSS com os `item` das notícias.
+5. Yahoo: endpoints `chart` (histórico, dividendos, desdobramentos) e `quote`.
+6. Banco Central (SGS): séries do CDI, da Selic (por dia útil) e do IPCA (por mês).
+
+Os preços são inventados, mas estáveis: o mesmo ativo sempre gera a mesma
+série (a "semente" do sorteio é o próprio código do ativo).
+
+Como usar:
+    python ferramentas/servidor_simulado.py --porta 8765 --latencia 150 --taxa-erro 0.02
+    FINANK_SIMULADOR=http://127.0.0.1:8765 streamlit run home.py
+
+A latência (em milissegundos, com variação aleatória) e a taxa de erro (fração
+de respostas 503) servem para ver como o app se comporta com a internet ruim.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+# Títulos do Tesouro oferecidos: (nome, ano de vencimento, taxa anual %)
+TITULOS_TESOURO = [
+    ("Tesouro Selic 2027", 2027, 0.0512),
+    ("Tesouro Selic 2029", 2029, 0.0958),
+    ("Tesouro Prefixado 2027", 2027, 13.42),
+    ("Tesouro Prefixado 2031", 2031, 13.61),
+    ("Tesouro Prefixado com Juros Semestrais 2035", 2035, 13.70),
+    ("Tesouro IPCA+ 2029", 2029, 7.41),
+    ("Tesouro IPCA+ 2035", 2035, 7.18),
+    ("Tesouro IPCA+ 2045", 2045, 6.95),
+    ("Tesouro IPCA+ com Juros Semestrais 2040", 2040, 7.02),
+    ("Tesouro Renda+ Aposentadoria Extra 2065", 2065, 6.98),
+    ("Tesouro Educa+ 2031", 2031, 7.25),
+]
+
+# Preço de referência das criptos (USD) e cotação do dólar usada na conversão
+CRIPTOS = {"bitcoin": 67000.0, "ethereum": 3400.0, "solana": 150.0, "cardano": 0.45, "ripple": 0.52}
+DOLAR = 5.40
+
+# Tradução do "range" do Yahoo para dias corridos
+DIAS_POR_RANGE = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 366,
+                  "2y": 731, "5y": 1827, "10y": 3653, "ytd": 366, "max": 3653}
+
+
+# ==============================================================================
+# GERADORES DE DADOS
+# ==============================================================================
+
+# Sorteio com semente fixa por texto (mesmo ativo = mesmos números)
+def _sorteio(texto):
+    return random.Random(zlib.crc32(texto.encode("utf-8")))
+
+
+# Dias úteis (segunda a sexta) entre duas datas
+def _dias_uteis(inicio, fim):
+    dias, d = [], inicio
+    while d <= fim:
+        if d.weekday() < 5: dias.append(d)
+        d += timedelta(days=1)
+    return dias
+
+
+# Série de preços: passeio aleatório que começa 10 anos atrás e termina hoje.
+# A série inteira é gerada sempre, então qualquer recorte dela é consistente.
+def _serie(ticker):
+    sorteio = _sorteio(ticker)
+    hoje = date.today()
+    dias = _dias_uteis(hoje - timedelta(days=3653), hoje)
+    preco = sorteio.uniform(5, 300)
+    fii = ticker.upper().endswith("11.SA")
+    barras, dividendos, desdobramentos = [], {}, {}
+    for i, d in enumerate(dias):
+        abertura = preco
+        preco = max(0.5, preco * (1 + sorteio.gauss(0.0003, 0.018)))
+        alta = max(abertura, preco) * (1 + abs(sorteio.gauss(0, 0.006)))
+        baixa = min(abertura, preco) * (1 - abs(sorteio.gauss(0, 0.006)))
+        barras.append((d, abertura, alta, baixa, preco, int(sorteio.uniform(1e5, 5e6))))
+        # FIIs pagam todo mês; ações, de vez em quando
+        if (fii and d.day <= 7 and d.weekday() == 0) or (not fii and i % 63 == 40):
+            dividendos[d] = round(preco * (0.008 if fii else 0.015), 4)
+        if i == len(dias) // 2 and sorteio.random() < 0.2:
+            desdobramentos[d] = 2
+    return barras, dividendos, desdobramentos
+
+
+def _timestamp(d):
+    return int(datetime(d.year, d.month, d.day, 13, tzinfo=timezone.utc).timestamp())
+
+
+def resposta_grafico(ticker, consulta):
+    barras, dividendos, desdobramentos = _serie(ticker)
+    faixa = consulta.get("range", "1mo")
+    if "period1" in consulta:
+        inicio = datetime.fromtimestamp(int(consulta["period1"]), tz=timezone.utc).date()
+        barras = [b for b in barras if b[0] >= inicio]
+    elif faixa in ("1d", "2d", "5d"):
+        barras = barras[-int(faixa[0]):] # Faixas em dias contam pregões, não dias corridos
+    else:
+        inicio = date(date.today().year, 1, 1) if faixa == "ytd" else date.today() - timedelta(days=DIAS_POR_RANGE.get(faixa, 31))
+        barras = [b for b in barras if b[0] >= inicio]
+
+    # "Adj Close": cada dividendo desconta as barras ANTERIORES à data com
+    ajuste, fator = {}, 1.0
+    for b in reversed(barras):
+        ajuste[b[0]] = fator
+        if b[0] in dividendos: fator *= 1 - dividendos[b[0]] / b[4]
+    ajustados = [round(b[4] * ajuste[b[0]], 4) for b in barras]
+
+    datas = {b[0] for b in barras}
+    return {"chart": {"result": [{
+        "meta": {"symbol": ticker, "currency": "BRL" if ticker.upper().endswith(".SA") else "USD",
+                 "regularMarketPrice": barras[-1][4] if barras else None},
+        "timestamp": [_timestamp(b[0]) for b in barras],
+        "indicators": {
+            "quote": [{"open": [round(b[1], 4) for b in barras], "high": [round(b[2], 4) for b in barras],
+                       "low": [round(b[3], 4) for b in barras], "close": [round(b[4], 4) for b in barras],
+                       "volume": [b[5] for b in barras]}],
+            "adjclose": [{"adjclose": ajustados}],
+        },
+        "events": {
+            "dividends": {str(_timestamp(d)): {"amount": v, "date": _timestamp(d)}
+                          for d, v in dividendos.items() if d in datas},
+            "splits": {str(_timestamp(d)): {"date": _timestamp(d), "numerator": v, "denominator": 1,
+                                             "splitRatio": f"{v}:1"}
+                       for d, v in desdobramentos.items() if d in datas},
+        },
+    }], "error": None}}
+
+
+def resposta_cotacao(consulta):
+    resultados = []
+    for ticker in consulta.get("symbols", "").split(","):
+        if not ticker: continue
+        sorteio = _sorteio("info" + ticker)
+        barras, _, _ = _serie(ticker)
+        preco = barras[-1][4]
+        resultados.append({
+            "symbol": ticker, "shortName": ticker.split(".")[0], "longName": f"{ticker.split('.')[0]} Simulada S.A.",
+            "name": ticker.split("-")[0], "currency": "BRL" if ticker.upper().endswith(".SA") else "USD",
+            "currentPrice": preco, "regularMarketPrice": preco,
+            "previousClose": barras[-2][4], "marketCap": int(preco * sorteio.uniform(1e8, 5e9)),
+            "trailingPE": round(sorteio.uniform(4, 40), 2), "priceToBook": round(sorteio.uniform(0.5, 4), 2),
+            "dividendYield": round(sorteio.uniform(0, 0.12), 4), "returnOnEquity": round(sorteio.uniform(0, 0.3), 4),
+            "sector": sorteio.choice(["Financeiro", "Energia", "Consumo", "Imobiliário", "Tecnologia"]),
+            "longBusinessSummary": f"Empresa fictícia gerada pelo servidor simulado para o ativo {ticker}.",
+            "fiftyTwoWeekHigh": max(b[2] for b in barras[-252:]), "fiftyTwoWeekLow": min(b[3] for b in barras[-252:]),
+        })
+    return {"quoteResponse": {"result": resultados, "error": None}}
+
+
+def resposta_tesouro():
+    lista = []
+    for nome, ano, taxa in TITULOS_TESOURO:
+        sorteio = _sorteio(nome + date.today().isoformat())
+        preco = round(sorteio.uniform(800, 16000), 2)
+        lista.append({"TrsrBd": {
+            "nm": nome, "anulInvstmtRate": taxa, "anulRedRate": round(taxa + 0.12, 2),
+            "minInvstmtAmt": round(preco * 0.01, 2), "mtrtyDt": f"{ano}-01-01T00:00:00",
+            "untrInvstmtVal": preco, "untrRedVal": round(preco * 0.997, 2),
+        }})
+    return {"responseStatus": 200, "response": {"TrsrBdTradgList": lista}}
+
+
+# Séries do SGS: CDI (12) e Selic (11) em % ao dia, IPCA (433) em % ao mês
+def resposta_bcb(codigo, consulta):
+    inicio = datetime.strptime(consulta.get("dataInicial", "01/01/2015"), "%d/%m/%Y").date()
+    fim = min(date.today(), datetime.strptime(consulta.get("dataFinal", date.today().strftime("%d/%m/%Y")), "%d/%m/%Y").date())
+    if codigo == 433:
+        meses, d = [], inicio.replace(day=1)
+        while d <= fim:
+            if d >= inicio: meses.append(d)
+            d = (d + timedelta(days=32)).replace(day=1)
+        valores = [(d, _sorteio(f"ipca{d.isoformat()}").uniform(0.1, 0.6)) for d in meses]
+    else:
+        base = 0.040 if codigo == 12 else 0.0402
+        valores = [(d, base + _sorteio(f"{codigo}{d.isoformat()}").uniform(-0.004, 0.004)) for d in _dias_uteis(inicio, fim)]
+    return [{"data": d.strftime("%d/%m/%Y"), "valor": f"{v:.6f}"} for d, v in valores]
+
+
+def resposta_coingecko(consulta):
+    moedas = consulta.get("vs_currencies", "usd").split(",")
+    resposta = {}
+    for id_moeda in consulta.get("ids", "").split(","):
+        if id_moeda not in CRIPTOS: continue
+        sorteio = _sorteio(id_moeda + datetime.now().strftime("%Y%m%d%H%M"))
+        preco_usd = CRIPTOS[id_moeda] * (1 + sorteio.gauss(0, 0.01))
+        variacao = round(sorteio.gauss(0, 3), 2)
+        resposta[id_moeda] = {}
+        for m in moedas:
+            resposta[id_moeda][m] = round(preco_usd * (DOLAR if m == "brl" else 1), 2)
+            resposta[id_moeda][f"{m}_24h_change"] = variacao
+    return resposta
+
+
+def resposta_medo_ganancia():
+    valor = _sorteio(date.today().isoformat()).randint(0, 100)
+    faixas = [(25, "Extreme Fear"), (45, "Fear"), (55, "Neutral"), (75, "Greed"), (101, "Extreme Greed")]
+    classificacao = next(nome for limite, nome in faixas if valor < limite)
+    return {"name": "Fear and Greed Index", "data": [{"value": str(valor), "value_classification": classificacao}]}
+
+
+def resposta_noticias(consulta):
+    termo = consulta.get("q", "mercado")
+    sorteio = _sorteio(termo)
+    verbos = ["dispara", "cai", "sobe", "recua", "avança", "despenca", "lucra", "renova máxima"]
+    fontes = ["Valor Econômico", "InfoMoney", "Exame", "Folha", "Estadão", "G1"]
+    itens = []
+    for i in range(10):
+        fonte = sorteio.choice(fontes)
+        titulo = f"{termo.title()} {sorteio.choice(verbos)} no pregão ({i + 1}) - {fonte}"
+        itens.append(
+            f"<item><title>{escape(titulo)}</title><link>https://example.com/noticia/{i}</link>"
+            f"<source url=\"https://example.com\">{escape(fonte)}</source></item>"
+        )
+    return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel>"
+            f"<title>{escape(termo)}</title>{''.join(itens)}</channel></rss>")
+
+
+# ==============================================================================
+# SERVIDOR HTTP
+# ==============================================================================
+
+class Simulador(BaseHTTPRequestHandler):
+    # Configurado em iniciar()
+    latencia = 0.0
+    variacao = 0.0
+    taxa_erro = 0.0
+    contagem = {}
+    trava = threading.Lock()
+    silencioso = True
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        caminho = partes.path
+        consulta = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+
+        # Latência "de internet" (com variação) e erros aleatórios
+        espera = max(0.0, random.gauss(self.latencia, self.variacao))
+        if espera: time.sleep(espera)
+        with self.trava:
+            Simulador.contagem[caminho.split("/")[1]] = Simulador.contagem.get(caminho.split("/")[1], 0) + 1
+        if random.random() < self.taxa_erro:
+            return self._responder(503, {"erro": "falha simulada"})
+
+        if "/v8/finance/chart/" in caminho:
+            return self._responder(200, resposta_grafico(caminho.rsplit("/", 1)[-1], consulta))
+        if caminho.endswith("/v7/finance/quote"):
+            return self._responder(200, resposta_cotacao(consulta))
+        if caminho.endswith("treasurybondsinfo.json") or caminho.endswith("precos-taxas.json"):
+            return self._responder(200, resposta_tesouro())
+        if "/dados/serie/bcdata.sgs." in caminho:
+            return self._responder(200, resposta_bcb(int(caminho.split("bcdata.sgs.")[1].split("/")[0]), consulta))
+        if caminho.endswith("/simple/price"):
+            return self._responder(200, resposta_coingecko(consulta))
+        if caminho.rstrip("/").endswith("/fng"):
+            return self._responder(200, resposta_medo_ganancia())
+        if caminho.endswith("/rss/search"):
+            return self._responder(200, resposta_noticias(consulta), "application/rss+xml; charset=utf-8")
+        if caminho == "/status":
+            return self._responder(200, {"chamadas": dict(Simulador.contagem)})
+        return self._responder(404, {"erro": f"caminho desconhecido: {caminho}"})
+
+    def _responder(self, status, corpo, tipo="application/json"):
+        conteudo = (corpo if isinstance(corpo, str) else json.dumps(corpo)).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def log_message(self, formato, *args):
+        if not self.silencioso: super().log_message(formato, *args)
+
+
+# Sobe o servidor (em segundo plano, se 'em_segundo_plano') e devolve o objeto dele.
+# Latência e variação em milissegundos; taxa_erro entre 0 e 1.
+def iniciar(porta=8765, latencia=0, variacao=0, taxa_erro=0.0, silencioso=True, em_segundo_plano=False):
+    Simulador.latencia = latencia / 1000
+    Simulador.variacao = variacao / 1000
+    Simulador.taxa_erro = taxa_erro
+    Simulador.silencioso = silencioso
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), Simulador)
+    servidor.daemon_threads = True
+    if em_segundo_plano:
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    else:
+        print(f"Servidor simulado em http://127.0.0.1:{servidor.server_address[1]} (Ctrl+C para sair)")
+        try: servidor.serve_forever()
+        except KeyboardInterrupt: pass
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor simulado das fontes de dados do Finank")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0, help="latência média em ms")
+    parser.add_argument("--variacao", type=float, default=0, help="desvio da latência em ms")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 503 (0 a 1)")
+    parser.add_argument("--verboso", action="store_true", help="mostra cada requisição")
+    args = parser.parse_args()
+    iniciar(args.porta, args.latencia, args.variacao, args.taxa_erro, silencioso=not args.verboso)
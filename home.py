@@ -14,11 +14,13 @@ TECNOLOGIAS USADAS AQUI:
 """
 
 import streamlit as st
-import yfinance as yf
-import requests
 from bs4 import BeautifulSoup
 import urllib.parse
 import pandas as pd
+from motor.mercado import baixar_precos, resumo_variacao, descrever_erros
+from motor.cache import cache_swr
+from motor import cliente_http
+from motor.disjuntor import estados_disjuntores
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO DA PÁGINA E CSS (A MAQUIAGEM)
@@ -83,35 +85,22 @@ st.markdown("""
 # ==============================================================================
 
 # Função 1: Buscar Dados do Mercado (Cotações)
-# Eu uso @st.cache_data(ttl=300) para o sistema não ficar lento.
+# Eu uso @cache_swr(ttl=300) para o sistema não ficar lento.
 # Ele baixa os dados e guarda na memória por 300 segundos (5 minutos).
-@st.cache_data(ttl=300)
+# Depois disso, quem chega recebe a cotação anterior NA HORA enquanto a nova é
+# buscada por trás (até 1 hora; depois disso a busca volta a ser na frente).
+# O download é feito em LOTE pelo provedor compartilhado (motor/mercado.py):
+# uma única chamada ao Yahoo para os 6 códigos, em vez de uma por código.
+@cache_swr(ttl=300, ttl_maximo=3600, valido=lambda r: bool(r[0]))
 def buscar_dados_mercado():
     # Lista de códigos que o Yahoo Finance entende:
     # ^BVSP = Ibovespa (Brasil)
     # ^GSPC = S&P 500 (EUA)
     # USDBRL=X = Dólar para Real
     tickers = ['^BVSP', '^GSPC', 'USDBRL=X', 'EURBRL=X', 'CNYBRL=X', 'BTC-USD']
-    dados = {}
-    try:
-        # Baixa tudo de uma vez para ser rápido
-        yf_tickers = yf.Tickers(" ".join(tickers))
-        for t in tickers:
-            # Pego os últimos 2 dias para comparar Hoje vs Ontem e saber se subiu ou caiu
-            hist = yf_tickers.tickers[t].history(period="2d")
-            
-            if len(hist) >= 2:
-                fech_ontem = hist['Close'].iloc[-2]
-                preco_atual = hist['Close'].iloc[-1]
-                # Fórmula da variação: ((Hoje - Ontem) / Ontem) * 100
-                var = ((preco_atual - fech_ontem) / fech_ontem) * 100
-                dados[t] = {'preco': preco_atual, 'var': var}
-            elif len(hist) == 1:
-                # Se só tiver dados de hoje (feriado?), variação é zero
-                preco_atual = hist['Close'].iloc[-1]
-                dados[t] = {'preco': preco_atual, 'var': 0.0}
-    except: pass
-    return dados
+    # Pego os últimos 2 dias para comparar Hoje vs Ontem e saber se subiu ou caiu
+    painel, erros = baixar_precos(tickers, periodo="2d")
+    return resumo_variacao(painel), erros
 
 # Função 2: Analisar Sentimento (O "Psicólogo" do Robô)
 # O computador lê o título da notícia e tenta adivinhar se é Boa ou Ruim.
@@ -136,7 +125,7 @@ def analisar_sentimento(texto):
 
 # Função 3: Buscar Notícias (Web Scraping)
 # Eu vou lá no Google News e pego as manchetes mais recentes sobre o tópico.
-@st.cache_data(ttl=600) # Atualiza a cada 10 min
+@cache_swr(ttl=600, ttl_maximo=6*3600, valido=bool) # Atualiza a cada 10 min (sem travar a tela)
 def buscar_noticias_topico(topico):
     termo_codificado = urllib.parse.quote(topico)
     # URL mágica do Google News em RSS (formato fácil de ler por robôs)
@@ -144,7 +133,7 @@ def buscar_noticias_topico(topico):
     headers = {'User-Agent': 'Mozilla/5.0'} # Finge que sou um navegador comum
     noticias = []
     try:
-        response = requests.get(url, headers=headers)
+        response = cliente_http.get("google_news", url, headers=headers)
         soup = BeautifulSoup(response.content, features='xml') # O BS4 organiza a bagunça do HTML
         items = soup.find_all('item')[:6] # Pega só as 6 primeiras
         
@@ -183,7 +172,7 @@ st.markdown("---")
 # Aqui eu busco os dados e distribuo em 5 colunas lado a lado
 with st.container():
     st.subheader("🌍 Cotações do Dia")
-    mercado = buscar_dados_mercado()
+    mercado, erros_mercado = buscar_dados_mercado()
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -217,6 +206,9 @@ with st.container():
     var_btc = f"{btc['var']:.2f}%" if btc else "--"
     col5.metric("🪙 Bitcoin", val_btc, var_btc)
 
+    # Se algum código falhou, eu aviso qual foi (em vez de só mostrar "--")
+    if erros_mercado: st.caption(f"⚠️ Sem cotação para: {descrever_erros(erros_mercado)}")
+
 st.markdown("---")
 
 # --- BLOCO 2: CONVERSOR RÁPIDO ---
@@ -320,3 +312,13 @@ with tab_geral: renderizar_noticias("Mercado financeiro economia brasil hoje")
 with tab_acoes: renderizar_noticias("Ações bolsa de valores empresas brasil")
 with tab_cripto: renderizar_noticias("Mercado criptomoedas bitcoin hoje")
 with tab_fiis: renderizar_noticias("Fundos imobiliários IFIX notícias")
+
+# --- STATUS DAS FONTES DE DADOS ---
+# Mostra os disjuntores de cada provedor (quem está fora do ar e quando tento de novo)
+estados = estados_disjuntores()
+if estados:
+    with st.expander("🔌 Status das fontes de dados"):
+        for provedor, s in sorted(estados.items()):
+            icone = {"fechado": "🟢", "meio-aberto": "🟡"}.get(s['estado'], "🔴")
+            detalhe = f" — nova tentativa em {s['segundos_restantes']}s" if s['estado'] == "aberto" else ""
+            st.caption(f"{icone} {provedor}: {s['estado']}{detalhe}")
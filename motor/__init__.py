@@ -0,0 +1,8 @@
+"""
+================================================================================
+⚙️ FINANK - MOTOR (CÓDIGO COMPARTILHADO ENTRE AS PÁGINAS)
+================================================================================
+Aqui ficam as peças que várias páginas usam ao mesmo tempo.
+Em vez de cada página ter a sua própria versão de "baixar cotação", todas
+importam daqui, e o sistema inteiro fica mais rápido e mais fácil de manter.
+"""
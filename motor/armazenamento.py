@@ -0,0 +1,499 @@
+"""
+================================================================================
+🗃️ FINANK - ARMAZENAMENTO DA CARTEIRA
+================================================================================
+A página da Carteira não precisa saber ONDE os lançamentos ficam guardados.
+Ela só conversa com um "armazenamento", que sabe fazer sempre as mesmas coisas:
+
+- contar()        -> quantos lançamentos existem
+- carregar()      -> todos os lançamentos (Data, Ativo, Tipo, Operacao, ...)
+- registrar(l)    -> guarda um lançamento novo
+- posicoes()      -> o que eu tenho HOJE por (Tipo, Ativo): quantidade, custo
+                     (pelo preço médio), taxa média (ponderada pelo valor das
+                     compras), data da 1ª compra, preço médio e lucro realizado
+- custos(metodo)  -> o mesmo para TODOS os ativos (inclusive os que já vendi),
+                     pelo preço médio ou por PEPS (motor/custo.py)
+- reconstruir_posicoes() -> refaz as posições do zero a partir dos lançamentos
+- versao()        -> muda sempre que o livro muda (chave barata para cache)
+- extrato(...)    -> lançamentos filtrados por tipo/ativo/período, mais novos primeiro
+- apagar()        -> zera tudo (botão "Resetar Tudo")
+- importar(...)   -> um arquivo inteiro (CSV, Excel, Parquet, extrato da B3)
+                     de uma vez, pulando o que já está no livro (motor/importacao.py)
+- importar_csv / exportar_csv -> o CSV vira só formato de entrada e saída
+
+Existem duas versões:
+1. SQLite (padrão): o banco faz as contas. Os filtros do extrato rodam DENTRO
+   do banco, usando índices em (Tipo, Ativo) e em Data, e o app nunca precisa
+   carregar a carteira inteira na memória. As posições ficam numa tabela
+   própria, atualizada a cada lançamento (só a linha do ativo lançado muda),
+   então abrir a carteira não precisa somar o livro inteiro de novo. Um
+   lançamento com data no passado refaz só o ativo dele, em ordem.
+   Uma tabela de "impressões digitais" (hash de cada lançamento) diz na hora
+   se uma linha importada já está no livro, sem reler o livro.
+2. CSV (FINANK_ARMAZENAMENTO=csv): o jeito antigo, carteira.csv + diário
+   (motor/diario.py), com as contas feitas no pandas.
+
+Na primeira vez que o SQLite é aberto, uma carteira.csv antiga é importada
+automaticamente (uma vez só).
+"""
+
+import io
+import os
+from abc import ABC, abstractmethod
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from motor import custo, diario, importacao
+from motor.banco import conectar
+from motor.config import ARMAZENAMENTO_CARTEIRA, caminho_dados
+
+COLUNAS = diario.COLUNAS
+
+ARQUIVO_SQLITE = "carteira.db"
+
+
+# Função Principal: Abre o armazenamento configurado
+# 'arquivo_csv' é a carteira.csv de sempre (base do modo CSV e origem da importação automática)
+# 'arquivo_sqlite' é o banco (cada carteira de motor/carteiras.py tem o seu)
+def abrir_carteira(arquivo_csv="carteira.csv", arquivo_sqlite=ARQUIVO_SQLITE):
+    if ARMAZENAMENTO_CARTEIRA == "csv": return ArmazenamentoCSV(arquivo_csv)
+    return ArmazenamentoSQLite(arquivo_sqlite, importar_de=arquivo_csv)
+
+
+# Calcular a Posição Atual no pandas (a versão CSV usa; o SQLite guarda o resultado numa tabela)
+# Transforma o histórico "Comprei 10, Vendi 2" em "Tenho 8", pelo custo médio
+# (o mesmo resultado de motor/custo.py com metodo="medio").
+# Tudo em colunas inteiras de uma vez (nada de .apply linha a linha):
+# com 1 milhão de lançamentos isso é a diferença entre minutos e décimos de segundo.
+def calcular_posicao_atual(df):
+    if df.empty: return pd.DataFrame()
+
+    # Se for VENDA, a quantidade vira negativa (máscara do numpy, sem laço)
+    venda = df['Operacao'].to_numpy() == 'Venda'
+    qtd = df['Quantidade'].to_numpy(dtype=float) * np.where(venda, -1.0, 1.0)
+    preco = df['Preco'].to_numpy(dtype=float)
+
+    # Taxa média ponderada pelo valor de cada COMPRA (R$ 10 mil a 12% pesam mais que R$ 100 a 8%)
+    peso = np.where(venda, 0.0, np.abs(qtd * preco))
+    taxa = np.nan_to_num(df['Taxa'].to_numpy(dtype=float))
+
+    # Datas repetem muito: converto só as datas DIFERENTES e espalho pelo resto
+    datas = df['Data'].astype('category')
+    datas_convertidas = pd.to_datetime(datas.cat.categories.astype(str)).to_numpy()
+    data = np.where(datas.cat.codes.to_numpy() >= 0, datas_convertidas[datas.cat.codes.to_numpy()], np.datetime64('NaT'))
+
+    carteira = pd.DataFrame({
+        # Categorias: o agrupamento compara números em vez de textos
+        'Tipo': df['Tipo'].astype('category'),
+        'Ativo': df['Ativo'].astype('category'),
+        'Data_Inicial': data,             # Data da primeira compra
+    })
+    grupos = carteira.groupby(['Tipo', 'Ativo'], observed=True, sort=True)
+    grupo = grupos.ngroup().to_numpy()
+    n_grupos = grupo.max() + 1
+
+    # Custo médio: cada COMPRA soma "qtd x preço" ao custo; cada VENDA guarda só a fração
+    # que sobrou ("fator" = 1 - vendido / quantidade que eu tinha). O custo final de um ativo é
+    # a soma de cada compra multiplicada pelos fatores das vendas que vieram DEPOIS dela.
+    # Para isso ordeno por ativo, data e ordem de lançamento (numa ordenação só).
+    ordem = np.lexsort((np.arange(len(df)), data.astype('datetime64[ns]').astype(np.int64), grupo))
+    g, q, p, v = grupo[ordem], qtd[ordem], preco[ordem], venda[ordem]
+    antes = pd.Series(q).groupby(g).cumsum().to_numpy() - q # Quantidade antes de cada lançamento
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fator = np.where(v, np.where(antes > 0, np.clip(1 + q / antes, 0.0, 1.0), 0.0), 1.0)
+    # Produto dos fatores DEPOIS de cada linha: produto acumulado de trás para frente, deslocado uma casa
+    depois = pd.Series(fator[::-1]).groupby(g[::-1]).cumprod().groupby(g[::-1]).shift(1, fill_value=1.0).to_numpy()[::-1]
+    compras = np.where(v, 0.0, q * p)
+    custo_final = np.bincount(g, weights=compras * depois, minlength=n_grupos)
+    vendas = np.bincount(g, weights=np.where(v, -q * p, 0.0), minlength=n_grupos)
+
+    # Um agrupamento só para quantidade, taxa e data; o custo já veio acima
+    resumo = grupos['Data_Inicial'].min().reset_index()
+    resumo['Tipo'] = resumo['Tipo'].astype(str)
+    resumo['Ativo'] = resumo['Ativo'].astype(str)
+    peso_total = np.bincount(grupo, weights=peso, minlength=n_grupos)
+    taxa_x_peso = np.bincount(grupo, weights=taxa * peso, minlength=n_grupos)
+    resumo.insert(2, 'Qtd_Atual', np.bincount(grupo, weights=qtd, minlength=n_grupos))
+    resumo.insert(3, 'Total_Investido', custo_final)
+    resumo.insert(4, 'Taxa', np.divide(taxa_x_peso, peso_total, out=np.zeros_like(peso_total), where=peso_total > 0))
+    # Lucro das vendas = o que recebi - o custo que saiu (tudo que comprei - o custo que sobrou)
+    resumo['Lucro_Realizado'] = vendas - (np.bincount(g, weights=compras, minlength=n_grupos) - custo_final)
+
+    # Filtro só o que eu ainda tenho (Qtd > 0)
+    resumo = resumo[resumo['Qtd_Atual'] > 0]
+
+    # Calculo o Preço Médio (PM) -> Custo do que sobrou / Quantidade
+    resumo['PM'] = resumo['Total_Investido'] / resumo['Qtd_Atual']
+    return resumo[custo.COLUNAS_CUSTOS]
+
+
+# ==============================================================================
+# A INTERFACE (O QUE TODO ARMAZENAMENTO SABE FAZER)
+# ==============================================================================
+
+# Classe abstrata: um armazenamento que esqueceu algum método dá erro já ao ser criado,
+# e não no meio da página quando o método é chamado.
+class ArmazenamentoCarteira(ABC):
+    @abstractmethod
+    def contar(self): ...
+    @abstractmethod
+    def carregar(self): ...
+    @abstractmethod
+    def registrar(self, lancamento): ...
+    @abstractmethod
+    def posicoes(self): ...
+    @abstractmethod
+    def extrato(self, tipo=None, ativo=None, inicio=None, fim=None, limite=None): ...
+    @abstractmethod
+    def apagar(self): ...
+    @abstractmethod
+    def registrar_varios(self, df): ...
+    @abstractmethod
+    def reconstruir_posicoes(self): ...
+    @abstractmethod
+    def custos(self, metodo="medio"): ...
+    @abstractmethod
+    def versao(self): ...
+
+    @abstractmethod
+    def _importar_pedacos(self, pedacos): ...
+
+    # Arquivo -> carteira, em pedaços e sem repetir o que já está no livro (motor/importacao.py).
+    # Aceita caminho ou arquivo aberto; 'nome' diz o formato (.csv, .xlsx, .parquet) de um arquivo aberto.
+    # Devolve {"importados": ..., "repetidos": ..., "descartados": ..., "sem_categoria": ...}
+    # ("sem_categoria": lançamentos que entraram como importacao.TIPO_NAO_RECONHECIDO)
+    def importar(self, origem, nome=None, tipo_padrao=None):
+        contagem = {"descartados": 0, "sem_categoria": 0}
+        def pedacos():
+            for bruto in importacao.ler_extrato(origem, nome):
+                df, descartados, sem_categoria = importacao.padronizar(bruto, tipo_padrao)
+                contagem["descartados"] += descartados
+                contagem["sem_categoria"] += sem_categoria
+                yield df
+        resumo = self._importar_pedacos(pedacos())
+        return {**resumo, **contagem}
+
+    # CSV -> carteira (acrescenta os lançamentos). Aceita caminho ou arquivo aberto.
+    def importar_csv(self, origem):
+        return self.importar(origem, nome="carteira.csv")["importados"]
+
+    # Carteira -> CSV (mesmo formato da carteira.csv de sempre). Sem destino, devolve os bytes.
+    def exportar_csv(self, destino=None):
+        df = self.carregar()
+        if destino is not None: return df.to_csv(destino, index=False)
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False)
+        return buffer.getvalue().encode("utf-8")
+
+
+# ==============================================================================
+# VERSÃO 1: SQLITE
+# ==============================================================================
+
+class ArmazenamentoSQLite(ArmazenamentoCarteira):
+    def __init__(self, nome_arquivo=ARQUIVO_SQLITE, importar_de=None):
+        self.nome_arquivo = nome_arquivo
+        caminho = caminho_dados(nome_arquivo)
+        if caminho in _BANCOS_PRONTOS and os.path.exists(caminho): return
+        with closing(conectar(nome_arquivo)) as con:
+            _criar_tabelas(con)
+            falta_importar = importar_de and not con.execute(_JA_IMPORTOU).fetchone()
+            falta_posicoes = not con.execute(_POSICOES_OK, (VERSAO_POSICOES,)).fetchone()
+            falta_impressoes = not con.execute(_IMPRESSOES_OK).fetchone()
+            if falta_importar or falta_posicoes or falta_impressoes:
+                # A transação "IMMEDIATE" garante que duas sessões não façam isso juntas
+                con.execute("BEGIN IMMEDIATE")
+                try:
+                    # Banco de uma versão sem a tabela de posições (ou com a conta antiga): monto a tabela uma vez
+                    if not con.execute(_POSICOES_OK, (VERSAO_POSICOES,)).fetchone():
+                        _reconstruir_posicoes(con)
+                        con.execute("INSERT OR REPLACE INTO meta VALUES ('posicoes_ok', ?)", (VERSAO_POSICOES,))
+                    # Banco de antes da importação em lote: calculo a impressão dos lançamentos que já existem
+                    if not con.execute(_IMPRESSOES_OK).fetchone():
+                        _reconstruir_impressoes(con)
+                        con.execute("INSERT OR REPLACE INTO meta VALUES ('impressoes_ok', '1')")
+                    # Migração: a carteira.csv antiga entra no banco na primeira vez (e nunca mais)
+                    if importar_de and not con.execute(_JA_IMPORTOU).fetchone():
+                        if os.path.exists(importar_de) or os.path.exists(diario.caminho_diario(importar_de)):
+                            _inserir(con, diario.carregar(importar_de))
+                        con.execute("INSERT OR REPLACE INTO meta VALUES ('importado_csv', ?)", (importar_de,))
+                    con.commit()
+                except Exception:
+                    con.rollback()
+                    raise
+        _BANCOS_PRONTOS.add(caminho)
+
+    def contar(self):
+        with closing(conectar(self.nome_arquivo)) as con:
+            return con.execute("SELECT COUNT(*) FROM lancamentos").fetchone()[0]
+
+    def carregar(self):
+        with closing(conectar(self.nome_arquivo)) as con:
+            return pd.read_sql_query(f"SELECT {_SELECAO} FROM lancamentos ORDER BY id", con)
+
+    def registrar(self, lancamento):
+        self.registrar_varios(pd.DataFrame([lancamento], columns=COLUNAS))
+
+    # Vários lançamentos numa transação só (importação)
+    def registrar_varios(self, df):
+        with closing(conectar(self.nome_arquivo)) as con, con:
+            _inserir(con, df)
+
+    # Todos os pedaços do arquivo numa transação só: ou entra o arquivo inteiro, ou nada
+    def _importar_pedacos(self, pedacos):
+        resumo, vistos = {"importados": 0, "repetidos": 0}, {}
+        with closing(conectar(self.nome_arquivo)) as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for df in pedacos:
+                    novos, hashes = importacao.filtrar_repetidos(df, lambda h: _contar_impressoes(con, h), vistos)
+                    _inserir(con, novos, hashes)
+                    resumo["importados"] += len(novos)
+                    resumo["repetidos"] += len(df) - len(novos)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        return resumo
+
+    # Lê a tabela de posições (já somada, lançamento a lançamento)
+    def posicoes(self):
+        resumo = self._ler_posicoes("WHERE quantidade > 0")
+        return resumo if not resumo.empty else pd.DataFrame()
+
+    # Preço médio: a própria tabela. PEPS: percorre o livro direto do cursor (sem carregar tudo)
+    def custos(self, metodo="medio"):
+        if metodo == "medio": return self._ler_posicoes()
+        with closing(conectar(self.nome_arquivo)) as con:
+            return custo.calcular_custos(con.execute(_LIVRO_EM_ORDEM), metodo)
+
+    # Quantidade e maior id: os ids nunca se repetem (AUTOINCREMENT), então qualquer mudança aparece
+    def versao(self):
+        with closing(conectar(self.nome_arquivo)) as con:
+            return con.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM lancamentos").fetchone()
+
+    def _ler_posicoes(self, filtro=""):
+        with closing(conectar(self.nome_arquivo)) as con:
+            resumo = pd.read_sql_query(f"""
+                SELECT tipo AS Tipo, ativo AS Ativo, quantidade AS Qtd_Atual, investido AS Total_Investido,
+                       CASE WHEN valor_compras > 0 THEN taxa_x_valor / valor_compras ELSE 0 END AS Taxa,
+                       data_inicial AS Data_Inicial,
+                       CASE WHEN quantidade > 0 THEN investido / quantidade ELSE 0 END AS PM,
+                       realizado AS Lucro_Realizado
+                FROM posicoes {filtro}
+                ORDER BY tipo, ativo
+            """, con)
+        resumo["Data_Inicial"] = pd.to_datetime(resumo["Data_Inicial"])
+        return resumo
+
+    # Refaz a tabela de posições somando todos os lançamentos (botão "Recalcular")
+    def reconstruir_posicoes(self):
+        with closing(conectar(self.nome_arquivo)) as con, con:
+            _reconstruir_posicoes(con)
+
+    def extrato(self, tipo=None, ativo=None, inicio=None, fim=None, limite=None):
+        condicoes, parametros = [], []
+        if tipo: condicoes.append("tipo = ?"); parametros.append(tipo)
+        if ativo: condicoes.append("ativo = ?"); parametros.append(ativo.upper())
+        if inicio: condicoes.append("data >= ?"); parametros.append(pd.Timestamp(inicio).strftime("%Y-%m-%d"))
+        if fim: condicoes.append("data <= ?"); parametros.append(pd.Timestamp(fim).strftime("%Y-%m-%d"))
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        limitar = f"LIMIT {int(limite)}" if limite else ""
+        with closing(conectar(self.nome_arquivo)) as con:
+            return pd.read_sql_query(
+                f"SELECT {_SELECAO} FROM lancamentos {onde} ORDER BY data DESC, id DESC {limitar}", con, params=parametros
+            )
+
+    def apagar(self):
+        with closing(conectar(self.nome_arquivo)) as con, con:
+            con.execute("DELETE FROM lancamentos")
+            con.execute("DELETE FROM posicoes")
+            con.execute("DELETE FROM impressoes")
+
+
+_SELECAO = ("data AS Data, ativo AS Ativo, tipo AS Tipo, operacao AS Operacao, "
+            "quantidade AS Quantidade, preco AS Preco, taxa AS Taxa")
+
+
+_JA_IMPORTOU = "SELECT 1 FROM meta WHERE chave = 'importado_csv'"
+_POSICOES_OK = "SELECT 1 FROM meta WHERE chave = 'posicoes_ok' AND valor = ?"
+_IMPRESSOES_OK = "SELECT 1 FROM meta WHERE chave = 'impressoes_ok'"
+
+# Muda quando a conta da tabela de posições muda (o banco refaz a tabela uma vez ao abrir)
+# 1: soma simples | 2: preço médio com lucro realizado
+VERSAO_POSICOES = "2"
+
+# O livro na ordem em que as contas de custo precisam (mesma data: ordem de lançamento)
+_LIVRO_EM_ORDEM = "SELECT tipo, ativo, data, operacao, quantidade, preco, taxa FROM lancamentos ORDER BY data, id"
+
+_CAMPOS_POSICAO = ["quantidade", "investido", "realizado", "taxa_x_valor", "valor_compras", "data_inicial", "data_ultima"]
+_GRAVAR_POSICAO = (f"INSERT OR REPLACE INTO posicoes (tipo, ativo, {', '.join(_CAMPOS_POSICAO)}) "
+                   f"VALUES (?, ?, {', '.join('?' * len(_CAMPOS_POSICAO))})")
+
+# Bancos que já têm as tabelas criadas (e a migração feita) neste processo
+_BANCOS_PRONTOS = set()
+
+
+# 'hashes': as impressões dos lançamentos, se quem chamou já calculou (importação)
+def _inserir(con, df, hashes=None):
+    if df.empty: return
+    df = df[COLUNAS].copy()
+    df["Data"] = pd.to_datetime(df["Data"]).dt.strftime("%Y-%m-%d") # Texto ISO: ordena e filtra certo
+    df["Ativo"] = df["Ativo"].astype(str).str.upper()
+    df["Taxa"] = df["Taxa"].fillna(0.0)
+    con.executemany(
+        "INSERT INTO lancamentos (data, ativo, tipo, operacao, quantidade, preco, taxa) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        df.astype(object).itertuples(index=False, name=None)
+    )
+    _somar_impressoes(con, importacao.impressoes(df) if hashes is None else hashes)
+
+    # Mesma transação: só as posições dos ativos deste lote mudam
+    df = df.sort_values("Data", kind="stable")
+    for (tipo, ativo), novos in df.groupby(["Tipo", "Ativo"], sort=False):
+        linha = con.execute(
+            f"SELECT {', '.join(_CAMPOS_POSICAO)} FROM posicoes WHERE tipo = ? AND ativo = ?", (tipo, ativo)
+        ).fetchone()
+        if linha is None or novos["Data"].iloc[0] >= linha[-1]:
+            # Lançamentos "no fim" do histórico: continuo a conta de onde ela parou
+            posicao = custo.Posicao()
+            if linha is not None:
+                for campo, valor in zip(_CAMPOS_POSICAO, linha): setattr(posicao, campo, valor)
+            for data, operacao, quantidade, preco, taxa in novos[["Data", "Operacao", "Quantidade", "Preco", "Taxa"]].itertuples(index=False):
+                posicao.aplicar(data, operacao, quantidade, preco, taxa)
+        else:
+            # Data no passado: refaço este ativo desde o começo, na ordem certa
+            posicao = custo.acumular(con.execute(
+                "SELECT tipo, ativo, data, operacao, quantidade, preco, taxa FROM lancamentos "
+                "WHERE tipo = ? AND ativo = ? ORDER BY data, id", (tipo, ativo)
+            ))[(tipo, ativo)]
+        _gravar_posicao(con, tipo, ativo, posicao)
+
+
+def _gravar_posicao(con, tipo, ativo, posicao):
+    con.execute(_GRAVAR_POSICAO, (tipo, ativo) + tuple(getattr(posicao, campo) for campo in _CAMPOS_POSICAO))
+
+
+# Apaga a tabela de posições e refaz tudo a partir dos lançamentos (uma passada só, direto do cursor)
+def _reconstruir_posicoes(con):
+    con.execute("DROP TABLE IF EXISTS posicoes")
+    _criar_tabela_posicoes(con)
+    for (tipo, ativo), posicao in custo.acumular(con.execute(_LIVRO_EM_ORDEM)).items():
+        _gravar_posicao(con, tipo, ativo, posicao)
+
+
+# Cada impressão e quantas vezes ela está no livro (duas compras iguais no mesmo dia valem 2)
+def _somar_impressoes(con, hashes):
+    vezes = pd.Series(hashes).value_counts()
+    con.executemany(
+        "INSERT INTO impressoes VALUES (?, ?) ON CONFLICT (hash) DO UPDATE SET vezes = vezes + excluded.vezes",
+        zip(vezes.index.tolist(), vezes.tolist())
+    )
+
+
+# {hash: vezes no livro}, só dos hashes pedidos (em grupos, para não passar do limite de parâmetros do SQLite)
+def _contar_impressoes(con, hashes):
+    contagem = {}
+    for inicio in range(0, len(hashes), 500):
+        grupo = hashes[inicio:inicio + 500]
+        contagem.update(con.execute(
+            f"SELECT hash, vezes FROM impressoes WHERE hash IN ({', '.join('?' * len(grupo))})", grupo
+        ).fetchall())
+    return contagem
+
+
+# Refaz a tabela de impressões lendo o livro em pedaços
+def _reconstruir_impressoes(con):
+    con.execute("DELETE FROM impressoes")
+    for pedaco in pd.read_sql_query(f"SELECT {_SELECAO} FROM lancamentos", con, chunksize=importacao.TAMANHO_PEDACO):
+        _somar_impressoes(con, importacao.impressoes(pedaco))
+
+
+def _criar_tabelas(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS lancamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL, ativo TEXT NOT NULL, tipo TEXT NOT NULL, operacao TEXT NOT NULL,
+            quantidade REAL NOT NULL, preco REAL NOT NULL, taxa REAL NOT NULL DEFAULT 0
+        )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_lancamentos_tipo_ativo ON lancamentos (tipo, ativo)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_lancamentos_data ON lancamentos (data)")
+    _criar_tabela_posicoes(con)
+    con.execute("CREATE TABLE IF NOT EXISTS impressoes (hash INTEGER PRIMARY KEY, vezes INTEGER NOT NULL)")
+    con.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+
+
+# Estado de cada ativo pelo preço médio (os campos de motor/custo.Posicao)
+def _criar_tabela_posicoes(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS posicoes (
+            tipo TEXT NOT NULL, ativo TEXT NOT NULL,
+            quantidade REAL NOT NULL, investido REAL NOT NULL, realizado REAL NOT NULL,
+            taxa_x_valor REAL NOT NULL, valor_compras REAL NOT NULL,
+            data_inicial TEXT NOT NULL, data_ultima TEXT NOT NULL,
+            PRIMARY KEY (tipo, ativo)
+        )""")
+
+
+# ==============================================================================
+# VERSÃO 2: CSV + DIÁRIO (O JEITO ANTIGO)
+# ==============================================================================
+
+class ArmazenamentoCSV(ArmazenamentoCarteira):
+    def __init__(self, caminho="carteira.csv"):
+        self.caminho = caminho
+
+    def contar(self):
+        return len(self.carregar())
+
+    def carregar(self):
+        return diario.carregar(self.caminho)
+
+    def registrar(self, lancamento):
+        diario.registrar(self.caminho, lancamento)
+
+    def registrar_varios(self, df):
+        diario.registrar_varios(self.caminho, df[COLUNAS].to_dict("records"))
+
+    # Sem índice em disco: as impressões do livro são calculadas uma vez por importação
+    def _importar_pedacos(self, pedacos):
+        livro = pd.Series(importacao.impressoes(self.carregar())).value_counts().to_dict()
+        resumo, vistos, partes = {"importados": 0, "repetidos": 0}, {}, []
+        for df in pedacos:
+            novos, _ = importacao.filtrar_repetidos(df, lambda hashes: {h: livro[h] for h in hashes if h in livro}, vistos)
+            partes.append(novos)
+            resumo["repetidos"] += len(df) - len(novos)
+        novos = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUNAS)
+        if not novos.empty:
+            novos["Data"] = pd.to_datetime(novos["Data"]).dt.strftime("%Y-%m-%d")
+            self.registrar_varios(novos) # Uma gravação e um fsync só
+        resumo["importados"] = len(novos)
+        return resumo
+
+    def posicoes(self):
+        return calcular_posicao_atual(self.carregar())
+
+    def reconstruir_posicoes(self):
+        pass # Aqui as posições já são calculadas do zero a cada leitura
+
+    def custos(self, metodo="medio"):
+        return custo.custos_de_lancamentos(self.carregar(), metodo)
+
+    def versao(self):
+        return diario.versao(self.caminho)
+
+    def extrato(self, tipo=None, ativo=None, inicio=None, fim=None, limite=None):
+        df = self.carregar()
+        if df.empty: return df
+        datas = pd.to_datetime(df["Data"])
+        filtro = pd.Series(True, index=df.index)
+        if tipo: filtro &= df["Tipo"] == tipo
+        if ativo: filtro &= df["Ativo"] == ativo.upper()
+        if inicio: filtro &= datas >= pd.Timestamp(inicio)
+        if fim: filtro &= datas <= pd.Timestamp(fim)
+        df = df[filtro].assign(_data=datas[filtro]).sort_values("_data", ascending=False, kind="stable").drop(columns="_data")
+        return df.head(limite) if limite else df
+
+    def apagar(self):
+        diario.apagar(self.caminho)
@@ -0,0 +1,22 @@
+"""
+================================================================================
+🗄️ FINANK - CONEXÃO COM O SQLITE
+================================================================================
+O SQLite já vem com o Python, então não precisamos instalar nada.
+Cada chamada abre a sua própria conexão: o Streamlit roda cada usuário numa
+thread diferente, e conexão de SQLite não deve ser dividida entre threads.
+"""
+
+import sqlite3
+
+from motor.config import caminho_dados
+
+
+# Abre (ou cria) um banco dentro da pasta de dados.
+# - WAL: leitores não ficam travados enquanto alguém escreve.
+# - timeout: se outra thread estiver escrevendo, espera em vez de dar erro.
+def conectar(nome_arquivo):
+    conexao = sqlite3.connect(caminho_dados(nome_arquivo), timeout=30)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
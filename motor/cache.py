@@ -0,0 +1,109 @@
+"""
+================================================================================
+♻️ FINANK - CACHE "SERVE O VELHO ENQUANTO BUSCA O NOVO"
+================================================================================
+Com o @st.cache_data(ttl=300), quando os 5 minutos acabam, o PRÓXIMO usuário
+que abre a página fica esperando o download inteiro (às vezes vários segundos).
+
+Este cache funciona em duas etapas:
+1. TTL "suave" (ttl): passou desse tempo, eu ENTREGO o valor antigo na hora e
+   peço um valor novo em segundo plano. Ninguém fica esperando.
+2. TTL "máximo" (ttl_maximo): passou desse tempo, o valor é velho demais para
+   ser mostrado e aí sim a busca é feita na frente do usuário.
+
+Também dá para dizer o que é um resultado "bom" (valido=...). Se a busca em
+segundo plano voltar vazia (site fora do ar), eu continuo servindo o último
+valor bom em vez de trocar por um vazio.
+"""
+
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from motor.chaves import chave_argumentos, identificar_funcao
+from motor.voo_unico import executar_uma_vez
+
+# Guardado no nível do módulo: vale para TODAS as sessões do Streamlit.
+# (As páginas são reexecutadas a cada clique, mas este módulo é importado uma vez só.)
+# Uma fila por função: o limite (max_entradas) de uma não apaga o que as outras guardaram.
+_ENTRADAS = {} # id da função -> OrderedDict(chave -> (valor, quando))
+_ATUALIZANDO = set()
+_TRAVA = threading.Lock()
+_POOL_ATUALIZACAO = ThreadPoolExecutor(max_workers=4, thread_name_prefix="finank-swr")
+
+
+# O Decorador
+# Uso: @cache_swr(ttl=300, ttl_maximo=3600)
+def cache_swr(ttl, ttl_maximo=None, valido=None, max_entradas=256):
+    ttl_maximo = ttl_maximo if ttl_maximo is not None else ttl * 12
+
+    def decorador(funcao):
+        id_funcao = identificar_funcao(funcao)
+        with _TRAVA: entradas = _ENTRADAS.setdefault(id_funcao, OrderedDict())
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            chave = (id_funcao, chave_argumentos(args, kwargs))
+            with _TRAVA:
+                entrada = entradas.get(chave)
+                if entrada is not None: entradas.move_to_end(chave)
+
+            if entrada is not None:
+                idade = time.monotonic() - entrada[1]
+                if idade < ttl:
+                    return copy.deepcopy(entrada[0])
+                if idade < ttl_maximo:
+                    # Velho, mas ainda aceitável: entrego agora e atualizo por trás
+                    _agendar_atualizacao(entradas, chave, funcao, args, kwargs, valido, max_entradas)
+                    return copy.deepcopy(entrada[0])
+
+            # Sem valor (ou velho demais): aqui não tem jeito, busco na hora.
+            # Se várias sessões chegarem juntas, só uma busca e as outras esperam.
+            valor = executar_uma_vez(chave, funcao, *args, **kwargs)
+            _guardar(entradas, chave, valor, valido, max_entradas)
+            return copy.deepcopy(valor)
+
+        return envoltorio
+    return decorador
+
+
+# Apaga tudo (usado ao medir tempo de página "a frio")
+def limpar_cache_swr():
+    with _TRAVA:
+        for entradas in _ENTRADAS.values(): entradas.clear()
+
+
+# --- FUNÇÕES INTERNAS ---
+
+def _guardar(entradas, chave, valor, valido, max_entradas, substituir_bom=True):
+    with _TRAVA:
+        anterior = entradas.get(chave)
+        # Resultado ruim não apaga um resultado bom que ainda está no prazo
+        if valido is not None and not valido(valor) and anterior is not None and not substituir_bom:
+            return
+        entradas[chave] = (valor, time.monotonic())
+        entradas.move_to_end(chave)
+        while len(entradas) > max_entradas:
+            entradas.popitem(last=False)
+
+
+def _agendar_atualizacao(entradas, chave, funcao, args, kwargs, valido, max_entradas):
+    with _TRAVA:
+        if chave in _ATUALIZANDO: return # Já tem alguém buscando essa mesma chave
+        _ATUALIZANDO.add(chave)
+    # Copio os argumentos: a página pode alterar os originais enquanto a busca roda
+    args, kwargs = copy.deepcopy(args), copy.deepcopy(kwargs)
+
+    def atualizar():
+        try:
+            _guardar(entradas, chave, funcao(*args, **kwargs), valido, max_entradas, substituir_bom=False)
+        except Exception:
+            pass # Falhou em segundo plano? Continuo servindo o valor antigo.
+        finally:
+            with _TRAVA:
+                _ATUALIZANDO.discard(chave)
+
+    _POOL_ATUALIZACAO.submit(atualizar)
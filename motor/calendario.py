@@ -0,0 +1,78 @@
+"""
+================================================================================
+📅 FINANK - CALENDÁRIO DE DIAS ÚTEIS (B3 / ANBIMA)
+================================================================================
+Renda Fixa no Brasil rende por DIA ÚTIL, não por dia corrido: o ano tem 252
+dias úteis e um CDB não rende no Carnaval nem no feriado de Tiradentes.
+
+O calendário é montado uma vez, na importação do módulo, com os feriados
+nacionais de ANO_INICIAL a ANO_FINAL:
+- Fixos: Confraternização (1/1), Tiradentes (21/4), Trabalho (1/5),
+  Independência (7/9), Aparecida (12/10), Finados (2/11), República (15/11),
+  Consciência Negra (20/11, a partir de 2024) e Natal (25/12).
+- Móveis (contados a partir da Páscoa): Carnaval (segunda e terça),
+  Sexta-feira Santa e Corpus Christi.
+
+Depois disso, contar dias úteis entre milhares de pares de datas é uma chamada
+só do numpy (np.busday_count), sem laço.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+DIAS_UTEIS_ANO = 252
+ANO_INICIAL, ANO_FINAL = 1990, 2080
+
+_FIXOS = [(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)]
+
+
+# Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)
+def pascoa(ano):
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+# Feriados nacionais de um ano
+def feriados(ano):
+    dias = [date(ano, mes, dia) for mes, dia in _FIXOS]
+    if ano >= 2024: dias.append(date(ano, 11, 20))
+    p = pascoa(ano)
+    dias += [p - timedelta(days=48), p - timedelta(days=47), p - timedelta(days=2), p + timedelta(days=60)]
+    return sorted(dias)
+
+
+FERIADOS = np.array([d for ano in range(ANO_INICIAL, ANO_FINAL + 1) for d in feriados(ano)], dtype="datetime64[D]")
+CALENDARIO = np.busdaycalendar(weekmask="1111100", holidays=FERIADOS)
+
+
+# Dias úteis de 'inicio' (inclusive) até 'fim' (exclusive), como nos contratos de Renda Fixa.
+# Aceita datas soltas ou colunas inteiras (o resultado tem o formato das entradas).
+def dias_uteis(inicio, fim):
+    return np.busday_count(_dias(inicio), _dias(fim), busdaycal=CALENDARIO)
+
+
+# Todos os dias úteis de 'inicio' até 'fim' (inclusive)
+def pregoes(inicio, fim):
+    dias = np.arange(_dias(inicio), _dias(fim) + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    return pd.DatetimeIndex(dias[np.is_busday(dias, busdaycal=CALENDARIO)])
+
+
+# True para os dias úteis
+def eh_dia_util(datas):
+    return np.is_busday(_dias(datas), busdaycal=CALENDARIO)
+
+
+# Qualquer data (texto, Timestamp, coluna do pandas) -> datetime64[D] do numpy
+def _dias(datas):
+    if isinstance(datas, (pd.Series, pd.Index, np.ndarray, list)):
+        return pd.to_datetime(np.asarray(datas)).to_numpy().astype("datetime64[D]")
+    return np.datetime64(pd.Timestamp(datas).date(), "D")
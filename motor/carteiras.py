@@ -0,0 +1,177 @@
+"""
+================================================================================
+👨‍👩‍👧 FINANK - VÁRIAS CARTEIRAS (UMA POR PESSOA OU CONTA)
+================================================================================
+Antes existia UMA carteira só. Agora cada pessoa da família (ou cada conta)
+tem a sua, com o seu próprio livro de lançamentos:
+
+- "principal": a carteira.db / carteira.csv de sempre (nada muda para quem já usa).
+- as outras: carteira_<id>.db / carteira_<id>.csv, na mesma pasta.
+
+A lista de carteiras fica em carteiras.db.
+
+MEMÓRIA: as posições (e a avaliação a preço de mercado) de cada carteira ficam
+prontas num "LRU": guardo as CARTEIRAS_EM_MEMORIA carteiras usadas mais
+recentemente; quando passa disso, a que está há mais tempo sem uso sai.
+Tudo que está guardado vale para uma "versão" do livro: um lançamento novo
+invalida só a carteira que mudou.
+
+A visão consolidada (todas as carteiras juntas) passa carteira por carteira,
+lendo só as posições já somadas, nunca os livros inteiros ao mesmo tempo.
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from motor.armazenamento import abrir_carteira
+from motor.banco import conectar
+from motor.config import CARTEIRAS_EM_MEMORIA, caminho_dados
+
+ARQUIVO_CARTEIRAS = "carteiras.db"
+PRINCIPAL = "principal"
+
+# Bancos de cadastro que já têm a tabela criada neste processo
+_CADASTROS_PRONTOS = set()
+
+# A avaliação usa preços de mercado: vale por 5 minutos (como o cache de preços da página)
+VALIDADE_AVALIACAO = 300
+
+
+# --- CADASTRO DAS CARTEIRAS ---
+
+# {id: nome}, na ordem em que foram criadas (a principal sempre existe e vem primeiro)
+def listar_carteiras():
+    _preparar_cadastro()
+    with closing(conectar(ARQUIVO_CARTEIRAS)) as con:
+        linhas = con.execute("SELECT id, nome FROM carteiras ORDER BY id != ?, criada_em, id", (PRINCIPAL,)).fetchall()
+    return dict(linhas)
+
+
+# Cria uma carteira nova e devolve o id dela (ex: "Conta da Maria" -> "conta_da_maria")
+def criar_carteira(nome):
+    nome = " ".join(str(nome).split())
+    id_carteira = _gerar_id(nome)
+    if not id_carteira: raise ValueError("Dê um nome para a carteira.")
+    _preparar_cadastro()
+    with closing(conectar(ARQUIVO_CARTEIRAS)) as con, con:
+        existe = con.execute("SELECT 1 FROM carteiras WHERE id = ? OR nome = ?", (id_carteira, nome)).fetchone()
+        if existe: raise ValueError(f"Já existe uma carteira chamada '{nome}'.")
+        con.execute("INSERT INTO carteiras VALUES (?, ?, ?)", (id_carteira, nome, datetime.now().isoformat()))
+    return id_carteira
+
+
+# O armazenamento (motor/armazenamento.py) do livro de uma carteira
+def abrir(id_carteira=PRINCIPAL):
+    if id_carteira == PRINCIPAL: return abrir_carteira("carteira.csv", "carteira.db")
+    return abrir_carteira(f"carteira_{id_carteira}.csv", f"carteira_{id_carteira}.db")
+
+
+# --- POSIÇÕES E AVALIAÇÕES PRONTAS (LRU POR CARTEIRA) ---
+
+# Posições de hoje (quantidade > 0) pelo método de custo pedido
+def posicoes(id_carteira, metodo="medio"):
+    def calcular():
+        if metodo == "medio": return abrir(id_carteira).posicoes()
+        todos = custos(id_carteira, metodo)
+        return todos[todos["Qtd_Atual"] > 0].reset_index(drop=True)
+    return _MATERIALIZADAS.obter(id_carteira, ("posicoes", metodo), calcular)
+
+
+# Custo e lucro realizado de todos os ativos, inclusive os já vendidos
+def custos(id_carteira, metodo="medio"):
+    return _MATERIALIZADAS.obter(id_carteira, ("custos", metodo), lambda: abrir(id_carteira).custos(metodo))
+
+
+# As posições avaliadas a preço de mercado por 'avaliar' (a função de preços da página)
+def avaliacao(id_carteira, avaliar, metodo="medio"):
+    return _MATERIALIZADAS.obter(
+        id_carteira, ("avaliacao", metodo), lambda: avaliar(posicoes(id_carteira, metodo)), validade=VALIDADE_AVALIACAO
+    )
+
+
+# Posições de várias carteiras numa tabela só, com a coluna "Carteira" (nome)
+def consolidar(ids=None, metodo="medio"):
+    nomes = listar_carteiras()
+    partes = []
+    for id_carteira in (ids or list(nomes)):
+        parte = posicoes(id_carteira, metodo)
+        if not parte.empty: partes.append(parte.assign(Carteira=nomes.get(id_carteira, id_carteira)))
+    if not partes: return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+# Junta o mesmo ativo de carteiras diferentes numa linha só
+# (quantidades e custos somados, taxa média ponderada pelo custo, data mais antiga)
+def agrupar_por_ativo(consolidado):
+    if consolidado.empty: return consolidado
+    df = consolidado.assign(Taxa_x_Custo=consolidado["Taxa"] * consolidado["Total_Investido"])
+    somas = {"Qtd_Atual": "sum", "Total_Investido": "sum", "Taxa_x_Custo": "sum", "Data_Inicial": "min", "Lucro_Realizado": "sum"}
+    agrupado = df.groupby(["Tipo", "Ativo"], sort=True).agg(somas).reset_index()
+    custo_total = agrupado["Total_Investido"].to_numpy()
+    agrupado["Taxa"] = np.divide(agrupado.pop("Taxa_x_Custo").to_numpy(), custo_total,
+                                 out=np.zeros_like(custo_total), where=custo_total > 0)
+    agrupado["PM"] = agrupado["Total_Investido"] / agrupado["Qtd_Atual"]
+    return agrupado[["Tipo", "Ativo", "Qtd_Atual", "Total_Investido", "Taxa", "Data_Inicial", "PM", "Lucro_Realizado"]]
+
+
+# Esvazia o LRU (testes e benchmarks)
+def limpar_memoria():
+    _MATERIALIZADAS.limpar()
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Tudo que já calculei de cada carteira, enquanto o livro dela não muda.
+# Carteira usada agora vai para o "fim da fila"; quando passa do limite, sai a do começo.
+class _LRU:
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._dados = OrderedDict()  # id -> {"versao": ..., (nome, metodo): (valor, quando)}
+        self._trava = threading.Lock()
+
+    def obter(self, id_carteira, nome, calcular, validade=None):
+        versao = abrir(id_carteira).versao()
+        with self._trava:
+            entrada = self._dados.get(id_carteira)
+            if entrada is None or entrada["versao"] != versao:
+                entrada = {"versao": versao} # Livro mudou: o que eu tinha dessa carteira não vale mais
+            self._dados[id_carteira] = entrada
+            self._dados.move_to_end(id_carteira)
+            while len(self._dados) > self.maximo: self._dados.popitem(last=False)
+            guardado = entrada.get(nome)
+            if guardado and (validade is None or time.time() - guardado[1] < validade): return guardado[0]
+
+        valor = calcular() # Fora da trava: outras carteiras não esperam por esta
+        with self._trava: entrada[nome] = (valor, time.time())
+        return valor
+
+    def limpar(self):
+        with self._trava: self._dados.clear()
+
+
+_MATERIALIZADAS = _LRU(CARTEIRAS_EM_MEMORIA)
+
+
+# "Conta da Maria" -> "conta_da_maria" (sem acentos, só letras, números e _)
+def _gerar_id(nome):
+    texto = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", "_", texto).strip("_")
+
+
+# Cria a tabela (com a carteira principal) uma vez por processo e por arquivo
+def _preparar_cadastro():
+    caminho = caminho_dados(ARQUIVO_CARTEIRAS)
+    if caminho in _CADASTROS_PRONTOS and os.path.exists(caminho): return
+    with closing(conectar(ARQUIVO_CARTEIRAS)) as con, con:
+        con.execute("CREATE TABLE IF NOT EXISTS carteiras (id TEXT PRIMARY KEY, nome TEXT UNIQUE, criada_em TEXT)")
+        con.execute("INSERT OR IGNORE INTO carteiras VALUES (?, 'Principal', '')", (PRINCIPAL,))
+    _CADASTROS_PRONTOS.add(caminho)
@@ -0,0 +1,39 @@
+"""
+================================================================================
+🔑 FINANK - CHAVES DE CACHE
+================================================================================
+Para saber se "já fiz essa busca antes" eu preciso transformar a função e os
+argumentos em uma chave curta. Quem usa: o cache (motor/cache.py) e a fila de
+busca única (motor/voo_unico.py).
+"""
+
+import hashlib
+import pickle
+
+import pandas as pd
+
+
+# Mesma função na mesma página = mesma chave, mesmo com a página sendo reexecutada.
+# O bytecode entra na chave para um código editado não reaproveitar o cache antigo.
+def identificar_funcao(funcao):
+    codigo = funcao.__code__
+    return (codigo.co_filename, funcao.__qualname__, hashlib.sha1(codigo.co_code).hexdigest())
+
+
+# Transforma os argumentos em uma chave curta.
+# DataFrames são resumidos pelo hash do conteúdo (o pickle deles muda à toa).
+def chave_argumentos(args, kwargs):
+    normalizado = (_normalizar(args), _normalizar(sorted(kwargs.items())))
+    return hashlib.sha1(pickle.dumps(normalizado)).hexdigest()
+
+
+def _normalizar(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        conteudo = pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes()
+        colunas = tuple(obj.columns) if isinstance(obj, pd.DataFrame) else (obj.name,)
+        return ("pandas", colunas, hashlib.sha1(conteudo).hexdigest())
+    if isinstance(obj, (list, tuple)):
+        return tuple(_normalizar(o) for o in obj)
+    if isinstance(obj, dict):
+        return tuple((k, _normalizar(v)) for k, v in sorted(obj.items()))
+    return obj
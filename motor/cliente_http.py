@@ -0,0 +1,108 @@
+"""
+================================================================================
+🌐 FINANK - CLIENTE HTTP COMPARTILHADO
+================================================================================
+Vários `requests.get` espalhados pelas páginas não tinham timeout nenhum.
+Se o Google News travasse, a página do usuário ficava presa PARA SEMPRE.
+
+Aqui existe UMA sessão de `requests` para o app inteiro, com:
+1. Pool de conexões (keep-alive): a conexão segura (TLS) com o Google, o Tesouro
+   etc. é aberta uma vez e reaproveitada, em vez de refeita a cada busca.
+2. Timeout por provedor: cada site tem um tempo máximo de espera.
+3. Novas tentativas limitadas: se o site devolver 429/5xx ou a conexão cair,
+   tento de novo poucas vezes, esperando um pouquinho mais a cada vez.
+4. Compressão gzip: menos bytes trafegando.
+
+Resultado: o pior caso de uma busca tem um limite conhecido.
+
+E cada provedor tem o seu disjuntor (motor/disjuntor.py): se ele cair de vez,
+as próximas buscas falham NA HORA em vez de esperar o timeout toda vez.
+"""
+
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from motor.config import URL_SIMULADOR
+from motor.disjuntor import obter_disjuntor
+from motor.gravacao import gravavel
+
+# Cabeçalho de navegador comum (alguns sites bloqueiam robôs "sem cara")
+CABECALHOS_PADRAO = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Timeouts por provedor: (tempo para conectar, tempo para receber a resposta)
+TIMEOUTS = {
+    "google_news": (3.05, 8),
+    "tesouro": (3.05, 5),
+    "coingecko": (3.05, 6),
+    "alternative_me": (3.05, 5),
+    "yahoo": (3.05, 10),
+    "bcb": (3.05, 15),
+}
+TIMEOUT_PADRAO = (3.05, 10)
+
+# Respostas que contam como "o provedor está com problema"
+# (403 = o site está bloqueando a gente, o que na prática é o mesmo que fora do ar)
+STATUS_DE_FALHA = {403, 429, 500, 502, 503, 504}
+
+
+def _criar_sessao():
+    tentativas = Retry(
+        total=2, connect=2, read=1, status=2,
+        backoff_factor=0.5, backoff_max=2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        # Não obedeço o "Retry-After" do servidor: ele pode pedir minutos de espera
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=tentativas)
+    sessao = requests.Session()
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    sessao.headers.update(CABECALHOS_PADRAO)
+    return sessao
+
+
+# Uma sessão só para todas as páginas e sessões do Streamlit
+_SESSAO = _criar_sessao()
+
+
+# Função Principal: GET com as regras do provedor
+# Uso: cliente_http.get("coingecko", url)
+# Aceita os mesmos parâmetros do requests.get (headers, params, verify...).
+# Se o disjuntor do provedor estiver aberto, levanta CircuitoAberto na hora.
+def get(provedor, url, **kwargs):
+    disjuntor = obter_disjuntor(provedor)
+    disjuntor.verificar()
+    kwargs.setdefault("timeout", TIMEOUTS.get(provedor, TIMEOUT_PADRAO))
+    try:
+        resposta = _requisitar(provedor, _redirecionar(url), **kwargs)
+    except Exception:
+        # Qualquer erro (rede, urllib3, gravação ausente...) conta como falha: se o disjuntor
+        # estava testando (meio aberto), ele precisa saber o resultado para não ficar travado
+        disjuntor.registrar_falha()
+        raise
+    if resposta.status_code in STATUS_DE_FALHA: disjuntor.registrar_falha()
+    else: disjuntor.registrar_sucesso()
+    return resposta
+
+
+# Com FINANK_SIMULADOR configurado, toda URL vira uma URL do servidor simulado:
+# https://api.coingecko.com/api/v3/... -> http://127.0.0.1:8765/api.coingecko.com/api/v3/...
+def _redirecionar(url):
+    if not URL_SIMULADOR: return url
+    partes = urlsplit(url)
+    consulta = f"?{partes.query}" if partes.query else ""
+    return f"{URL_SIMULADOR}/{partes.netloc}{partes.path}{consulta}"
+
+
+# A ida à internet de fato (é o que fica gravado no modo FINANK_GRAVACAO)
+@gravavel("http")
+def _requisitar(provedor, url, **kwargs):
+    return _SESSAO.get(url, **kwargs)
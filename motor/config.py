@@ -0,0 +1,58 @@
+"""
+================================================================================
+🔧 FINANK - CONFIGURAÇÕES GERAIS
+================================================================================
+Um lugar só para as "chaves" do sistema que podem mudar de máquina para máquina.
+Tudo pode ser trocado por variável de ambiente, sem mexer no código.
+"""
+
+import os
+
+# Pasta onde o Finank guarda os dados que precisam sobreviver a um reinício
+# do Streamlit (histórico de preços, caches em disco etc.).
+PASTA_DADOS = os.environ.get("FINANK_DADOS", "finank_dados")
+
+# De quanto em quanto tempo (segundos) vale a pena perguntar ao Yahoo se
+# saiu barra nova para um ativo que já está no histórico local.
+FRESCOR_HISTORICO = int(os.environ.get("FINANK_FRESCOR_HISTORICO", "300"))
+
+# O mesmo para os índices da Renda Fixa (CDI, Selic, IPCA) do Banco Central:
+# saem no máximo uma vez por dia, então 6 horas é mais que suficiente.
+FRESCOR_INDICES = int(os.environ.get("FINANK_FRESCOR_INDICES", "21600"))
+
+
+# Função Auxiliar: Monta o caminho de um arquivo dentro da pasta de dados
+# (e cria a pasta na primeira vez).
+def caminho_dados(nome_arquivo):
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    return os.path.join(PASTA_DADOS, nome_arquivo)
+
+# Modo de gravação/reprodução das fontes externas (motor/gravacao.py):
+# "" (desligado), "gravar" ou "reproduzir".
+# Grave e reproduza com um FINANK_DADOS limpo: as buscas "só as barras novas" do
+# histórico em disco usam a data da última barra, que muda de um dia para o outro.
+MODO_GRAVACAO = os.environ.get("FINANK_GRAVACAO", "").strip().lower()
+
+# Onde ficam as gravações ("fixtures") de cada chamada externa
+PASTA_GRAVACOES = os.environ.get("FINANK_GRAVACOES", os.path.join(PASTA_DADOS, "gravacoes"))
+
+# Na reprodução, cada resposta demora o mesmo que demorou na gravação vezes
+# este fator (1 = latência real, 0 = instantâneo, 2 = internet duas vezes mais lenta).
+FATOR_LATENCIA = float(os.environ.get("FINANK_FATOR_LATENCIA", "1"))
+
+# Servidor simulado (ferramentas/servidor_simulado.py) para testes de carga.
+# Ex.: FINANK_SIMULADOR=http://127.0.0.1:8765 faz o app inteiro (Yahoo, Tesouro,
+# CoinGecko, Google News, alternative.me) conversar com ele em vez da internet.
+URL_SIMULADOR = os.environ.get("FINANK_SIMULADOR", "").strip().rstrip("/")
+
+# FINANK_TRADUCAO=0 desliga o Google Tradutor (os textos ficam no original).
+# Útil nos benchmarks, que não devem depender de nenhum site de verdade.
+TRADUCAO_ATIVA = os.environ.get("FINANK_TRADUCAO", "1") != "0"
+
+# Onde a carteira guarda os lançamentos: "sqlite" (padrão, em PASTA_DADOS/carteira.db)
+# ou "csv" (a carteira.csv de sempre, na pasta em que o app roda).
+ARMAZENAMENTO_CARTEIRA = os.environ.get("FINANK_ARMAZENAMENTO", "sqlite").strip().lower()
+
+# Quantas carteiras (pessoas/contas) ficam com posições e avaliações prontas na
+# memória ao mesmo tempo (motor/carteiras.py). As menos usadas saem primeiro.
+CARTEIRAS_EM_MEMORIA = int(os.environ.get("FINANK_CARTEIRAS_MEMORIA", "8"))
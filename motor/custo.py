@@ -0,0 +1,142 @@
+"""
+================================================================================
+🧾 FINANK - CUSTO DE AQUISIÇÃO (PREÇO MÉDIO E PEPS)
+================================================================================
+Quanto me custou o que eu ainda tenho? E quanto eu já lucrei (ou perdi) com o
+que vendi? Antes a conta era "tudo que comprei - tudo que vendi (a preço de
+venda)", e o Preço Médio ficava torto depois de cada venda parcial.
+
+Aqui o livro de lançamentos é percorrido UMA vez, em ordem de data, e cada
+ativo guarda só o estado dele (quantidade, custo, lucro realizado...).
+A memória depende do número de ativos, não do tamanho do histórico: dá para
+passar milhões de lançamentos direto de um cursor do banco.
+
+Dois métodos:
+1. "medio" (padrão, o que a Receita usa para ações): a venda não muda o Preço
+   Médio; ela só tira da posição "quantidade vendida x PM".
+2. "peps" (Primeiro que Entra, Primeiro que Sai / FIFO): a venda consome os
+   lotes mais antigos primeiro, cada um pelo preço em que foi comprado.
+
+Lucro realizado = valor da venda - custo do que saiu.
+Lucro não realizado = valor de mercado de hoje - custo do que sobrou
+(a página da Carteira faz essa parte, porque é ela que tem os preços).
+"""
+
+import math
+from collections import deque
+
+import pandas as pd
+
+METODOS = {
+    "medio": "Preço Médio",
+    "peps": "PEPS (primeiro que entra, primeiro que sai)",
+}
+
+# O que sai de calcular_custos (as mesmas colunas das posições, mais o lucro realizado)
+COLUNAS_CUSTOS = ["Tipo", "Ativo", "Qtd_Atual", "Total_Investido", "Taxa", "Data_Inicial", "PM", "Lucro_Realizado"]
+
+
+# O estado de UM ativo enquanto o livro é percorrido
+class Posicao:
+    __slots__ = ("quantidade", "investido", "realizado", "taxa_x_valor", "valor_compras",
+                 "data_inicial", "data_ultima", "lotes")
+
+    def __init__(self, metodo="medio"):
+        if metodo not in METODOS: raise ValueError(f"Método de custo desconhecido: {metodo}")
+        self.quantidade = 0.0     # Quantas eu tenho
+        self.investido = 0.0      # Quanto me custou o que eu tenho
+        self.realizado = 0.0      # Lucro (ou prejuízo) das vendas
+        self.taxa_x_valor = 0.0   # Para a taxa média ponderada pelo valor das compras
+        self.valor_compras = 0.0
+        self.data_inicial = None  # Primeiro lançamento
+        self.data_ultima = None   # Último lançamento (para saber se um novo vem "no fim")
+        self.lotes = deque() if metodo == "peps" else None # [quantidade, preço] de cada compra ainda aberta
+
+    # Um lançamento (sempre na ordem das datas)
+    def aplicar(self, data, operacao, quantidade, preco, taxa):
+        quantidade, preco = float(quantidade), float(preco)
+        if self.data_inicial is None: self.data_inicial = data
+        self.data_ultima = data
+
+        if operacao != "Venda":
+            valor = abs(quantidade * preco)
+            taxa = float(taxa)
+            if not math.isnan(taxa): self.taxa_x_valor += taxa * valor
+            self.valor_compras += valor
+            self.quantidade += quantidade
+            self.investido += quantidade * preco
+            if self.lotes is not None: self.lotes.append([quantidade, preco])
+            return
+
+        # VENDA: quanto custava o que está saindo?
+        if self.lotes is None:
+            # Preço médio: sai uma fração proporcional do custo (o PM não muda)
+            if self.quantidade > 0: custo_saida = self.investido * min(1.0, quantidade / self.quantidade)
+            else: custo_saida = self.investido
+        else:
+            # PEPS: consome os lotes mais antigos primeiro
+            custo_saida, falta = 0.0, quantidade
+            while falta > 0 and self.lotes:
+                lote = self.lotes[0]
+                usado = min(falta, lote[0])
+                custo_saida += usado * lote[1]
+                falta -= usado
+                lote[0] -= usado
+                if lote[0] <= 0: self.lotes.popleft()
+
+        self.realizado += quantidade * preco - custo_saida
+        self.investido -= custo_saida
+        self.quantidade -= quantidade
+
+    @property
+    def taxa(self):
+        return self.taxa_x_valor / self.valor_compras if self.valor_compras > 0 else 0.0
+
+
+# Função Principal 1: Percorre o livro (em ordem de data) e devolve o estado de cada ativo
+# 'linhas' é qualquer iterável de (tipo, ativo, data, operacao, quantidade, preco, taxa):
+# uma lista, um itertuples do pandas ou um cursor do SQLite (que não carrega tudo na memória).
+def acumular(linhas, metodo="medio"):
+    posicoes = {}
+    for tipo, ativo, data, operacao, quantidade, preco, taxa in linhas:
+        posicao = posicoes.get((tipo, ativo))
+        if posicao is None: posicao = posicoes[(tipo, ativo)] = Posicao(metodo)
+        posicao.aplicar(data, operacao, quantidade, preco, taxa)
+    return posicoes
+
+
+# Função Principal 2: O mesmo, já em tabela (inclusive ativos que já vendi todos)
+def calcular_custos(linhas, metodo="medio"):
+    return tabela(acumular(linhas, metodo))
+
+
+# Atalho para um DataFrame com as colunas da carteira.csv (ordeno por data antes)
+def custos_de_lancamentos(df, metodo="medio"):
+    if df.empty: return pd.DataFrame(columns=COLUNAS_CUSTOS)
+    datas = pd.to_datetime(df["Data"])
+    ordem = datas.argsort(kind="stable") # Mesma data: vale a ordem em que foi lançado
+    linhas = zip(
+        df["Tipo"].to_numpy()[ordem], df["Ativo"].to_numpy()[ordem], datas.to_numpy()[ordem],
+        df["Operacao"].to_numpy()[ordem], df["Quantidade"].to_numpy()[ordem],
+        df["Preco"].to_numpy()[ordem], df["Taxa"].to_numpy()[ordem],
+    )
+    return calcular_custos(linhas, metodo)
+
+
+# {(tipo, ativo): Posicao} -> DataFrame ordenado por Tipo e Ativo
+def tabela(posicoes):
+    if not posicoes: return pd.DataFrame(columns=COLUNAS_CUSTOS)
+    chaves = sorted(posicoes)
+    resumo = pd.DataFrame({
+        "Tipo": [tipo for tipo, _ in chaves],
+        "Ativo": [ativo for _, ativo in chaves],
+        "Qtd_Atual": [posicoes[c].quantidade for c in chaves],
+        "Total_Investido": [posicoes[c].investido for c in chaves],
+        "Taxa": [posicoes[c].taxa for c in chaves],
+        "Data_Inicial": pd.to_datetime([posicoes[c].data_inicial for c in chaves]),
+        "Lucro_Realizado": [posicoes[c].realizado for c in chaves],
+    })
+    # Preço Médio só faz sentido para o que ainda tenho
+    tenho = resumo["Qtd_Atual"] > 0
+    resumo.insert(6, "PM", (resumo["Total_Investido"] / resumo["Qtd_Atual"]).where(tenho, 0.0))
+    return resumo
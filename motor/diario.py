@@ -0,0 +1,185 @@
+"""
+================================================================================
+📒 FINANK - DIÁRIO DE LANÇAMENTOS (SÓ ACRESCENTA, NUNCA REESCREVE)
+================================================================================
+Antes, cada nova compra/venda lia a carteira.csv INTEIRA, juntava a linha nova e
+reescrevia o arquivo todo. Com milhares de lançamentos isso fica lento, e se o
+computador desligar no meio da gravação o arquivo pode ficar pela metade.
+
+Agora são dois arquivos:
+1. A "foto" (carteira.csv): o mesmo CSV de sempre, reescrito só de vez em quando.
+2. O "diário" (carteira.csv.diario): cada lançamento novo é ACRESCENTADO no fim,
+   uma linha só, e mandado para o disco na hora (fsync). Salvar custa o mesmo
+   com 10 ou com 1 milhão de lançamentos.
+
+De tempos em tempos (a cada LIMITE_DIARIO lançamentos) o diário é "compactado":
+a foto é regravada com tudo e o diário volta a ficar vazio.
+
+Segurança contra queda de energia: cada linha do diário leva o seu número de
+ordem no livro inteiro (Seq). Se o app cair depois de regravar a foto mas antes
+de esvaziar o diário, na leitura eu descarto as linhas que a foto já contém
+(Seq menor que o número de linhas da foto). Uma linha cortada ao meio no fim
+do diário também é simplesmente ignorada.
+"""
+
+import csv
+import io
+import os
+import threading
+
+import pandas as pd
+
+COLUNAS = ["Data", "Ativo", "Tipo", "Operacao", "Quantidade", "Preco", "Taxa"]
+
+# A cada quantos lançamentos no diário a foto é regravada
+LIMITE_DIARIO = 500
+
+_TRAVA = threading.Lock()
+
+# Próximo Seq de cada livro, para não reler os arquivos a cada lançamento.
+# Vale enquanto os arquivos estiverem do jeito que eu deixei (mesma "assinatura").
+_PROXIMO = {}
+
+
+def caminho_diario(caminho_foto):
+    return caminho_foto + ".diario"
+
+
+# Função Principal 1: Ler o livro inteiro (foto + diário)
+def carregar(caminho_foto):
+    with _TRAVA:
+        foto = _ler_foto(caminho_foto)
+        novos = _ler_diario(caminho_foto, len(foto))
+    if novos.empty: return foto
+    if foto.empty: return novos
+    return pd.concat([foto, novos], ignore_index=True)
+
+
+# Função Principal 2: Acrescentar UM lançamento (dicionário com as COLUNAS)
+def registrar(caminho_foto, lancamento):
+    registrar_varios(caminho_foto, [lancamento])
+
+
+# Vários lançamentos de uma vez (importação): uma gravação e um fsync só
+def registrar_varios(caminho_foto, lancamentos):
+    if not lancamentos: return
+    with _TRAVA:
+        seq, n_diario = _proximo_seq(caminho_foto)
+        caminho = caminho_diario(caminho_foto)
+        with open(caminho, "a+", newline="", encoding="utf-8") as arquivo:
+            # Se a última gravação foi cortada no meio, começo numa linha nova
+            arquivo.seek(0, os.SEEK_END)
+            if arquivo.tell() > 0:
+                arquivo.seek(arquivo.tell() - 1)
+                if arquivo.read(1) != "\n": arquivo.write("\n")
+            escritor = csv.writer(arquivo, lineterminator="\n")
+            for i, lancamento in enumerate(lancamentos):
+                escritor.writerow([seq + i] + [lancamento[c] for c in COLUNAS])
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        n_diario += len(lancamentos)
+        _PROXIMO[caminho_foto] = (_assinatura(caminho_foto), seq + len(lancamentos), n_diario)
+
+        if n_diario >= LIMITE_DIARIO:
+            _compactar(caminho_foto)
+
+
+# Função Principal 3: Regravar a foto com tudo e esvaziar o diário
+def compactar(caminho_foto):
+    with _TRAVA:
+        _compactar(caminho_foto)
+
+
+# Apaga o livro inteiro (botão "Resetar Tudo")
+def apagar(caminho_foto):
+    with _TRAVA:
+        for caminho in (caminho_foto, caminho_diario(caminho_foto)):
+            if os.path.exists(caminho): os.remove(caminho)
+        _PROXIMO.pop(caminho_foto, None)
+
+
+# Muda sempre que o livro muda (tamanho e data de modificação dos dois arquivos)
+def versao(caminho_foto):
+    return _assinatura(caminho_foto)
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Tamanho e data de modificação dos dois arquivos: se mudou, alguém mexeu neles
+def _assinatura(caminho_foto):
+    assinatura = []
+    for caminho in (caminho_foto, caminho_diario(caminho_foto)):
+        try:
+            info = os.stat(caminho)
+            assinatura.append((info.st_size, info.st_mtime_ns))
+        except FileNotFoundError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+# (próximo Seq, linhas válidas no diário)
+def _proximo_seq(caminho_foto):
+    guardado = _PROXIMO.get(caminho_foto)
+    if guardado and guardado[0] == _assinatura(caminho_foto): return guardado[1], guardado[2]
+    n_foto = _contar_linhas_foto(caminho_foto)
+    n_diario = len(_linhas_validas_diario(caminho_foto, n_foto))
+    return n_foto + n_diario, n_diario
+
+
+def _ler_foto(caminho_foto):
+    if not os.path.exists(caminho_foto): return pd.DataFrame(columns=COLUNAS)
+    df = pd.read_csv(caminho_foto)
+    # Garante que a coluna 'Taxa' existe (para compatibilidade com versões antigas)
+    if "Taxa" not in df.columns: df["Taxa"] = 0.0
+    return df
+
+
+# Conta as linhas da foto sem montar um DataFrame (é o que define o próximo Seq)
+def _contar_linhas_foto(caminho_foto):
+    if not os.path.exists(caminho_foto): return 0
+    with open(caminho_foto, "rb") as arquivo:
+        linhas = sum(1 for linha in arquivo if linha.strip())
+    return max(0, linhas - 1) # Tira o cabeçalho
+
+
+# Linhas do diário que ainda não estão na foto (e que não foram cortadas no meio)
+def _linhas_validas_diario(caminho_foto, n_foto):
+    caminho = caminho_diario(caminho_foto)
+    if not os.path.exists(caminho): return []
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        conteudo = arquivo.read()
+    validas = []
+    for linha in csv.reader(io.StringIO(conteudo)):
+        if len(linha) != len(COLUNAS) + 1: continue
+        try: seq = int(linha[0])
+        except ValueError: continue
+        if seq >= n_foto: validas.append(linha[1:])
+    return validas
+
+
+def _ler_diario(caminho_foto, n_foto):
+    linhas = _linhas_validas_diario(caminho_foto, n_foto)
+    if not linhas: return pd.DataFrame(columns=COLUNAS)
+    df = pd.DataFrame(linhas, columns=COLUNAS)
+    for coluna in ("Quantidade", "Preco", "Taxa"):
+        df[coluna] = pd.to_numeric(df[coluna], errors="coerce")
+    return df
+
+
+def _compactar(caminho_foto):
+    foto = _ler_foto(caminho_foto)
+    novos = _ler_diario(caminho_foto, len(foto))
+    if not novos.empty:
+        tudo = novos if foto.empty else pd.concat([foto, novos], ignore_index=True)
+        # Gravo num temporário, mando para o disco e só então troco (troca atômica)
+        temporario = caminho_foto + ".tmp"
+        with open(temporario, "w", newline="", encoding="utf-8") as arquivo:
+            tudo.to_csv(arquivo, index=False)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho_foto)
+    # Foto em dia: o diário pode ser esvaziado (se cair antes, o Seq resolve)
+    with open(caminho_diario(caminho_foto), "w", encoding="utf-8") as arquivo:
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    _PROXIMO.pop(caminho_foto, None)
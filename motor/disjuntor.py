@@ -0,0 +1,134 @@
+"""
+================================================================================
+🔌 FINANK - DISJUNTOR (CIRCUIT BREAKER) POR PROVEDOR
+================================================================================
+Quando o site do Tesouro ou a CoinGecko caem, cada recarga de página tentava de
+novo, esperava o timeout estourar (vários segundos) e só DEPOIS usava o Plano B.
+
+Funciona igual ao disjuntor da sua casa:
+1. FECHADO: tudo normal, as buscas passam.
+2. ABERTO: depois de N falhas seguidas, o disjuntor "desarma". Durante o tempo
+   de resfriamento NENHUMA busca é feita: quem pedir recebe um erro na hora
+   (CircuitoAberto) e a página usa o Plano B ou o último dado bom, sem esperar.
+3. MEIO-ABERTO: acabou o resfriamento, deixo passar UMA busca de teste.
+   Deu certo? Volta a FECHADO. Falhou? ABERTO de novo.
+"""
+
+import copy
+import threading
+import time
+
+FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio-aberto"
+
+# Regras por provedor: (falhas seguidas para abrir, segundos de resfriamento)
+REGRAS = {
+    "tesouro": (2, 120),
+    "coingecko": (3, 60),
+    "alternative_me": (3, 60),
+    "google_news": (3, 60),
+    "yahoo": (3, 60),
+    "bcb": (2, 120),
+}
+REGRA_PADRAO = (3, 60)
+
+
+# O erro que a página recebe quando o disjuntor está aberto
+class CircuitoAberto(Exception):
+    def __init__(self, provedor, segundos_restantes):
+        super().__init__(f"{provedor} indisponível (nova tentativa em {segundos_restantes:.0f}s)")
+        self.provedor = provedor
+        self.segundos_restantes = segundos_restantes
+
+
+class Disjuntor:
+    def __init__(self, nome, limite_falhas=3, resfriamento=60):
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.resfriamento = resfriamento
+        self._estado = FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._testando = False
+        self._trava = threading.Lock()
+
+    # Pergunta: "posso ir à internet agora?"
+    def permite(self):
+        with self._trava:
+            if self._estado == ABERTO and time.monotonic() - self._aberto_em >= self.resfriamento:
+                self._estado = MEIO_ABERTO
+                self._testando = False
+            if self._estado == FECHADO: return True
+            if self._estado == MEIO_ABERTO and not self._testando:
+                self._testando = True # Só UMA busca de teste por vez
+                return True
+            return False
+
+    def registrar_sucesso(self):
+        with self._trava:
+            self._estado, self._falhas, self._testando = FECHADO, 0, False
+
+    def registrar_falha(self):
+        with self._trava:
+            self._falhas += 1
+            if self._estado == MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                self._estado = ABERTO
+                self._aberto_em = time.monotonic()
+            self._testando = False
+
+    def segundos_restantes(self):
+        if self._estado != ABERTO: return 0.0
+        return max(0.0, self.resfriamento - (time.monotonic() - self._aberto_em))
+
+    # Levanta CircuitoAberto se não puder ir à internet agora
+    def verificar(self):
+        if not self.permite(): raise CircuitoAberto(self.nome, self.segundos_restantes())
+
+    # Fotografia do estado (para mostrar na tela)
+    def situacao(self):
+        with self._trava:
+            return {"estado": self._estado, "falhas": self._falhas,
+                    "segundos_restantes": round(self.segundos_restantes())}
+
+
+_DISJUNTORES = {}
+_ULTIMOS_BONS = {}
+_TRAVA = threading.Lock()
+
+
+# Um disjuntor por provedor, compartilhado por todas as sessões
+def obter_disjuntor(provedor):
+    with _TRAVA:
+        if provedor not in _DISJUNTORES:
+            _DISJUNTORES[provedor] = Disjuntor(provedor, *REGRAS.get(provedor, REGRA_PADRAO))
+        return _DISJUNTORES[provedor]
+
+
+# Estado de todos os disjuntores: {provedor: {'estado', 'falhas', 'segundos_restantes'}}
+def estados_disjuntores():
+    with _TRAVA:
+        disjuntores = list(_DISJUNTORES.values())
+    return {d.nome: d.situacao() for d in disjuntores}
+
+
+# --- ÚLTIMO DADO BOM ---
+# Quando uma busca dá certo, a página guarda o resultado aqui.
+# Quando o provedor cai, ela pega de volta o último resultado conhecido.
+def lembrar(chave, valor):
+    with _TRAVA:
+        _ULTIMOS_BONS[chave] = valor
+
+
+def ultimo_bom(chave, padrao=None):
+    with _TRAVA:
+        return copy.deepcopy(_ULTIMOS_BONS.get(chave, padrao))
+
+
+# Fecha todos os disjuntores e esquece os últimos dados bons (testes e benchmarks).
+# Os disjuntores são zerados no lugar: quem já tem a referência continua com o mesmo objeto.
+def limpar_memoria():
+    with _TRAVA:
+        disjuntores = list(_DISJUNTORES.values())
+        _ULTIMOS_BONS.clear()
+    for d in disjuntores:
+        with d._trava:
+            d._estado, d._falhas, d._aberto_em, d._testando = FECHADO, 0, 0.0, False
@@ -0,0 +1,106 @@
+"""
+================================================================================
+📼 FINANK - GRAVAÇÃO E REPRODUÇÃO DAS FONTES EXTERNAS
+================================================================================
+Medir o tempo de uma página com a internet de verdade não dá resultado
+repetível: o Yahoo pode estar lento hoje e rápido amanhã.
+
+Com a variável de ambiente FINANK_GRAVACAO eu escolho o modo:
+1. "gravar": o app funciona normalmente, mas cada resposta do Yahoo, Google News,
+   Tesouro, CoinGecko, alternative.me e Google Tradutor é salva em disco,
+   junto com o tempo que demorou.
+2. "reproduzir": NENHUMA chamada sai para a internet. As respostas vêm das
+   gravações e demoram o mesmo tempo que demoraram na gravação
+   (multiplicado por FINANK_FATOR_LATENCIA).
+3. vazio: desligado (o normal).
+
+Cada chamada vira um arquivo em FINANK_GRAVACOES/<provedor>/<chave>.pkl.
+A chave é a função + os argumentos, então a mesma busca acha a mesma gravação.
+
+Os downloads completos de histórico (motor/historico.py) vão pelo "period" do
+Yahoo ("5d", "1y", "max"...), então a mesma busca gravada hoje serve amanhã.
+
+ATENÇÃO: grave E reproduza com uma pasta FINANK_DADOS limpa. Com o histórico em
+disco já preenchido, o app pede só "as barras a partir da última que eu tenho"
+(start=<data>), e essa data entra na chave: a chamada não bate com nenhuma
+gravação e a reprodução para com GravacaoAusente. Como FINANK_GRAVACOES fica
+dentro de FINANK_DADOS por padrão, aponte as gravações para outra pasta antes
+de limpar os dados.
+"""
+
+import functools
+import os
+import pickle
+import time
+
+from motor.chaves import chave_argumentos, identificar_funcao
+from motor.config import FATOR_LATENCIA, MODO_GRAVACAO, PASTA_GRAVACOES
+
+GRAVAR, REPRODUZIR = "gravar", "reproduzir"
+
+
+# Erro de quando a reprodução pede uma chamada que nunca foi gravada
+class GravacaoAusente(Exception):
+    pass
+
+
+# O Decorador: @gravavel("provedor")
+# Fica em volta da função que REALMENTE vai à internet (e só dela).
+# Com o modo desligado, não faz nada além de chamar a função.
+def gravavel(provedor):
+    def decorador(funcao):
+        id_funcao = identificar_funcao(funcao)
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if MODO_GRAVACAO not in (GRAVAR, REPRODUZIR):
+                return funcao(*args, **kwargs)
+            # O bytecode fica de fora da chave: editar a função não invalida as gravações
+            chave = chave_argumentos((id_funcao[1],) + args, kwargs)
+            caminho = os.path.join(PASTA_GRAVACOES, provedor, f"{chave}.pkl")
+            if MODO_GRAVACAO == REPRODUZIR:
+                return _reproduzir(caminho, provedor, funcao.__qualname__)
+            return _gravar(caminho, funcao, args, kwargs)
+
+        return envoltorio
+    return decorador
+
+
+# --- FUNÇÕES INTERNAS ---
+
+def _gravar(caminho, funcao, args, kwargs):
+    inicio = time.perf_counter()
+    try:
+        resultado, erro = funcao(*args, **kwargs), None
+    except Exception as e:
+        resultado, erro = None, e
+    registro = {"resultado": resultado, "erro": erro, "duracao": time.perf_counter() - inicio}
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    try:
+        conteudo = pickle.dumps(registro)
+    except Exception:
+        # Alguns erros não "viajam" para o disco: guardo só a mensagem
+        registro["erro"] = RuntimeError(repr(erro))
+        conteudo = pickle.dumps(registro)
+    # Escrevo num temporário e renomeio: duas sessões gravando juntas não corrompem o arquivo
+    temporario = f"{caminho}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+    if erro is not None: raise erro
+    return resultado
+
+
+def _reproduzir(caminho, provedor, nome_funcao):
+    try:
+        with open(caminho, "rb") as arquivo:
+            registro = pickle.load(arquivo)
+    except FileNotFoundError:
+        raise GravacaoAusente(f"sem gravação de {provedor}/{nome_funcao} ({os.path.basename(caminho)})")
+
+    # Latência realista: espero o mesmo tempo que a chamada original levou
+    if FATOR_LATENCIA > 0: time.sleep(registro["duracao"] * FATOR_LATENCIA)
+    if registro["erro"] is not None: raise registro["erro"]
+    return registro["resultado"]
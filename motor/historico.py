@@ -0,0 +1,257 @@
+"""
+================================================================================
+📚 FINANK - HISTÓRICO DE PREÇOS EM DISCO (OHLCV)
+================================================================================
+Antes, cada vez que o cache expirava, o sistema baixava de novo a janela
+INTEIRA (ex: 5 anos = ~1.250 candles por ativo), só para ganhar 1 candle novo.
+
+Agora o histórico fica guardado num SQLite local, separado por ativo + intervalo.
+Quando alguém pede um gráfico:
+1. Se o período pedido já está no disco, só peço ao Yahoo as barras DEPOIS da
+   última que eu tenho (normalmente 1 ou 2).
+2. Se nunca vi o ativo (ou o período é maior que o guardado), baixo tudo uma vez.
+3. Como é um arquivo, o histórico sobrevive a um reinício do Streamlit.
+
+DETALHE IMPORTANTE (Ajuste de Dividendos):
+Eu guardo o preço "cru" (sem ajuste) + os dividendos e desdobramentos.
+O preço ajustado é calculado na hora, do mesmo jeito que o Yahoo faz.
+Assim um dividendo novo não "estraga" as barras antigas que já estão no disco.
+"""
+
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from motor.banco import conectar
+from motor.config import FRESCOR_HISTORICO
+from motor import yahoo
+from motor.disjuntor import obter_disjuntor
+from motor.gravacao import GravacaoAusente
+from motor.voo_unico import voo_unico
+
+ARQUIVO_HISTORICO = "historico.db"
+COLUNAS_OHLCV = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+# Tradução do "period" do Yahoo para dias corridos.
+# Períodos em dias ("5d") são contados em PREGÕES, então peço uma folga maior
+# e depois corto só as últimas N barras.
+DIAS_POR_PERIODO = {
+    "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653,
+}
+
+# Os "period" que o próprio Yahoo entende (o resto vira uma data de início)
+PERIODOS_YAHOO = {"1d", "5d", *DIAS_POR_PERIODO, "ytd", "max"}
+
+
+# Função 1: Obter o Histórico de UM ativo
+# Mesmo formato do `yf.Ticker(t).history(period=...)`:
+# índice de datas e colunas Open/High/Low/Close/Volume (+ Dividends/Stock Splits).
+def obter_historico(ticker, periodo="1y", intervalo="1d", ajustado=True):
+    return obter_historicos([ticker], periodo, intervalo, ajustado).get(ticker, pd.DataFrame(columns=COLUNAS_OHLCV))
+
+
+# Função 2: Obter o Histórico de VÁRIOS ativos de uma vez
+# Agrupa quem precisa da mesma "data de início" e faz um download em lote
+# por grupo (normalmente um grupo só: todo mundo parou no mesmo pregão).
+# Sessões pedindo o mesmo histórico ao mesmo tempo dividem uma única busca.
+@voo_unico
+def obter_historicos(tickers, periodo="1y", intervalo="1d", ajustado=True):
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    inicio_desejado = _inicio_periodo(periodo)
+    agora = time.time()
+
+    with closing(conectar(ARQUIVO_HISTORICO)) as con:
+        _criar_tabelas(con)
+        cobertura = _ler_cobertura(con, tickers, intervalo)
+
+        # Decido o que cada ativo precisa: nada, só o "finalzinho" ou tudo.
+        completos, complementos = [], {}
+        for t in tickers:
+            cob = cobertura.get(t)
+            if cob is None or _precisa_recarregar(cob["inicio"], inicio_desejado):
+                completos.append(t)
+            elif agora - cob["atualizado_em"] > FRESCOR_HISTORICO:
+                # Peço a partir da última barra (inclusive), porque a barra de
+                # hoje pode ter sido gravada no meio do pregão.
+                complementos.setdefault(cob["ultima"], []).append(t)
+
+        if completos:
+            # Pelo "period" do Yahoo quando ele existe: a mesma busca amanhã é a mesma chamada
+            # (uma data de início muda todo dia e as gravações de motor/gravacao.py deixariam de servir)
+            novos = _baixar(completos, intervalo, inicio=inicio_desejado, periodo=_periodo_yahoo(periodo))
+            for t, df in novos.items():
+                _substituir(con, t, intervalo, df, inicio_desejado, agora)
+
+        for ultima, grupo in complementos.items():
+            novos = _baixar(grupo, intervalo, inicio=ultima)
+            for t, df in novos.items():
+                if _tem_desdobramento_novo(df, ultima):
+                    # Desdobramento muda TODO o passado: jogo fora e baixo de novo
+                    completo = _baixar([t], intervalo, inicio=cobertura[t]["inicio"],
+                                       periodo="max" if cobertura[t]["inicio"] is None else None).get(t)
+                    if completo is not None: _substituir(con, t, intervalo, completo, cobertura[t]["inicio"], agora)
+                else:
+                    _acrescentar(con, t, intervalo, df, agora)
+
+        resultado = {}
+        for t in tickers:
+            df = _ler(con, t, intervalo, inicio_desejado)
+            if periodo.endswith("d") and periodo[:-1].isdigit():
+                df = df.tail(int(periodo[:-1]))
+            resultado[t] = _aplicar_ajuste(df) if ajustado else df
+    return resultado
+
+
+# Função 3: Menor "period" do Yahoo que cobre desde 'inicio' (ex: a data da primeira compra)
+def periodo_desde(inicio):
+    dias = (pd.Timestamp.today().normalize() - pd.Timestamp(inicio)).days
+    for periodo, dias_periodo in DIAS_POR_PERIODO.items():
+        if dias_periodo >= dias: return periodo
+    return "max"
+
+
+# --- FUNÇÕES INTERNAS ---
+
+def _criar_tabelas(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS ohlcv (
+            ticker TEXT, intervalo TEXT, data TEXT,
+            open REAL, high REAL, low REAL, close REAL, volume REAL,
+            dividendos REAL, desdobramentos REAL,
+            PRIMARY KEY (ticker, intervalo, data)
+        ) WITHOUT ROWID""")
+    # 'inicio' = desde quando eu tenho o histórico completo (NULL = desde sempre)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS cobertura (
+            ticker TEXT, intervalo TEXT, inicio TEXT, atualizado_em REAL,
+            PRIMARY KEY (ticker, intervalo)
+        )""")
+
+
+def _ler_cobertura(con, tickers, intervalo):
+    cobertura = {}
+    for t in tickers:
+        linha = con.execute(
+            "SELECT c.inicio, c.atualizado_em, MAX(o.data) FROM cobertura c "
+            "LEFT JOIN ohlcv o ON o.ticker = c.ticker AND o.intervalo = c.intervalo "
+            "WHERE c.ticker = ? AND c.intervalo = ?", (t, intervalo)).fetchone()
+        if linha and linha[1] is not None and linha[2] is not None:
+            cobertura[t] = {"inicio": linha[0], "atualizado_em": linha[1], "ultima": linha[2][:10]}
+    return cobertura
+
+
+# Converte "1y", "5y" etc. em uma data de início (texto AAAA-MM-DD).
+# None significa "desde o começo" (period="max").
+def _inicio_periodo(periodo):
+    if periodo == "max": return None
+    hoje = pd.Timestamp.today().normalize()
+    if periodo == "ytd": return hoje.replace(month=1, day=1).strftime("%Y-%m-%d")
+    if periodo.endswith("d") and periodo[:-1].isdigit():
+        dias = int(periodo[:-1]) * 2 + 7 # Folga para fins de semana e feriados
+    else:
+        dias = DIAS_POR_PERIODO.get(periodo, 366)
+    return (hoje - pd.Timedelta(days=dias)).strftime("%Y-%m-%d")
+
+
+# "5d", "1y", "ytd", "max"... o Yahoo entende direto; "30d" e outros viram data de início (None)
+def _periodo_yahoo(periodo):
+    return periodo if periodo in PERIODOS_YAHOO else None
+
+
+# O que está no disco só serve se começar ANTES (ou junto) do período pedido.
+def _precisa_recarregar(inicio_guardado, inicio_desejado):
+    if inicio_guardado is None: return False # Já tenho desde sempre
+    if inicio_desejado is None: return True  # Pediram "max" e eu não tenho
+    return inicio_desejado < inicio_guardado
+
+
+# Único ponto do arquivo que fala com o Yahoo.
+# Devolve {ticker: DataFrame cru}, só para quem veio com dados.
+# Com o disjuntor do Yahoo aberto, nem tento: sirvo direto o que está no disco.
+# Reproduzindo sem a gravação pedida, o erro sobe: um histórico vazio esconderia o problema.
+# Resposta vazia só conta como falha do Yahoo se o motivo foi a rede (código sem dados não é).
+def _baixar(tickers, intervalo, inicio=None, periodo=None):
+    disjuntor = obter_disjuntor("yahoo")
+    if not disjuntor.permite(): return {}
+    try:
+        dados = yahoo.download(
+            tickers, start=None if periodo else inicio, period=periodo, interval=intervalo,
+            auto_adjust=False, actions=True, group_by="ticker", progress=False, threads=True
+        )
+    except GravacaoAusente: raise
+    except Exception:
+        disjuntor.registrar_falha()
+        return {} # Sem internet? Uso o que já tenho no disco.
+    if dados is None or dados.empty:
+        motivos = getattr(dados, "attrs", {}).get("erros", {}).values()
+        if any(yahoo.falha_de_rede(m) for m in motivos): disjuntor.registrar_falha()
+        else: disjuntor.registrar_sucesso()
+        return {}
+    disjuntor.registrar_sucesso()
+
+    resultado = {}
+    for t in tickers:
+        if isinstance(dados.columns, pd.MultiIndex):
+            if t not in dados.columns.get_level_values(0): continue
+            df = dados[t]
+        else:
+            df = dados
+        df = df.reindex(columns=COLUNAS_OHLCV).dropna(subset=["Close"])
+        if df.empty: continue
+        if df.index.tz is not None: df.index = df.index.tz_localize(None)
+        resultado[t] = df
+    return resultado
+
+
+def _tem_desdobramento_novo(df, ultima):
+    splits = df["Stock Splits"].fillna(0)
+    novos = splits[(splits != 0) & (df.index > pd.Timestamp(ultima))]
+    return not novos.empty
+
+
+def _linhas(ticker, intervalo, df):
+    datas = df.index.strftime("%Y-%m-%d %H:%M:%S")
+    valores = df[COLUNAS_OHLCV].astype(float).fillna({"Dividends": 0.0, "Stock Splits": 0.0})
+    return [(ticker, intervalo, d, *[None if pd.isna(v) else v for v in vals])
+            for d, vals in zip(datas, valores.itertuples(index=False, name=None))]
+
+
+def _substituir(con, ticker, intervalo, df, inicio, agora):
+    with con:
+        con.execute("DELETE FROM ohlcv WHERE ticker = ? AND intervalo = ?", (ticker, intervalo))
+        con.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?,?,?,?,?,?,?,?,?,?)", _linhas(ticker, intervalo, df))
+        con.execute("INSERT OR REPLACE INTO cobertura VALUES (?,?,?,?)", (ticker, intervalo, inicio, agora))
+
+
+def _acrescentar(con, ticker, intervalo, df, agora):
+    with con:
+        con.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?,?,?,?,?,?,?,?,?,?)", _linhas(ticker, intervalo, df))
+        con.execute("UPDATE cobertura SET atualizado_em = ? WHERE ticker = ? AND intervalo = ?", (agora, ticker, intervalo))
+
+
+def _ler(con, ticker, intervalo, inicio):
+    sql = ("SELECT data, open, high, low, close, volume, dividendos, desdobramentos FROM ohlcv "
+           "WHERE ticker = ? AND intervalo = ?")
+    parametros = [ticker, intervalo]
+    if inicio is not None:
+        sql += " AND data >= ?"
+        parametros.append(inicio)
+    linhas = con.execute(sql + " ORDER BY data", parametros).fetchall()
+    df = pd.DataFrame(linhas, columns=["Date"] + COLUNAS_OHLCV)
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date")
+    return df.astype(float)
+
+
+# Ajuste de Dividendos (igual ao "Adj Close" do Yahoo):
+# em cada data-com, tudo que veio ANTES é multiplicado por (1 - dividendo / fechamento anterior).
+def _aplicar_ajuste(df):
+    if df.empty or not (df["Dividends"] > 0).any(): return df
+    fech_anterior = df["Close"].shift(1)
+    fator_evento = (1 - df["Dividends"] / fech_anterior).where(df["Dividends"] > 0, 1.0).fillna(1.0)
+    # Fator acumulado "de trás pra frente", aplicado às barras anteriores a cada evento
+    fator = fator_evento[::-1].cumprod()[::-1].shift(-1, fill_value=1.0).to_numpy()
+    ajustado = df.copy()
+    for col in ["Open", "High", "Low", "Close"]:
+        ajustado[col] = df[col].to_numpy() * fator
+    return ajustado
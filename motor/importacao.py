@@ -0,0 +1,304 @@
+"""
+================================================================================
+📥 FINANK - IMPORTAÇÃO EM LOTE (CSV, EXCEL, PARQUET E NOTAS DA B3)
+================================================================================
+Lançar anos de notas de corretagem pelo formulário, uma operação por vez, não
+dá. Aqui um arquivo inteiro vira lançamentos de uma vez só:
+
+1. Leitura em PEDAÇOS (TAMANHO_PEDACO linhas por vez): um arquivo enorme nunca
+   fica inteiro na memória (o Excel é a exceção: o pandas lê a planilha toda).
+2. Colunas: cada arquivo chama as coisas de um jeito ("Data do Negócio",
+   "Código de Negociação", "Tipo de Movimentação"...). Os nomes conhecidos
+   viram as colunas da carteira: Data, Ativo, Tipo, Operacao, Quantidade,
+   Preco e Taxa. Números no formato brasileiro ("R$ 1.234,56") também.
+   "1.000" sem vírgula é mil num arquivo brasileiro (separado por ";" ou com
+   vírgula nos decimais) e 1,0 num arquivo com ponto nos decimais. Isso é
+   decidido UMA vez para o arquivo inteiro (uma passada só pelas colunas de
+   números antes de ler os pedaços), e não pedaço a pedaço. Se o arquivo não
+   deixar claro qual dos dois, a importação para com um erro em vez de adivinhar.
+   O extrato de negociação da B3 (Área do Investidor) já sai certo, inclusive
+   o mercado fracionário ("PETR4F" vira "PETR4").
+3. Repetidos: cada lançamento tem uma "impressão digital" (um hash do conteúdo).
+   Se o arquivo já foi importado antes, as linhas dele já estão no livro e são
+   puladas. Duas compras IGUAIS no mesmo dia continuam valendo: conto quantas
+   vezes cada impressão aparece no arquivo e quantas já existem no livro, e só
+   entra o que passar disso.
+4. Gravação: tudo numa transação só (motor/armazenamento.py). Se algo der
+   errado no meio, nada do arquivo fica gravado pela metade.
+
+Excel (.xlsx) precisa do pacote opcional openpyxl; Parquet, do pyarrow.
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from motor.diario import COLUNAS
+
+TAMANHO_PEDACO = 10_000
+
+# Nome da coluna (sem acento, minúsculo) -> coluna da carteira
+APELIDOS = {
+    "Data": ("data", "data do negocio", "data da operacao", "data pregao", "data do pregao", "date"),
+    "Ativo": ("ativo", "codigo de negociacao", "codigo", "ticker", "papel", "produto", "titulo", "symbol"),
+    "Tipo": ("tipo", "categoria", "classe", "tipo de ativo"),
+    "Operacao": ("operacao", "tipo de movimentacao", "movimentacao", "compra/venda", "c/v", "natureza", "side"),
+    "Quantidade": ("quantidade", "qtd", "qtde", "quantity"),
+    "Preco": ("preco", "preco unitario", "preco medio", "valor unitario", "price"),
+    "Taxa": ("taxa", "taxa contratada", "rentabilidade"),
+}
+
+OBRIGATORIAS = ["Data", "Ativo", "Operacao", "Quantidade", "Preco"]
+
+# Categorias da carteira, do jeito que aparecem escritas nos arquivos
+CATEGORIAS = {
+    "acao": "Ação", "acoes": "Ação", "fii": "FII", "fiis": "FII", "etf": "ETF", "etfs": "ETF",
+    "bdr": "BDR", "bdrs": "BDR", "cripto": "Cripto", "criptomoeda": "Cripto",
+    "tesouro": "Tesouro Direto", "tesouro direto": "Tesouro Direto", "renda fixa": "Renda Fixa",
+}
+
+# ETFs mais comuns da B3 (terminam em 11 como os FIIs; o resto que termina em 11 vira FII)
+ETFS_CONHECIDOS = {"BOVA11", "IVVB11", "SMAL11", "HASH11", "GOLD11", "DIVO11", "SPXI11", "NASD11",
+                   "ECOO11", "BOVV11", "XINA11", "ACWI11", "QBTC11", "ETHE11", "FIND11", "MATB11"}
+
+# Units de empresas (ações + preferenciais num papel só): também terminam em 11, mas são Ação
+UNITS_CONHECIDAS = {"TAEE11", "KLBN11", "SANB11", "BPAC11", "ALUP11", "ENGI11", "SAPR11", "SULA11",
+                    "IGTI11", "BRBI11", "RNEW11", "CPLE11", "TIET11", "BIDI11", "STBP11", "PPLA11"}
+
+# Categoria de quem não tem coluna Tipo, não foi escolhida na página e não tem um código reconhecido
+TIPO_NAO_RECONHECIDO = "Renda Fixa"
+
+
+# Função Principal 1: Arquivo (caminho ou arquivo aberto) -> pedaços de DataFrame do jeito que vieram
+# 'nome' diz o formato quando 'origem' é um arquivo enviado pela página (ex: "negociacao.xlsx")
+# Cada pedaço leva em attrs["virgula_decimal"] o formato dos números do ARQUIVO (ver _virgula_decimal).
+def ler_extrato(origem, nome=None, tamanho=None):
+    nome = str(nome or getattr(origem, "name", origem)).lower()
+    tamanho = tamanho or TAMANHO_PEDACO
+    if nome.endswith((".xlsx", ".xlsm", ".xls")):
+        try: planilha = pd.read_excel(origem)
+        except ImportError as erro: raise ValueError("Para importar planilhas do Excel instale o openpyxl (pip install openpyxl).") from erro
+        yield from _fatiar(planilha, tamanho)
+    elif nome.endswith(".parquet"):
+        try: import pyarrow.parquet as pq
+        except ImportError:
+            try: tabela = pd.read_parquet(origem)
+            except ImportError as erro: raise ValueError("Para importar Parquet instale o pyarrow (pip install pyarrow).") from erro
+            yield from _fatiar(tabela, tamanho)
+            return
+        arquivo = pq.ParquetFile(origem)
+        numericas = _colunas_numericas(arquivo.schema_arrow.names)
+        virgula = _virgula_do_arquivo(
+            lote.to_pandas() for lote in arquivo.iter_batches(batch_size=tamanho, columns=numericas)
+        ) if numericas else None
+        for lote in arquivo.iter_batches(batch_size=tamanho):
+            pedaco = lote.to_pandas()
+            pedaco.attrs["virgula_decimal"] = virgula
+            yield pedaco
+    else:
+        # Tudo como texto: os números em formato brasileiro são convertidos em padronizar()
+        separador, codificacao = _formato_csv(origem)
+        inicio = origem.tell() if hasattr(origem, "read") else None
+        def ler(**opcoes):
+            if inicio is not None: origem.seek(inicio) # Arquivo aberto: cada leitura volta ao começo
+            return pd.read_csv(origem, sep=separador, encoding=codificacao, dtype=str, **opcoes)
+
+        # Separado por ";" é brasileiro. Senão, uma passada só pelas colunas de números decide
+        virgula = True if separador == ";" else None
+        numericas = _colunas_numericas(ler(nrows=0).columns) if virgula is None else []
+        if numericas:
+            # "with": o leitor largado no meio não pode fechar o arquivo aberto de quem chamou
+            with ler(usecols=numericas, chunksize=tamanho) as leitor: virgula = _virgula_do_arquivo(leitor)
+        with ler(chunksize=tamanho) as leitor:
+            for pedaco in leitor:
+                pedaco.attrs["virgula_decimal"] = virgula
+                yield pedaco
+
+
+# Função Principal 2: Um pedaço cru -> (lançamentos nas colunas da carteira, linhas descartadas,
+# linhas que entraram como TIPO_NAO_RECONHECIDO por não ter categoria nem código conhecido)
+# Descarto linhas sem data, ativo, quantidade ou preço, e movimentações que não são Compra/Venda.
+# 'tipo_padrao' é a categoria de tudo quando o arquivo não tem essa coluna (senão eu deduzo pelo código).
+def padronizar(bruto, tipo_padrao=None):
+    colunas = _mapear_colunas(bruto.columns)
+    faltando = [c for c in OBRIGATORIAS if c not in colunas]
+    if faltando: raise ValueError(f"Não achei no arquivo as colunas: {', '.join(faltando)}")
+
+    df = pd.DataFrame(index=bruto.index)
+    df["Data"] = _datas(bruto[colunas["Data"]])
+    ativo = bruto[colunas["Ativo"]].astype(str).str.strip().str.upper()
+    df["Ativo"] = ativo.str.replace(r"^([A-Z0-9]{4}\d{1,2})F$", r"\1", regex=True) # Mercado fracionário
+    deduzido = inferir_tipo(df["Ativo"])
+    if "Tipo" in colunas:
+        escrito = bruto[colunas["Tipo"]].map(_sem_acento).map(CATEGORIAS)
+        df["Tipo"] = escrito.fillna(deduzido)
+        sem_categoria = escrito.isna() & deduzido.isna()
+    else:
+        df["Tipo"] = tipo_padrao or deduzido
+        sem_categoria = deduzido.isna() & (tipo_padrao is None)
+    df["Tipo"] = df["Tipo"].fillna(TIPO_NAO_RECONHECIDO)
+    operacao = bruto[colunas["Operacao"]].map(_sem_acento)
+    df["Operacao"] = np.select(
+        [operacao.str.match(r"^(c|compra|buy)\b", na=False), operacao.str.match(r"^(v|venda|sell)\b", na=False)],
+        ["Compra", "Venda"], default=None)
+    # O formato dos números vem do arquivo inteiro (ler_extrato); um DataFrame solto decide sozinho
+    if "virgula_decimal" in bruto.attrs: virgula = bruto.attrs["virgula_decimal"]
+    else: virgula = _virgula_decimal([bruto[c] for c in _colunas_numericas(bruto.columns)])
+    df["Quantidade"] = _numeros(bruto[colunas["Quantidade"]], virgula, "Quantidade").abs()
+    df["Preco"] = _numeros(bruto[colunas["Preco"]], virgula, "Preco").abs()
+    df["Taxa"] = _numeros(bruto[colunas["Taxa"]], virgula, "Taxa").fillna(0.0) if "Taxa" in colunas else 0.0
+
+    valido = df[["Data", "Operacao", "Quantidade", "Preco"]].notna().all(axis=1) & (df["Quantidade"] > 0)
+    valido &= df["Ativo"].ne("") & df["Ativo"].ne("NAN")
+    return df.loc[valido, COLUNAS].reset_index(drop=True), int((~valido).sum()), int((sem_categoria & valido).sum())
+
+
+# Categoria pelo código (sem a coluna Tipo no arquivo): PETR4 -> Ação, MXRF11 -> FII, AAPL34 -> BDR...
+# Código que não parece com nenhum -> NaN (quem chama decide o que fazer)
+def inferir_tipo(ativos):
+    ativos = ativos.astype(str)
+    tipos = np.select(
+        [ativos.isin(ETFS_CONHECIDOS), ativos.isin(UNITS_CONHECIDAS), ativos.str.match(r"^[A-Z0-9]{4}3[2-5]$"),
+         ativos.str.match(r"^[A-Z0-9]{4}11$"), ativos.str.match(r"^[A-Z0-9]{4}\d{1,2}$"), ativos.str.startswith("TESOURO"),
+         ativos.str.contains("-USD", regex=False)],
+        ["ETF", "Ação", "BDR", "FII", "Ação", "Tesouro Direto", "Cripto"], default="")
+    return pd.Series(tipos, index=ativos.index).replace("", np.nan)
+
+
+# Impressão digital de cada lançamento (um inteiro de 64 bits por linha, tudo vetorizado).
+# Normalizo antes (data ISO, código em maiúsculas, números arredondados), como o livro guarda.
+def impressoes(df):
+    if df.empty: return np.empty(0, dtype=np.int64)
+    normal = pd.DataFrame({
+        "Data": pd.to_datetime(df["Data"]).dt.strftime("%Y-%m-%d"),
+        "Ativo": df["Ativo"].astype(str).str.upper(),
+        "Tipo": df["Tipo"].astype(str),
+        "Operacao": df["Operacao"].astype(str),
+        "Quantidade": df["Quantidade"].astype(float).round(8),
+        "Preco": df["Preco"].astype(float).round(8),
+        "Taxa": df["Taxa"].astype(float).fillna(0.0).round(8),
+    })
+    return pd.util.hash_pandas_object(normal, index=False).to_numpy().view(np.int64)
+
+
+# Separa o que ainda não está no livro.
+# 'contar_existentes(hashes)' -> {hash: quantas vezes já está no livro} (só dos hashes que eu ainda não vi)
+# 'vistos' guarda, entre um pedaço e outro do mesmo arquivo: hash -> [já no livro, já apareceu no arquivo]
+def filtrar_repetidos(df, contar_existentes, vistos):
+    hashes = pd.Series(impressoes(df), index=df.index)
+    novos = [h for h in hashes.unique().tolist() if h not in vistos]
+    existentes = contar_existentes(novos) if novos else {}
+    for h in novos: vistos[h] = [existentes.get(h, 0), 0]
+
+    # N-ésima vez que a impressão aparece no arquivo (contando os pedaços anteriores)
+    ja_no_livro = hashes.map(lambda h: vistos[h][0])
+    ocorrencia = hashes.groupby(hashes).cumcount() + hashes.map(lambda h: vistos[h][1])
+    for h, vezes in hashes.value_counts().items(): vistos[h][1] += vezes
+    manter = (ocorrencia >= ja_no_livro).to_numpy()
+    return df[manter], hashes[manter].to_numpy()
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# "Preço Unitário (R$)" -> "preco unitario (r$)" -> sem o que está entre parênteses
+def _sem_acento(texto):
+    if not isinstance(texto, str): return texto
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"\(.*?\)", " ", texto).split())
+
+
+# {coluna da carteira: coluna do arquivo} (a primeira coluna que bater com um apelido)
+def _mapear_colunas(colunas):
+    limpas = {_sem_acento(str(c)): c for c in colunas}
+    mapa = {}
+    for padrao, apelidos in APELIDOS.items():
+        for apelido in apelidos:
+            if apelido in limpas:
+                mapa[padrao] = limpas[apelido]
+                break
+    return mapa
+
+
+# "05/01/2024", "2024-01-05" ou datas de verdade (Excel/Parquet) -> datetime (inválida vira NaT)
+def _datas(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie): return serie.dt.normalize()
+    texto = serie.astype(str).str.strip()
+    brasileiro = texto.str.match(r"^\d{1,2}/\d{1,2}/\d{4}")
+    datas = pd.to_datetime(texto.where(~brasileiro).str[:10], format="%Y-%m-%d", errors="coerce")
+    if brasileiro.any():
+        datas[brasileiro] = pd.to_datetime(texto[brasileiro].str[:10], format="%d/%m/%Y", errors="coerce")
+    return datas
+
+
+# Colunas do arquivo que têm números (Quantidade, Preço e Taxa), com o nome que elas têm no arquivo
+def _colunas_numericas(colunas):
+    mapa = _mapear_colunas(colunas)
+    return [mapa[c] for c in ("Quantidade", "Preco", "Taxa") if c in mapa]
+
+
+# Um DataFrame inteiro (Excel, Parquet sem pyarrow) em pedaços, todos com o formato dos números da tabela
+def _fatiar(tabela, tamanho):
+    virgula = _virgula_decimal([tabela[c] for c in _colunas_numericas(tabela.columns)])
+    for inicio in range(0, len(tabela), tamanho):
+        pedaco = tabela.iloc[inicio:inicio + tamanho]
+        pedaco.attrs["virgula_decimal"] = virgula
+        yield pedaco
+
+
+# O primeiro pedaço que deixa claro o formato decide o arquivo todo (None: nenhum deixou)
+def _virgula_do_arquivo(pedacos):
+    for pedaco in pedacos:
+        virgula = _virgula_decimal([pedaco[c] for c in pedaco.columns])
+        if virgula is not None: return virgula
+    return None
+
+
+# O arquivo usa vírgula nos decimais? True (algum número com vírgula),
+# False (algum número com ponto que NÃO pode ser milhar: "10.5", "0.125", "3.14159") ou None (não dá para saber)
+def _virgula_decimal(colunas):
+    textos = [_texto_numerico(c) for c in colunas if not pd.api.types.is_numeric_dtype(c)]
+    if not textos: return None
+    texto = pd.concat(textos)
+    if texto.str.contains(",", regex=False).any(): return True
+    if texto.str.match(r"^-?(\d+\.(\d{1,2}|\d{4,})|0\.\d+)$").any(): return False
+    return None
+
+
+# "R$ 1.234,56" -> 1234.56 | "10.5" -> 10.5 | texto inválido -> NaN
+# "1.000" depende do arquivo ('virgula_decimal'): mil, um, ou erro quando não dá para saber
+def _numeros(serie, virgula_decimal=None, coluna=""):
+    if pd.api.types.is_numeric_dtype(serie): return serie.astype(float)
+    texto = _texto_numerico(serie)
+    milhar = texto.str.match(r"^-?[1-9]\d{0,2}(\.\d{3})+$")
+    if virgula_decimal is None and milhar.any():
+        raise ValueError(
+            f"Não sei se \"{texto[milhar].iloc[0]}\" (coluna {coluna}) é mil ou um número com ponto decimal. "
+            "Use vírgula nos decimais (1.000,00) ou ponto sem separador de milhar (1000.00).")
+    brasileiro = texto.str.contains(",", regex=False) | (milhar & bool(virgula_decimal))
+    texto = texto.where(~brasileiro, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def _texto_numerico(serie):
+    return serie.astype(str).str.replace(r"[R$\s]", "", regex=True)
+
+
+# Separador (";" no Excel brasileiro, "," no resto) e codificação (UTF-8 ou Latin-1), pelo começo do arquivo
+def _formato_csv(origem):
+    if hasattr(origem, "read"):
+        posicao = origem.tell()
+        amostra = origem.read(65536)
+        origem.seek(posicao)
+    else:
+        with open(origem, "rb") as arquivo: amostra = arquivo.read(65536)
+    if isinstance(amostra, str): amostra = amostra.encode("utf-8")
+
+    try: texto, codificacao = amostra.decode("utf-8-sig"), "utf-8-sig"
+    except UnicodeDecodeError as erro:
+        # Um acento cortado no fim da amostra não quer dizer que o arquivo não é UTF-8
+        if erro.start >= len(amostra) - 3: texto, codificacao = amostra[:erro.start].decode("utf-8-sig"), "utf-8-sig"
+        else: texto, codificacao = amostra.decode("latin-1"), "latin-1"
+    cabecalho = texto.splitlines()[0] if texto else ""
+    return (";" if cabecalho.count(";") > cabecalho.count(",") else ","), codificacao
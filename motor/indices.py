@@ -0,0 +1,181 @@
+"""
+================================================================================
+📊 FINANK - ÍNDICES DA RENDA FIXA (CDI, SELIC E IPCA) EM DISCO
+================================================================================
+Um CDB de "110% do CDI" ou um título "IPCA + 6%" só pode ser avaliado com o
+histórico do índice desde o dia da compra. As séries vêm do Banco Central
+(API SGS, gratuita e sem cadastro):
+
+- CDI   (série 12):  taxa de CADA dia útil, em % ao dia.
+- SELIC (série 11):  taxa de CADA dia útil, em % ao dia.
+- IPCA  (série 433): inflação de CADA mês, em % ao mês.
+
+Igual ao histórico de preços (motor/historico.py), tudo fica num SQLite local
+(indices.db): na primeira vez eu baixo desde a data pedida; depois, no máximo
+a cada FRESCOR_INDICES segundos, só pergunto o que saiu DEPOIS do último dia
+guardado. Se o Banco Central estiver fora, uso o que já tenho.
+
+A trava só protege a leitura e a gravação no SQLite: uma resposta lenta do
+Banco Central não segura quem só precisa do que já está no disco. Sessões
+pedindo a mesma série ao mesmo tempo dividem um download só (motor/voo_unico.py).
+
+O que sai daqui é sempre a taxa de cada DIA ÚTIL (motor/calendario.py). O IPCA
+do mês é espalhado pelos dias úteis do mês (pro rata, como no Tesouro IPCA+).
+Dias ainda sem número publicado (o CDI sai no dia seguinte, o IPCA no mês
+seguinte) repetem a última taxa conhecida; sem nenhuma, uso PROJECOES.
+"""
+
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from motor import calendario, cliente_http
+from motor.banco import conectar
+from motor.config import FRESCOR_INDICES
+from motor.voo_unico import voo_unico
+
+ARQUIVO_INDICES = "indices.db"
+
+# Nome -> código da série no SGS do Banco Central
+SERIES = {"CDI": 12, "SELIC": 11, "IPCA": 433}
+MENSAIS = {"IPCA"}
+
+# Taxas anuais (%) para quando não existe nenhum número guardado (primeiro uso sem internet)
+PROJECOES = {"CDI": 10.5, "SELIC": 10.6, "IPCA": 4.5}
+
+URL_SGS = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados"
+
+# O SGS só aceita janelas de até 10 anos por pedido nas séries diárias
+_ANOS_POR_PEDIDO = 10
+
+_TRAVA = threading.Lock()
+
+
+# Função Principal: taxa de cada dia útil (em decimal: 0.0004 = 0,04% no dia) de 'inicio' até 'fim'
+# Devolve uma Series com os dias úteis no índice.
+def taxas_diarias(nome, inicio, fim):
+    dias = calendario.pregoes(inicio, fim)
+    if len(dias) == 0: return pd.Series(dtype=float)
+    serie = obter_serie(nome, min(dias[0], pd.Timestamp(inicio)) - pd.DateOffset(months=1))
+
+    if nome in MENSAIS:
+        # % ao mês -> taxa de cada dia útil do mês: (1 + mês)^(1 / dias úteis do mês) - 1
+        meses = dias.to_period("M")
+        mensal = serie.copy()
+        mensal.index = pd.DatetimeIndex(mensal.index).to_period("M")
+        taxa_mes = pd.Series(meses, index=dias).map(mensal / 100)
+        taxa_mes = taxa_mes.ffill().fillna(_projecao_mensal(nome, serie))
+        uteis_no_mes = pd.Series(meses).map(_dias_uteis_por_mes(meses)).to_numpy()
+        return pd.Series((1 + taxa_mes.to_numpy()) ** (1 / uteis_no_mes) - 1, index=dias)
+
+    taxa = (serie / 100).reindex(serie.index.union(dias)).ffill().reindex(dias)
+    projecao = serie.iloc[-1] / 100 if not serie.empty else (1 + PROJECOES[nome] / 100) ** (1 / calendario.DIAS_UTEIS_ANO) - 1
+    return taxa.fillna(projecao)
+
+
+# A série guardada desde 'inicio' (índice: datas; valores: % do dia ou % do mês, como o BC publica).
+# Baixa do Banco Central só o que falta.
+def obter_serie(nome, inicio):
+    inicio = pd.Timestamp(inicio).normalize()
+    _atualizar(nome, inicio)
+    with _TRAVA, closing(conectar(ARQUIVO_INDICES)) as con:
+        linhas = pd.read_sql_query("SELECT data, valor FROM indices WHERE serie = ? AND data >= ? ORDER BY data",
+                                   con, params=(nome, inicio.strftime("%Y-%m-%d")))
+    return pd.Series(linhas["valor"].to_numpy(dtype=float), index=pd.DatetimeIndex(pd.to_datetime(linhas["data"])))
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Baixa o que falta da série desde 'inicio' e grava. A ida ao Banco Central fica FORA da trava.
+@voo_unico
+def _atualizar(nome, inicio):
+    hoje = pd.Timestamp.today().normalize()
+    with _TRAVA, closing(conectar(ARQUIVO_INDICES)) as con:
+        _criar_tabelas(con)
+        cobertura = _ler_cobertura(con, nome)
+    guardado_desde = pd.Timestamp(cobertura[0]) if cobertura else None
+
+    # (de, até, é o pedaço de trás?): só o pedaço de trás que deu certo muda o 'inicio' da cobertura
+    pedidos = []
+    if guardado_desde is None or inicio < guardado_desde:
+        # Nunca baixei (ou pediram mais para trás): baixo do início pedido até onde já tenho
+        pedidos.append((inicio, hoje if guardado_desde is None else guardado_desde, True))
+    if guardado_desde is not None and time.time() - cobertura[1] > FRESCOR_INDICES:
+        # Peço de novo a partir do último dia guardado (o BC pode ter corrigido o último número)
+        pedidos.append((pd.Timestamp(cobertura[2] or guardado_desde), hoje, False))
+
+    baixados = []
+    for de, ate, de_tras in pedidos:
+        novos = _baixar(nome, de, ate)
+        if novos is not None: baixados.append((de_tras, novos)) # None: Banco Central fora, fico com o que tenho
+    if not baixados: return
+
+    with _TRAVA, closing(conectar(ARQUIVO_INDICES)) as con, con:
+        for _, novos in baixados:
+            con.executemany("INSERT OR REPLACE INTO indices VALUES (?, ?, ?)",
+                            [(nome, data.strftime("%Y-%m-%d"), float(valor)) for data, valor in novos.items()])
+        # Releio a cobertura: outra sessão (com outro 'inicio') pode ter gravado enquanto eu baixava
+        cobertura = _ler_cobertura(con, nome)
+        novo_inicio = pd.Timestamp(cobertura[0]) if cobertura else None
+        if any(de_tras for de_tras, _ in baixados):
+            novo_inicio = inicio if novo_inicio is None else min(inicio, novo_inicio)
+        if novo_inicio is None: return
+        # Do início até hoje (primeira vez) ou o pedido do fim: a série está em dia
+        atualizou = any(not de_tras or guardado_desde is None for de_tras, _ in baixados)
+        con.execute("INSERT OR REPLACE INTO indices_cobertura VALUES (?, ?, ?)",
+                    (nome, novo_inicio.strftime("%Y-%m-%d"), time.time() if atualizou else cobertura[1]))
+
+
+# (desde quando a série está completa, quando foi atualizada, último dia guardado) ou None
+def _ler_cobertura(con, nome):
+    cobertura = con.execute(
+        "SELECT c.inicio, c.atualizado_em, MAX(i.data) FROM indices_cobertura c "
+        "LEFT JOIN indices i ON i.serie = c.serie WHERE c.serie = ?", (nome,)).fetchone()
+    return cobertura if cobertura and cobertura[0] else None
+
+
+# Único ponto do arquivo que fala com o Banco Central: {data: valor} ou None se falhou
+def _baixar(nome, inicio, fim):
+    partes = []
+    de = inicio
+    try:
+        while de <= fim:
+            ate = min(fim, de + pd.DateOffset(years=_ANOS_POR_PEDIDO) - pd.Timedelta(days=1))
+            resposta = cliente_http.get("bcb", URL_SGS.format(codigo=SERIES[nome]), params={
+                "formato": "json", "dataInicial": de.strftime("%d/%m/%Y"), "dataFinal": ate.strftime("%d/%m/%Y"),
+            })
+            if resposta.status_code == 404: pass # Janela sem nenhum número publicado
+            elif resposta.status_code != 200: return None
+            else: partes.extend(resposta.json())
+            de = ate + pd.Timedelta(days=1)
+    except Exception: return None
+    if not partes: return pd.Series(dtype=float)
+    tabela = pd.DataFrame(partes)
+    return pd.Series(pd.to_numeric(tabela["valor"], errors="coerce").to_numpy(),
+                     index=pd.to_datetime(tabela["data"], format="%d/%m/%Y")).dropna()
+
+
+# {mês: dias úteis do mês}, para os meses pedidos
+def _dias_uteis_por_mes(meses):
+    unicos = pd.PeriodIndex(meses.unique())
+    inicios = unicos.to_timestamp(how="start")
+    fins = (unicos + 1).to_timestamp(how="start")
+    return dict(zip(unicos, calendario.dias_uteis(inicios, fins)))
+
+
+# Taxa do mês para os meses ainda sem IPCA publicado: o último publicado (ou a projeção anual)
+def _projecao_mensal(nome, serie):
+    if not serie.empty: return serie.iloc[-1] / 100
+    return (1 + PROJECOES[nome] / 100) ** (1 / 12) - 1
+
+
+def _criar_tabelas(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS indices (
+            serie TEXT, data TEXT, valor REAL,
+            PRIMARY KEY (serie, data)
+        ) WITHOUT ROWID""")
+    # 'inicio' = desde quando a série está completa no disco
+    con.execute("CREATE TABLE IF NOT EXISTS indices_cobertura (serie TEXT PRIMARY KEY, inicio TEXT, atualizado_em REAL)")
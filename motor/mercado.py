@@ -0,0 +1,134 @@
+"""
+================================================================================
+📡 FINANK - PROVEDOR DE COTAÇÕES EM LOTE
+================================================================================
+Antes, cada página criava um `yf.Tickers` e pedia o `.history()` de um ativo
+por vez. Resultado: uma viagem ao Yahoo para CADA código (Home + Ações + Cripto
+somavam ~30 chamadas em sequência).
+
+Aqui eu faço UM download só para a lista inteira e devolvo um "painel" de
+preços: uma tabela com as datas nas linhas e um ativo por coluna.
+
+E o mais importante: se um código der errado, eu conto QUAL deu errado e POR
+QUÊ, em vez de esconder tudo num `except: pass` e zerar o bloco inteiro.
+"""
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from motor import yahoo
+from motor.disjuntor import obter_disjuntor
+from motor.voo_unico import voo_unico
+
+
+# Função 1: Baixar o Painel de Preços (Download em Lote)
+# Recebe uma lista de códigos e devolve (painel, erros):
+# - painel: DataFrame com as datas no índice e um ativo por coluna.
+# - erros: dicionário {ticker: motivo} só com quem falhou.
+# Pedidos iguais feitos ao mesmo tempo por sessões diferentes viram UM download.
+@voo_unico
+def baixar_precos(simbolos, periodo="2d", intervalo="1d", campo="Close", auto_ajuste=True):
+    # Removo repetidos mantendo a ordem original
+    simbolos = list(dict.fromkeys(s for s in simbolos if s))
+    if not simbolos: return pd.DataFrame(), {}
+
+    # Yahoo fora do ar há pouco tempo? Nem tento: respondo na hora.
+    disjuntor = obter_disjuntor("yahoo")
+    if not disjuntor.permite():
+        motivo = f"Yahoo indisponível, nova tentativa em {disjuntor.segundos_restantes():.0f}s"
+        return pd.DataFrame(columns=simbolos), {s: motivo for s in simbolos}
+
+    try:
+        dados = yahoo.download(
+            simbolos, period=periodo, interval=intervalo, auto_adjust=auto_ajuste,
+            group_by="column", progress=False, threads=True
+        )
+    except Exception as e:
+        # Se o download inteiro falhou (rede fora?), todos os ativos recebem o mesmo motivo
+        disjuntor.registrar_falha()
+        return pd.DataFrame(columns=simbolos), {s: f"falha no download: {e}" for s in simbolos}
+
+    painel = _extrair_campo(dados, campo, simbolos)
+    erros = _diagnosticar_erros(painel, simbolos, getattr(dados, "attrs", {}).get("erros", {}))
+    # Só é falha do Yahoo se NADA veio por causa da rede. Um código sem dados (digitado
+    # errado, deslistado) é erro do pedido: aparece em 'erros', mas o Yahoo respondeu.
+    if len(erros) == len(simbolos) and any(yahoo.falha_de_rede(m) for m in erros.values()):
+        disjuntor.registrar_falha()
+    else:
+        disjuntor.registrar_sucesso()
+    return painel, erros
+
+
+# Função 2: Resumo "Hoje vs Ontem"
+# É o cálculo que a Home e o ranking de Ações repetiam na mão:
+# pega a última linha (hoje), a penúltima (ontem) e calcula a variação.
+# Devolve {ticker: {'preco': ..., 'var': ...}} só para quem tem dados.
+def resumo_variacao(painel):
+    resumo = {}
+    for ticker in painel.columns:
+        serie = painel[ticker].dropna()
+        if serie.empty: continue
+        preco_atual = float(serie.iloc[-1])
+        var = 0.0 # Se só tiver dados de hoje (feriado?), variação é zero
+        if len(serie) >= 2:
+            fech_ontem = float(serie.iloc[-2])
+            if fech_ontem > 0: var = ((preco_atual - fech_ontem) / fech_ontem) * 100
+        resumo[ticker] = {'preco': preco_atual, 'var': var}
+    return resumo
+
+
+# Função Auxiliar: Texto curto para mostrar os erros na tela
+def descrever_erros(erros):
+    return ", ".join(f"{t} ({motivo})" for t, motivo in erros.items())
+
+
+# Função 3: Símbolo do Yahoo de cada linha de uma carteira (colunas Tipo e Ativo)
+# Outros tipos (Tesouro, Renda Fixa) ficam sem símbolo (NaN).
+# Ação/FII/ETF/BDR: tem ponto? Já é o símbolo. Tem número? É Brasil (.SA). Só letras? É EUA.
+# Cripto: "BTC" vira "BTC-USD" (se já tiver o traço, fica como está).
+def simbolos_yahoo(carteira):
+    ativo = carteira['Ativo'].astype(str)
+    bolsa = carteira['Tipo'].isin(["Ação", "FII", "ETF", "BDR"])
+    cripto = carteira['Tipo'] == "Cripto"
+    brasil = ~ativo.str.contains(".", regex=False) & ativo.str.contains(r"\d")
+    simbolo = pd.Series(np.nan, index=carteira.index, dtype=object)
+    simbolo[bolsa] = ativo.where(~brasil, ativo + ".SA")[bolsa]
+    simbolo[cripto] = ativo.where(ativo.str.contains("-", regex=False), ativo + "-USD")[cripto]
+    return simbolo
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# O yfinance devolve colunas em dois níveis (Campo, Ticker). Eu pego só o campo
+# pedido (ex: 'Close') e garanto que TODOS os tickers pedidos virem coluna,
+# mesmo os que vieram vazios (assim a página sabe que eles existem, só falharam).
+def _extrair_campo(dados, campo, simbolos):
+    if dados is None or dados.empty:
+        return pd.DataFrame(columns=simbolos)
+
+    if isinstance(dados.columns, pd.MultiIndex):
+        if campo not in dados.columns.get_level_values(0):
+            return pd.DataFrame(index=dados.index, columns=simbolos)
+        painel = dados[campo]
+    else:
+        # Versões antigas do yfinance devolvem colunas simples quando é só 1 ativo
+        if campo not in dados.columns:
+            return pd.DataFrame(index=dados.index, columns=simbolos)
+        painel = dados[[campo]].rename(columns={campo: simbolos[0]})
+
+    painel = painel.reindex(columns=simbolos)
+    painel.columns.name = None
+    return painel.astype(float)
+
+
+# Descobre por que cada ativo falhou.
+# 'motivos' vem do motor/yahoo.py (o que o download contou); versões antigas do yfinance
+# guardam os motivos num dicionário interno. Sem nenhum dos dois, uma mensagem genérica.
+def _diagnosticar_erros(painel, simbolos, motivos=None):
+    motivos = {**(getattr(getattr(yf, "shared", None), "_ERRORS", {}) or {}), **(motivos or {})}
+    erros = {}
+    for s in simbolos:
+        if s not in painel.columns or painel[s].dropna().empty:
+            erros[s] = str(motivos.get(s, motivos.get(s.upper(), "sem dados no período"))).strip()
+    return erros
@@ -0,0 +1,64 @@
+"""
+================================================================================
+🚀 FINANK - BUSCAS EM PARALELO
+================================================================================
+Quando uma página precisa de várias coisas que NÃO dependem uma da outra
+(ex: ranking de Ações, de ETFs e de BDRs), não faz sentido esperar uma terminar
+para começar a próxima.
+
+Aqui eu disparo todas ao mesmo tempo num "pool" de threads.
+Assim o tempo da página vira o da busca MAIS LENTA, e não a SOMA de todas.
+Se alguma passar do tempo limite, a página desenha o que já chegou.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+# Um pool só para o app inteiro (todas as sessões dividem as mesmas threads)
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="finank-busca")
+
+
+# Função Principal: Executar Buscas em Paralelo
+# tarefas:  {nome: (funcao, arg1, arg2, ...)}
+# timeout:  tempo máximo padrão (segundos) de cada tarefa
+# timeouts: {nome: segundos} para dar um limite diferente a uma tarefa específica
+# Devolve (resultados, erros): dois dicionários com os mesmos nomes das tarefas.
+# Quem estourou o tempo ou deu erro aparece só em 'erros'.
+def buscar_em_paralelo(tarefas, timeout=15, timeouts=None):
+    timeouts = timeouts or {}
+    ctx = get_script_run_ctx(suppress_warning=True)
+    inicio = time.monotonic()
+
+    futuros = {
+        nome: _POOL.submit(_executar_com_contexto, ctx, funcao, args)
+        for nome, (funcao, *args) in tarefas.items()
+    }
+
+    resultados, erros = {}, {}
+    for nome, futuro in futuros.items():
+        # Todas começaram juntas, então o prazo é contado a partir do disparo
+        restante = max(0.0, inicio + timeouts.get(nome, timeout) - time.monotonic())
+        try:
+            resultados[nome] = futuro.result(timeout=restante)
+        except FuturesTimeout:
+            # A tarefa continua rodando e preenche o cache para a próxima visita
+            erros[nome] = "tempo esgotado"
+        except Exception as e:
+            erros[nome] = str(e)
+    return resultados, erros
+
+
+# Leva o "contexto" da sessão do Streamlit para dentro da thread, para as
+# funções com @st.cache_data funcionarem normalmente, e limpa no final
+# (a thread volta para o pool e pode atender outra sessão).
+def _executar_com_contexto(ctx, funcao, args):
+    thread = threading.current_thread()
+    if ctx is not None: add_script_run_ctx(thread, ctx)
+    try:
+        return funcao(*args)
+    finally:
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
@@ -0,0 +1,248 @@
+"""
+================================================================================
+📈 FINANK - EVOLUÇÃO DO PATRIMÔNIO (CURVA DIÁRIA)
+================================================================================
+A página da Carteira mostra quanto tudo vale HOJE. Aqui eu monto quanto valia
+em CADA dia útil desde o primeiro lançamento:
+
+    patrimônio do dia = soma de (quantidade que eu tinha naquele dia x preço do dia)
+
+1. Quantidades: saem do livro de lançamentos (uma tabela dias x ativos, com a
+   soma acumulada das compras e vendas; tudo em colunas, sem laço por dia).
+2. Preços: o fechamento de cada dia, do histórico em disco (motor/historico.py).
+3. Renda Fixa / Tesouro / ativos sem cotação: a mesma conta da página
+   (preço médio de compra corrigido pelo contrato: prefixado, % do CDI,
+   IPCA + taxa..., em dias úteis; motor/renda_fixa.py).
+
+A curva fica guardada (patrimonio.db). Enquanto o livro não muda, abrir a página
+só refaz o ÚLTIMO dia guardado (que pode ter sido calculado no meio do pregão)
+e acrescenta os dias novos. Se o livro mudar (um lançamento novo, inclusive
+com data no passado), a curva é refeita inteira uma vez.
+
+Ativo sem histórico nenhum (código errado, empresa que saiu da bolsa) não trava
+a curva: ela é guardada com ele pela conta do item 3, e o código fica anotado.
+Depois de FRESCOR_HISTORICO segundos eu peço SÓ esses códigos de novo e, se
+vierem preços, corrijo só a parte deles na curva guardada.
+"""
+
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from motor.banco import conectar
+from motor.config import FRESCOR_HISTORICO
+from motor.historico import obter_historicos, periodo_desde
+from motor.mercado import simbolos_yahoo
+from motor.renda_fixa import fatores
+
+ARQUIVO_PATRIMONIO = "patrimonio.db"
+
+# Muda quando a conta da curva muda: as curvas guardadas com a conta antiga são refeitas uma vez
+# 1: juros compostos em dias corridos | 2: contratos da Renda Fixa em dias úteis
+# 3: Taxa baixa com CDI/Selic no nome volta a ser prefixada (renda_fixa.PERCENTUAL_MINIMO)
+VERSAO_CURVA = "3"
+
+_TRAVA = threading.Lock()
+
+
+# Função Principal: a curva diária de uma carteira
+# Devolve um DataFrame com as datas no índice e as colunas:
+# - Patrimonio: quanto tudo valia no dia
+# - Aportes: quanto dinheiro eu tinha colocado até o dia (compras - vendas)
+# 'carteira' separa as curvas de carteiras diferentes no mesmo arquivo.
+def curva_patrimonio(armazenamento, carteira="principal"):
+    versao = f"{VERSAO_CURVA}:{armazenamento.versao()!r}"
+    hoje = pd.Timestamp.today().normalize()
+    agora = time.time()
+    with _TRAVA, closing(conectar(ARQUIVO_PATRIMONIO)) as con:
+        _criar_tabelas(con)
+        estado = con.execute(
+            "SELECT versao, aportes, (SELECT MAX(data) FROM patrimonio WHERE carteira = ?) FROM patrimonio_estado "
+            "WHERE carteira = ?", (carteira, carteira)).fetchone()
+
+        if estado and estado[0] == versao and estado[2] is not None:
+            # Livro igual ao da última vez: as quantidades de hoje valem para todos os dias novos
+            faltando, tentado_em = _ler_faltando(con, carteira)
+            if faltando and agora - tentado_em > FRESCOR_HISTORICO:
+                faltando = _completar(con, carteira, armazenamento.carregar(), faltando, hoje)
+                _guardar_faltando(con, carteira, faltando, agora)
+            ativos = _ler_ativos(con, carteira)
+            dias = pd.bdate_range(pd.Timestamp(estado[2]), max(hoje, pd.Timestamp(estado[2])))
+            quantidades = pd.DataFrame(
+                np.tile(ativos["Quantidade"].to_numpy(), (len(dias), 1)), index=dias, columns=ativos.index
+            )
+            aportes = pd.Series(estado[1], index=dias)
+            # Quem está sem histórico nem é pedido ao Yahoo até a próxima tentativa
+            novos, sem_preco = _avaliar(ativos, quantidades, aportes, ignorar=faltando)
+            _guardar(con, carteira, novos, apagar_a_partir=estado[2])
+            if sem_preco - faltando: _guardar_faltando(con, carteira, faltando | sem_preco, agora)
+        else:
+            lancamentos = armazenamento.carregar()
+            if lancamentos.empty:
+                return pd.DataFrame(columns=["Patrimonio", "Aportes"], index=pd.DatetimeIndex([], name="Data"))
+            ativos, quantidades, aportes = _montar(lancamentos, hoje)
+            # Faltou o histórico de algum ativo? Guardo mesmo assim (com a conta da Renda Fixa para ele)
+            novos, sem_preco = _avaliar(ativos, quantidades, aportes)
+            _guardar(con, carteira, novos, apagar_a_partir=None)
+            _guardar_estado(con, carteira, versao, ativos, quantidades, aportes)
+            _guardar_faltando(con, carteira, sem_preco, agora)
+
+        return _ler_curva(con, carteira)
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Livro -> (ativos, quantidades dia a dia, aportes acumulados)
+def _montar(lancamentos, hoje):
+    df = lancamentos.copy()
+    df["Data"] = pd.to_datetime(df["Data"]).dt.normalize()
+    dias = pd.bdate_range(df["Data"].min(), max(hoje, df["Data"].max()))
+    # Lançamento num sábado conta a partir da segunda-feira seguinte
+    df["Dia"] = dias[np.minimum(dias.searchsorted(df["Data"]), len(dias) - 1)]
+
+    venda = df["Operacao"] == "Venda"
+    df["Qtd"] = df["Quantidade"].astype(float).where(~venda, -df["Quantidade"].astype(float))
+    df["Valor"] = df["Qtd"] * df["Preco"].astype(float)
+
+    # Quantidade de cada ativo em cada dia = soma acumulada dos movimentos
+    movimentos = df.pivot_table(index="Dia", columns=["Tipo", "Ativo"], values="Qtd", aggfunc="sum")
+    quantidades = movimentos.reindex(dias, fill_value=0.0).fillna(0.0).cumsum()
+    aportes = df.groupby("Dia")["Valor"].sum().reindex(dias, fill_value=0.0).cumsum()
+
+    # Base da conta de juros: preço médio das COMPRAS e taxa média ponderada pelo valor
+    compras = df[~venda].assign(Valor_Compra=lambda d: d["Valor"].abs(), Taxa_x_Valor=lambda d: d["Taxa"].fillna(0.0) * d["Valor"].abs())
+    somas = compras.groupby(["Tipo", "Ativo"])[["Qtd", "Valor_Compra", "Taxa_x_Valor"]].sum()
+    ativos = pd.DataFrame(index=quantidades.columns)
+    ativos["Base"] = (somas["Valor_Compra"] / somas["Qtd"]).reindex(ativos.index).fillna(0.0)
+    ativos["Taxa"] = (somas["Taxa_x_Valor"] / somas["Valor_Compra"]).reindex(ativos.index).fillna(0.0)
+    ativos["Data_Inicial"] = df.groupby(["Tipo", "Ativo"])["Data"].min().reindex(ativos.index)
+    ativos["Simbolo"] = simbolos_yahoo(ativos.reset_index()).to_numpy()
+    ativos["Quantidade"] = quantidades.iloc[-1].to_numpy()
+    return ativos, quantidades, aportes
+
+
+# Quantidades x preços, para todos os dias de uma vez -> (curva, códigos que ficaram sem histórico)
+# 'ignorar': códigos que nem peço ao Yahoo (já sei que estão sem histórico)
+def _avaliar(ativos, quantidades, aportes, ignorar=frozenset()):
+    dias = quantidades.index
+    simbolos = sorted(set(ativos["Simbolo"].dropna()) - set(ignorar))
+    painel = _painel(simbolos, dias)
+    sem_preco = {s for s in simbolos if s not in painel.columns or painel[s].isna().all()} | set(ignorar)
+
+    patrimonio = _valores(ativos, quantidades, painel).sum(axis=1)
+    curva = pd.DataFrame({"Patrimonio": patrimonio, "Aportes": aportes.to_numpy()}, index=dias)
+    curva.index.name = "Data"
+    return curva, sem_preco
+
+
+# Quanto cada ativo valia em cada dia (dias x ativos, sem NaN).
+# Sem preço de mercado no painel: a conta da Renda Fixa, Base x rendimento do contrato
+# desde a primeira compra (Taxa 0 = preço de compra parado).
+def _valores(ativos, quantidades, painel):
+    dias = quantidades.index
+    # Preço de mercado de cada ativo em cada dia (colunas na mesma ordem dos ativos)
+    mercado = painel.reindex(index=dias, columns=ativos["Simbolo"].fillna("")).to_numpy(dtype=float)
+    contratos = ativos.reset_index()[["Tipo", "Ativo", "Taxa"]]
+    juros = ativos["Base"].to_numpy() * fatores(contratos, ativos["Data_Inicial"], dias)
+    precos = np.where(np.isnan(mercado), juros, mercado)
+    return np.nan_to_num(quantidades.to_numpy() * precos)
+
+
+# Nova tentativa só com os códigos que estavam sem histórico: a curva guardada recebe
+# a diferença "preço de mercado - conta da Renda Fixa" desses ativos, dia a dia.
+# Devolve os códigos que continuam sem histórico.
+def _completar(con, carteira, lancamentos, faltando, hoje):
+    if lancamentos.empty: return set()
+    ativos, quantidades, _ = _montar(lancamentos, hoje)
+    deles = ativos["Simbolo"].isin(faltando).to_numpy()
+    ativos, quantidades = ativos[deles], quantidades.loc[:, deles]
+    painel = _painel(sorted(faltando), quantidades.index)
+    achados = {s for s in faltando if s in painel.columns and painel[s].notna().any()}
+    if achados:
+        diferenca = (_valores(ativos, quantidades, painel) - _valores(ativos, quantidades, pd.DataFrame())).sum(axis=1)
+        with con:
+            con.executemany(
+                "UPDATE patrimonio SET patrimonio = patrimonio + ? WHERE carteira = ? AND data = ?",
+                [(float(d), carteira, dia.strftime("%Y-%m-%d")) for dia, d in zip(quantidades.index, diferenca) if d]
+            )
+    return set(faltando) - achados
+
+
+# Fechamentos (sem ajuste de dividendos: é o preço que valia no dia) nos dias pedidos.
+# Dia sem pregão (feriado) repete o último fechamento conhecido.
+def _painel(simbolos, dias):
+    if not simbolos or len(dias) == 0: return pd.DataFrame(index=dias)
+    historicos = obter_historicos(simbolos, periodo=periodo_desde(dias[0] - pd.Timedelta(days=10)), ajustado=False)
+    fechamentos = {s: df["Close"] for s, df in historicos.items() if not df.empty}
+    if not fechamentos: return pd.DataFrame(index=dias)
+    painel = pd.DataFrame(fechamentos)
+    return painel.reindex(painel.index.union(dias)).ffill().reindex(dias)
+
+
+def _guardar(con, carteira, curva, apagar_a_partir):
+    linhas = [(carteira, data.strftime("%Y-%m-%d"), float(p), float(a))
+              for data, p, a in zip(curva.index, curva["Patrimonio"], curva["Aportes"])]
+    with con:
+        if apagar_a_partir is None: con.execute("DELETE FROM patrimonio WHERE carteira = ?", (carteira,))
+        else: con.execute("DELETE FROM patrimonio WHERE carteira = ? AND data >= ?", (carteira, apagar_a_partir))
+        con.executemany("INSERT OR REPLACE INTO patrimonio VALUES (?,?,?,?)", linhas)
+
+
+# O que preciso para continuar a curva sem reler o livro: a versão do livro,
+# os aportes e, de cada ativo, a quantidade de hoje e a base dos juros
+def _guardar_estado(con, carteira, versao, ativos, quantidades, aportes):
+    tenho = ativos[ativos["Quantidade"] != 0]
+    with con:
+        con.execute("DELETE FROM patrimonio_ativos WHERE carteira = ?", (carteira,))
+        con.executemany("INSERT INTO patrimonio_ativos VALUES (?,?,?,?,?,?,?,?)", [
+            (carteira, tipo, ativo, None if pd.isna(linha.Simbolo) else linha.Simbolo, float(linha.Quantidade),
+             float(linha.Base), float(linha.Taxa), linha.Data_Inicial.strftime("%Y-%m-%d"))
+            for (tipo, ativo), linha in zip(tenho.index, tenho.itertuples(index=False))
+        ])
+        con.execute("INSERT OR REPLACE INTO patrimonio_estado VALUES (?,?,?)", (carteira, versao, float(aportes.iloc[-1])))
+
+
+# Códigos sem histórico na última conta e quando foi a última tentativa
+def _guardar_faltando(con, carteira, faltando, agora):
+    with con:
+        con.execute("DELETE FROM patrimonio_faltando WHERE carteira = ?", (carteira,))
+        con.executemany("INSERT INTO patrimonio_faltando VALUES (?,?,?)", [(carteira, s, agora) for s in sorted(faltando)])
+
+
+def _ler_faltando(con, carteira):
+    linhas = con.execute("SELECT simbolo, tentado_em FROM patrimonio_faltando WHERE carteira = ?", (carteira,)).fetchall()
+    return {s for s, _ in linhas}, min((t for _, t in linhas), default=0.0)
+
+
+def _ler_ativos(con, carteira):
+    ativos = pd.read_sql_query(
+        "SELECT tipo AS Tipo, ativo AS Ativo, simbolo AS Simbolo, quantidade AS Quantidade, base AS Base, "
+        "taxa AS Taxa, data_inicial AS Data_Inicial FROM patrimonio_ativos WHERE carteira = ?", con, params=(carteira,))
+    ativos["Data_Inicial"] = pd.to_datetime(ativos["Data_Inicial"])
+    return ativos.set_index(["Tipo", "Ativo"])
+
+
+def _ler_curva(con, carteira):
+    curva = pd.read_sql_query(
+        "SELECT data AS Data, patrimonio AS Patrimonio, aportes AS Aportes FROM patrimonio "
+        "WHERE carteira = ? ORDER BY data", con, params=(carteira,))
+    return curva.set_index(pd.DatetimeIndex(pd.to_datetime(curva.pop("Data")), name="Data"))
+
+
+def _criar_tabelas(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS patrimonio (
+            carteira TEXT, data TEXT, patrimonio REAL, aportes REAL,
+            PRIMARY KEY (carteira, data)
+        ) WITHOUT ROWID""")
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS patrimonio_ativos (
+            carteira TEXT, tipo TEXT, ativo TEXT, simbolo TEXT,
+            quantidade REAL, base REAL, taxa REAL, data_inicial TEXT,
+            PRIMARY KEY (carteira, tipo, ativo)
+        )""")
+    con.execute("CREATE TABLE IF NOT EXISTS patrimonio_estado (carteira TEXT PRIMARY KEY, versao TEXT, aportes REAL)")
+    con.execute("CREATE TABLE IF NOT EXISTS patrimonio_faltando (carteira TEXT, simbolo TEXT, tentado_em REAL, PRIMARY KEY (carteira, simbolo))")
@@ -0,0 +1,163 @@
+"""
+================================================================================
+💸 FINANK - PROVENTOS DA CARTEIRA (DIVIDENDOS, JCP E RENDIMENTOS DE FII)
+================================================================================
+Antes, a única conta de dividendos era a da página de FIIs, um fundo por vez
+(cada fundo uma ida ao Yahoo). Para saber quanto a carteira INTEIRA rendeu,
+era preciso abrir a página dezenas de vezes.
+
+Aqui eu faço tudo de uma vez:
+1. Dividendos: vêm do histórico em disco (motor/historico.py), que já guarda
+   os proventos de cada pregão. Todos os ativos vão num download em lote só e,
+   depois da primeira vez, só os pregões novos são pedidos ao Yahoo.
+2. Quem recebe: em cada data "ex" (o primeiro dia SEM direito), recebe quem
+   tinha a cota no fim do pregão anterior. A quantidade de cada ativo naquele
+   dia sai do livro de lançamentos com um "merge_asof" (o último saldo ANTES
+   da data ex), para todos os ativos e datas de uma vez.
+3. Resultado:
+   - Renda recebida mês a mês (por categoria).
+   - Yield on Cost (12 meses): o que cada cota pagou nos últimos 12 meses
+     dividido pelo preço médio que EU paguei por ela.
+
+O resultado fica na memória até o livro mudar (ou por FRESCOR_HISTORICO segundos,
+para os dividendos novos aparecerem).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor.config import FRESCOR_HISTORICO
+from motor.custo import COLUNAS_CUSTOS
+from motor.historico import obter_historicos, periodo_desde
+from motor.mercado import simbolos_yahoo
+
+# Categorias que pagam proventos (BDR repassa os dividendos da empresa lá de fora)
+TIPOS_PROVENTOS = ("Ação", "FII", "ETF", "BDR")
+MESES_YIELD = 12
+
+_RESULTADOS = {} # (carteira, versão do livro) -> (quando, proventos)
+_TRAVA = threading.Lock()
+
+
+# Função Principal: os proventos de uma carteira (motor/armazenamento.py)
+# Devolve o dicionário de calcular_proventos() ou None se não houver nada a receber.
+def proventos_da_carteira(armazenamento, carteira="principal"):
+    chave = (carteira, repr(armazenamento.versao()))
+    with _TRAVA: guardado = _RESULTADOS.get(chave)
+    if guardado and time.time() - guardado[0] < FRESCOR_HISTORICO: return guardado[1]
+
+    resultado = calcular_proventos(armazenamento.carregar(), armazenamento.posicoes())
+    with _TRAVA:
+        # Só a versão mais nova de cada carteira fica guardada
+        for antiga in [k for k in _RESULTADOS if k[0] == carteira]: del _RESULTADOS[antiga]
+        _RESULTADOS[chave] = (time.time(), resultado)
+    return resultado
+
+
+# Dividendos por cota de vários símbolos desde 'inicio', numa busca só.
+# Devolve uma tabela longa: Simbolo, Data (data ex) e Valor_por_Cota.
+def dividendos_em_lote(simbolos, inicio):
+    colunas = ["Simbolo", "Data", "Valor_por_Cota"]
+    simbolos = sorted(set(simbolos))
+    if not simbolos: return pd.DataFrame(columns=colunas)
+    inicio = pd.Timestamp(inicio).normalize()
+    historicos = obter_historicos(simbolos, periodo=periodo_desde(inicio), ajustado=False)
+    partes = []
+    for simbolo, df in historicos.items():
+        pagos = df["Dividends"][(df["Dividends"] > 0) & (df.index >= inicio)]
+        if pagos.empty: continue
+        partes.append(pd.DataFrame({"Simbolo": simbolo, "Data": pagos.index.normalize(), "Valor_por_Cota": pagos.to_numpy()}))
+    if not partes: return pd.DataFrame(columns=colunas)
+    return pd.concat(partes, ignore_index=True)
+
+
+# Dividendos por cota de UM símbolo (para a página de FIIs), do mesmo histórico em disco
+def dividendos(simbolo, periodo="5y"):
+    df = obter_historicos([simbolo], periodo=periodo, ajustado=False).get(simbolo)
+    if df is None or df.empty: return pd.Series(dtype=float, name="Dividends")
+    return df["Dividends"][df["Dividends"] > 0]
+
+
+# As contas (sem cache): 'lancamentos' é o livro, 'posicoes' é a posição atual (com PM)
+# Devolve None (nada a receber) ou um dicionário com:
+# - recebidos: cada pagamento (Data, Tipo, Ativo, Simbolo, Valor_por_Cota, Quantidade, Valor)
+# - mensal: R$ recebidos por mês (linhas) e categoria (colunas)
+# - por_ativo: posições atuais com Proventos_12m (por cota), Renda_12m, Yield_on_Cost e Ultimo_Provento
+# - recebido_12m, recebido_total e yield_on_cost (da carteira)
+def calcular_proventos(lancamentos, posicoes, hoje=None):
+    hoje = pd.Timestamp.today().normalize() if hoje is None else pd.Timestamp(hoje).normalize()
+    if lancamentos.empty: return None
+    livro = lancamentos[lancamentos["Tipo"].isin(TIPOS_PROVENTOS)]
+    if livro.empty: return None
+
+    movimentos = pd.DataFrame({
+        "Data": pd.to_datetime(livro["Data"]).dt.normalize(),
+        "Tipo": livro["Tipo"].astype(str),
+        "Ativo": livro["Ativo"].astype(str),
+        "Qtd": livro["Quantidade"].astype(float).where(livro["Operacao"] != "Venda", -livro["Quantidade"].astype(float)),
+    })
+    ativos = movimentos[["Tipo", "Ativo"]].drop_duplicates(ignore_index=True)
+    ativos["Simbolo"] = simbolos_yahoo(ativos)
+
+    eventos = dividendos_em_lote(ativos["Simbolo"].dropna(), movimentos["Data"].min())
+    recebidos = _cruzar(movimentos, ativos.merge(eventos, on="Simbolo"))
+    if recebidos.empty: return None
+
+    # Renda de cada mês, com os meses sem pagamento aparecendo como zero
+    meses = recebidos["Data"].dt.to_period("M")
+    mensal = recebidos.groupby([meses, "Tipo"])["Valor"].sum().unstack(fill_value=0.0)
+    mensal = mensal.reindex(pd.period_range(meses.min(), hoje.to_period("M"), freq="M"), fill_value=0.0)
+    mensal.index = mensal.index.to_timestamp()
+    mensal.index.name = "Mes"
+
+    # Yield on Cost: proventos por cota nos últimos 12 meses / preço médio de hoje
+    corte = hoje - pd.DateOffset(months=MESES_YIELD)
+    ultimos = recebidos[recebidos["Data"] > corte]
+    por_cota = ultimos.groupby(["Tipo", "Ativo"])["Valor_por_Cota"].sum().rename("Proventos_12m")
+    ultimo = recebidos.groupby(["Tipo", "Ativo"])["Data"].max().rename("Ultimo_Provento")
+    posicoes = posicoes.reindex(columns=COLUNAS_CUSTOS) # Tudo vendido: a posição vem sem colunas
+    por_ativo = posicoes[posicoes["Tipo"].isin(TIPOS_PROVENTOS)][["Tipo", "Ativo", "Qtd_Atual", "PM", "Total_Investido"]]
+    por_ativo = por_ativo.join(por_cota, on=["Tipo", "Ativo"]).join(ultimo, on=["Tipo", "Ativo"])
+    por_ativo["Proventos_12m"] = por_ativo["Proventos_12m"].fillna(0.0)
+    por_ativo["Renda_12m"] = por_ativo["Proventos_12m"] * por_ativo["Qtd_Atual"]
+    por_ativo["Yield_on_Cost"] = np.where(por_ativo["PM"] > 0, por_ativo["Proventos_12m"] / por_ativo["PM"].where(por_ativo["PM"] > 0, 1.0), 0.0)
+    por_ativo = por_ativo.sort_values("Renda_12m", ascending=False, ignore_index=True)
+
+    investido = por_ativo["Total_Investido"].sum()
+    return {
+        "recebidos": recebidos,
+        "mensal": mensal,
+        "por_ativo": por_ativo,
+        "recebido_12m": float(ultimos["Valor"].sum()),
+        "recebido_total": float(recebidos["Valor"].sum()),
+        "yield_on_cost": float(por_ativo["Renda_12m"].sum() / investido) if investido > 0 else 0.0,
+    }
+
+
+# Esvazia os resultados guardados (testes e benchmarks)
+def limpar_memoria():
+    with _TRAVA: _RESULTADOS.clear()
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Cada data ex x quantidade que eu tinha no pregão anterior, para todos os ativos de uma vez.
+# Quem compra NA data ex não recebe; quem vende na data ex ainda recebe (por isso: saldo ANTES do dia).
+def _cruzar(movimentos, eventos):
+    colunas = ["Data", "Tipo", "Ativo", "Simbolo", "Valor_por_Cota", "Quantidade", "Valor"]
+    if eventos.empty: return pd.DataFrame(columns=colunas)
+
+    # Saldo de cada ativo ao fim de cada dia com lançamento
+    saldos = movimentos.sort_values("Data", kind="stable")
+    saldos = saldos.assign(Quantidade=saldos.groupby(["Tipo", "Ativo"])["Qtd"].cumsum())
+    saldos = saldos.drop_duplicates(["Tipo", "Ativo", "Data"], keep="last")[["Data", "Tipo", "Ativo", "Quantidade"]]
+
+    cruzado = pd.merge_asof(
+        eventos.sort_values("Data"), saldos, on="Data", by=["Tipo", "Ativo"], allow_exact_matches=False
+    )
+    cruzado = cruzado[cruzado["Quantidade"] > 1e-9] # Antes da primeira compra (NaN) ou já tinha vendido tudo
+    cruzado = cruzado.assign(Valor=cruzado["Quantidade"] * cruzado["Valor_por_Cota"])
+    return cruzado[colunas].sort_values(["Data", "Ativo"], ignore_index=True)
@@ -0,0 +1,176 @@
+"""
+================================================================================
+🎯 FINANK - METAS DE ALOCAÇÃO E REBALANCEAMENTO
+================================================================================
+O gráfico de Alocação mostra ONDE o dinheiro está. Aqui eu digo onde ele
+DEVERIA estar ("40% em Ação, 20% em FII, 10% em IVVB11...") e recebo a lista
+de ordens (em ações/cotas inteiras) que traz a carteira de volta para perto
+das metas.
+
+Como as metas viram ordens (tudo em colunas do numpy, sem laço por ativo):
+1. Meta por ativo: a meta do próprio ativo, se tiver. Senão, o que sobra da
+   meta da classe (Tipo) é dividido entre os ativos da classe, na proporção
+   do que cada um já vale. Ativo sem meta nenhuma não é mexido.
+2. Banda de tolerância: só sai do lugar o ativo cujo peso está mais longe da
+   meta que a tolerância (ex: 5 pontos percentuais). Assim a lista de ordens é
+   a menor possível, em vez de "acertar os centavos" de todos os ativos.
+3. Vendas: o que passou da banda para cima volta para a meta.
+4. Compras: o dinheiro (aporte + vendas) vai primeiro para quem ficou abaixo
+   da banda e, se sobrar, para quem está abaixo da meta mas dentro da banda.
+5. Quantidades inteiras (cripto, Tesouro e Renda Fixa aceitam frações); o troco
+   que sobra compra mais um lote de quem ainda está mais longe da meta.
+
+É rápido o bastante para refazer a conta a cada número digitado no aporte.
+As metas de cada carteira ficam guardadas em metas.db.
+"""
+
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from motor.banco import conectar
+
+ARQUIVO_METAS = "metas.db"
+NIVEIS = ("Tipo", "Ativo")
+TOLERANCIA = 5.0 # Pontos percentuais
+
+# Menor fração negociável por categoria (o resto é 1 ação/cota)
+LOTES = {"Cripto": 0.000001, "Tesouro Direto": 0.01, "Renda Fixa": 0.01}
+
+
+# Função 1: As metas guardadas de uma carteira (Nivel: "Tipo" ou "Ativo", Nome, Meta em %)
+def ler_metas(carteira="principal"):
+    with closing(conectar(ARQUIVO_METAS)) as con:
+        _criar_tabela(con)
+        return pd.read_sql_query(
+            "SELECT nivel AS Nivel, nome AS Nome, meta AS Meta FROM metas WHERE carteira = ? ORDER BY nivel DESC, nome",
+            con, params=(carteira,))
+
+
+# Função 2: Troca as metas de uma carteira (linhas vazias ou com meta 0 são ignoradas)
+def guardar_metas(carteira, metas):
+    metas = validar_metas(metas)
+    with closing(conectar(ARQUIVO_METAS)) as con, con:
+        _criar_tabela(con)
+        con.execute("DELETE FROM metas WHERE carteira = ?", (carteira,))
+        con.executemany("INSERT INTO metas VALUES (?, ?, ?, ?)",
+                        [(carteira, nivel, nome, float(meta)) for nivel, nome, meta in metas.itertuples(index=False)])
+
+
+# Limpa a tabela digitada na página: nomes em maiúsculas (ativos), sem repetidos, soma até 100%
+def validar_metas(metas):
+    metas = metas.dropna(subset=["Nivel", "Nome", "Meta"]).copy()
+    metas["Nome"] = metas["Nome"].astype(str).str.strip()
+    metas["Meta"] = metas["Meta"].astype(float)
+    metas = metas[(metas["Nome"] != "") & (metas["Meta"] > 0)]
+    if not metas["Nivel"].isin(NIVEIS).all(): raise ValueError("O nível da meta deve ser 'Tipo' ou 'Ativo'.")
+    metas.loc[metas["Nivel"] == "Ativo", "Nome"] = metas.loc[metas["Nivel"] == "Ativo", "Nome"].str.upper()
+    metas = metas.drop_duplicates(["Nivel", "Nome"], keep="last")
+    for nivel in NIVEIS:
+        soma = metas.loc[metas["Nivel"] == nivel, "Meta"].sum()
+        if soma > 100 + 1e-9: raise ValueError(f"As metas por {nivel} somam {soma:.1f}% (o máximo é 100%).")
+    return metas[["Nivel", "Nome", "Meta"]].reset_index(drop=True)
+
+
+# Meta de cada ativo (fração do total, NaN = ativo sem meta) na ordem das linhas de 'posicoes'
+def metas_por_ativo(posicoes, metas):
+    metas = validar_metas(metas)
+    por_nivel = {nivel: metas[metas["Nivel"] == nivel].set_index("Nome")["Meta"] / 100 for nivel in NIVEIS}
+    tipo, saldo = posicoes["Tipo"], posicoes["Saldo_Atual"].astype(float).clip(lower=0)
+
+    propria = posicoes["Ativo"].astype(str).str.upper().map(por_nivel["Ativo"])
+    da_classe = tipo.map(por_nivel["Tipo"])
+    # O que sobra da meta da classe, depois das metas dos ativos dela, vai para os outros ativos da classe
+    resto = (da_classe - propria.fillna(0).groupby(tipo).transform("sum")).clip(lower=0)
+    sem_meta = propria.isna()
+    base = saldo.where(sem_meta, 0.0)
+    soma_base = base.groupby(tipo).transform("sum")
+    quantos = sem_meta.astype(float).groupby(tipo).transform("sum")
+    parte = np.where(soma_base > 0, base / soma_base.where(soma_base > 0, 1.0), sem_meta / quantos.clip(lower=1))
+    alvo = propria.fillna(resto * parte)
+
+    # Metas somando mais de 100% (classe + ativos de fora dela): reduzo todas na mesma proporção
+    soma = alvo.sum()
+    return (alvo / soma if soma > 1 else alvo).to_numpy(dtype=float)
+
+
+# Função Principal: as ordens que trazem a carteira de volta para as bandas
+# 'posicoes' precisa de Tipo, Ativo, Qtd_Atual, Preco_Atual e Saldo_Atual (a tabela da página).
+# Devolve (ordens, dinheiro que sobra). Cada ordem: Tipo, Ativo, Ordem (Comprar/Vender),
+# Quantidade, Preco_Atual, Valor, Peso_Atual, Peso_Meta e Peso_Depois (frações do total).
+def calcular_ordens(posicoes, metas, aporte=0.0, tolerancia=TOLERANCIA):
+    colunas = ["Tipo", "Ativo", "Ordem", "Quantidade", "Preco_Atual", "Valor", "Peso_Atual", "Peso_Meta", "Peso_Depois"]
+    if posicoes.empty or metas.empty: return pd.DataFrame(columns=colunas), float(aporte)
+
+    saldo = posicoes["Saldo_Atual"].to_numpy(dtype=float)
+    preco = posicoes["Preco_Atual"].to_numpy(dtype=float)
+    quantidade = posicoes["Qtd_Atual"].to_numpy(dtype=float)
+    lote = posicoes["Tipo"].map(LOTES).fillna(1.0).to_numpy()
+    total = saldo.sum() + aporte
+    if total <= 0: return pd.DataFrame(columns=colunas), float(aporte)
+
+    alvo = metas_por_ativo(posicoes, metas)
+    gerido = ~np.isnan(alvo) & (preco > 0) # Sem preço não dá para montar ordem
+    alvo_valor = np.nan_to_num(alvo) * total
+    peso = saldo / total
+    desvio = np.where(gerido, peso - np.nan_to_num(alvo), 0.0)
+    fora = gerido & (np.abs(desvio) > tolerancia / 100)
+
+    # Vendas: acima da banda, volta para a meta (lotes inteiros, nunca mais do que eu tenho)
+    vender = np.where(fora & (desvio > 0), saldo - alvo_valor, 0.0)
+    qtd_venda = np.minimum(_em_lotes(vender, preco, lote), quantidade)
+    caixa = aporte + float(qtd_venda @ preco)
+
+    # Compras: primeiro quem está abaixo da banda, depois quem está abaixo da meta dentro da banda
+    falta = np.where(gerido & (desvio < 0), alvo_valor - saldo, 0.0)
+    compra = np.zeros_like(falta)
+    for grupo in (fora, ~fora):
+        pedido = np.where(grupo, falta, 0.0)
+        if pedido.sum() <= 0 or caixa <= 0: continue
+        parte = pedido * min(1.0, caixa / pedido.sum())
+        compra += parte
+        caixa -= parte.sum()
+    qtd_compra = _em_lotes(compra, preco, lote)
+
+    # Troco: mais um lote para quem ainda está mais longe da meta, enquanto o dinheiro der
+    # (uma passada pelos candidatos; um lote caro que não cabe não impede os mais baratos)
+    troco = aporte + float(qtd_venda @ preco) - float(qtd_compra @ preco)
+    ainda_falta = np.where(compra > 0, falta - qtd_compra * preco, 0.0)
+    custo_lote = lote * preco
+    for i in np.argsort(-ainda_falta, kind="stable")[:int((ainda_falta > 0).sum())]:
+        if custo_lote[i] <= troco + 1e-9:
+            qtd_compra[i] += lote[i]
+            troco -= custo_lote[i]
+
+    movimento = qtd_compra - qtd_venda
+    ordens = pd.DataFrame({
+        "Tipo": posicoes["Tipo"].to_numpy(),
+        "Ativo": posicoes["Ativo"].to_numpy(),
+        "Ordem": np.where(movimento > 0, "Comprar", "Vender"),
+        "Quantidade": np.abs(movimento),
+        "Preco_Atual": preco,
+        "Valor": np.abs(movimento) * preco,
+        "Peso_Atual": saldo / saldo.sum() if saldo.sum() > 0 else 0.0,
+        "Peso_Meta": alvo,
+        "Peso_Depois": (saldo + movimento * preco) / total,
+    })
+    ordens = ordens[np.abs(movimento) > 1e-12].sort_values(["Ordem", "Valor"], ascending=[False, False], ignore_index=True)
+    return ordens[colunas], troco
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# Valor em R$ -> quantidade, arredondada para baixo em lotes inteiros
+def _em_lotes(valor, preco, lote):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lotes = np.floor(np.where(preco > 0, valor / (preco * lote), 0.0) + 1e-9)
+    return np.round(np.clip(lotes, 0, None) * lote, 8)
+
+
+def _criar_tabela(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS metas (
+            carteira TEXT, nivel TEXT, nome TEXT, meta REAL,
+            PRIMARY KEY (carteira, nivel, nome)
+        )""")
@@ -0,0 +1,139 @@
+"""
+================================================================================
+🏦 FINANK - RENDIMENTO DA RENDA FIXA (PRÉ, % DO CDI, ÍNDICE + TAXA)
+================================================================================
+Antes, todo título sem cotação rendia "PM x (1 + Taxa)^(dias / 365,25)", como
+se tudo fosse prefixado. Um CDB de "110% do CDI" ou um "IPCA + 6%" ficava com
+o valor errado.
+
+Agora cada posição vira um CONTRATO, lido do nome do ativo e da Taxa:
+1. Prefixado:          "CDB BANCO X" com Taxa 12    -> 12% ao ano.
+2. Percentual do CDI:  "CDB BANCO X 110% CDI"        -> 110% do CDI de cada dia.
+                       "LCI BANCO Y CDI" com Taxa 95 -> 95% do CDI.
+                       Taxa abaixo de PERCENTUAL_MINIMO com o índice só no nome veio do
+                       formulário antigo (que pedia "% a.a."): continua prefixado e a
+                       página avisa (contratos_ambiguos) para a pessoa conferir.
+3. Índice + taxa:      "CDB Z IPCA+ 6" ou "CDB Z IPCA" com Taxa 6 -> IPCA + 6% ao ano.
+                       "CDB W CDI + 2"               -> CDI + 2% ao ano.
+4. Tesouro Direto (quando o site não trouxe o preço): Selic + Taxa,
+   IPCA+ / Renda+ / Educa+ -> IPCA + Taxa (IGP-M também, aproximado pelo IPCA),
+   Prefixado -> Taxa ao ano.
+
+Tudo é contado em DIAS ÚTEIS (252 no ano, motor/calendario.py), com as taxas
+diárias do Banco Central (motor/indices.py). Para não calcular potência linha a
+linha, cada "índice x percentual" vira UMA curva acumulada (produto acumulado
+dos fatores diários) e o rendimento de qualquer posição, entre quaisquer duas
+datas, é só a divisão de dois pontos dessa curva.
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from motor import calendario, indices
+from motor.titulos_tesouro import normalizar as normalizar_tesouro
+
+TIPOS_RENDA_FIXA = ("Renda Fixa", "Tesouro Direto")
+
+# Palavras que indicam cada índice (só valem inteiras)
+_INDICES = {"CDI": "CDI", "DI": "CDI", "SELIC": "SELIC", "IPCA": "IPCA"}
+_NUMERO = r"(\d+(?:[.,]\d+)?)"
+
+# Ninguém contrata "12% do CDI": abaixo disso, a Taxa de um "CDB X CDI" é % ao ano (formulário antigo)
+PERCENTUAL_MINIMO = 50.0
+
+
+# Nome + Taxa -> (índice ou None para prefixado, % do índice, taxa ao ano por cima)
+def contrato(nome, tipo, taxa):
+    taxa = float(taxa) if pd.notna(taxa) else 0.0
+    if tipo not in TIPOS_RENDA_FIXA: return None, 100.0, taxa
+    if tipo == "Tesouro Direto":
+        familia = normalizar_tesouro(nome)[0]
+        if familia == "SELIC" and taxa < 5: return "SELIC", 100.0, taxa # Taxa alta: a pessoa anotou a taxa total
+        if familia in ("IPCA", "IGPM", "RENDA+", "EDUCA+"): return "IPCA", 100.0, taxa
+        return None, 100.0, taxa
+
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode().upper()
+    percentual = re.search(rf"{_NUMERO}\s*%\s*(?:DO\s+|DA\s+)?(CDI|DI|SELIC)\b", texto)
+    mais = re.search(rf"\b(CDI|DI|SELIC|IPCA)\s*\+\s*{_NUMERO}", texto)
+    if percentual:
+        return _INDICES[percentual.group(2)], _numero(percentual.group(1)), _numero(mais.group(2)) if mais else 0.0
+    if mais: return _INDICES[mais.group(1)], 100.0, _numero(mais.group(2))
+
+    palavra = re.search(r"\b(CDI|DI|SELIC|IPCA)\b", texto)
+    if not palavra: return None, 100.0, taxa
+    indice = _INDICES[palavra.group(1)]
+    # Sem número no nome: pós-fixado é cotado em % do índice; IPCA, em taxa por cima
+    if indice == "IPCA": return "IPCA", 100.0, taxa
+    if 0 < taxa < PERCENTUAL_MINIMO: return None, 100.0, taxa # Taxa em % a.a. do formulário antigo
+    return indice, taxa if taxa > 0 else 100.0, 0.0
+
+
+# Renda Fixa com CDI/Selic no nome mas Taxa baixa demais para ser "% do índice".
+# Ficam como prefixadas (como eram antes); a página mostra a lista para a pessoa conferir.
+def contratos_ambiguos(posicoes):
+    rf = posicoes[posicoes["Tipo"] == "Renda Fixa"]
+    taxa = rf["Taxa"].fillna(0.0)
+    suspeitos = rf[(taxa > 0) & (taxa < PERCENTUAL_MINIMO)]
+    return sorted({ativo for ativo in suspeitos["Ativo"] if _indice_sem_numero(ativo)})
+
+
+# Função Principal: quanto R$ 1 aplicado em 'inicio' vale em cada uma das 'datas'
+# 'contratos' tem as colunas Ativo, Tipo e Taxa (uma linha por posição).
+# Devolve uma matriz (datas x posições). Antes da compra, o fator é 1.
+def fatores(contratos, inicio, datas):
+    n = len(contratos)
+    datas = pd.DatetimeIndex(datas)
+    if n == 0 or len(datas) == 0: return np.ones((len(datas), n))
+
+    # Cada contrato diferente é lido uma vez
+    chaves = list(zip(contratos["Ativo"], contratos["Tipo"], contratos["Taxa"].fillna(0.0)))
+    lidos = {chave: contrato(*chave) for chave in set(chaves)}
+    indice = np.array([lidos[c][0] or "" for c in chaves])
+    percentual = np.array([lidos[c][1] for c in chaves], dtype=float)
+    spread = np.array([lidos[c][2] for c in chaves], dtype=float)
+
+    # Dias úteis de cada compra até cada data (a grade vai do dia útil da compra mais antiga até a última data)
+    inicio = pd.to_datetime(np.asarray(inicio)).normalize()
+    grade = calendario.pregoes(min(inicio.min(), datas.min()), datas.max())
+    pos_inicio = grade.searchsorted(inicio)
+    pos_fim = grade.searchsorted(datas.normalize())
+    dias = np.clip(pos_fim[:, None] - pos_inicio[None, :], 0, None)
+
+    # Taxa por cima (e o prefixado inteiro): (1 + taxa)^(dias úteis / 252)
+    resultado = (1 + spread / 100)[None, :] ** (dias / calendario.DIAS_UTEIS_ANO)
+
+    # Pós-fixado: uma curva acumulada por (índice, percentual); o fator é curva[fim] / curva[compra]
+    for nome, pct in set(zip(indice[indice != ""], percentual[indice != ""])):
+        colunas = np.flatnonzero((indice == nome) & (percentual == pct))
+        diarias = indices.taxas_diarias(nome, grade[0], grade[-1]).to_numpy() if len(grade) else np.empty(0)
+        curva = np.concatenate([[1.0], np.cumprod(1 + diarias * pct / 100)])
+        razao = curva[pos_fim][:, None] / curva[pos_inicio[colunas]][None, :]
+        resultado[:, colunas] *= np.where(dias[:, colunas] > 0, razao, 1.0)
+    return resultado
+
+
+# Preço de hoje de cada posição (PM corrigido pelo contrato), para a página da Carteira.
+# Ações, FIIs etc. (sem Taxa) ficam com o próprio PM: quem tem cotação usa a cotação.
+def precos_corrigidos(posicoes, hoje=None):
+    hoje = pd.Timestamp.today().normalize() if hoje is None else pd.Timestamp(hoje)
+    fator = fatores(posicoes, posicoes["Data_Inicial"], [hoje])[0]
+    return posicoes["PM"].to_numpy(dtype=float) * fator
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# O nome cita CDI/Selic, mas sem dizer quanto ("CDB X CDI"): a Taxa é que diria
+def _indice_sem_numero(nome):
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode().upper()
+    if re.search(rf"{_NUMERO}\s*%\s*(?:DO\s+|DA\s+)?(CDI|DI|SELIC)\b", texto): return False
+    if re.search(rf"\b(CDI|DI|SELIC|IPCA)\s*\+\s*{_NUMERO}", texto): return False
+    palavra = re.search(r"\b(CDI|DI|SELIC|IPCA)\b", texto)
+    return bool(palavra) and palavra.group(1) != "IPCA"
+
+
+# "5,5" ou "5.5" -> 5.5
+def _numero(texto):
+    return float(texto.replace(",", "."))
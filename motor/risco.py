@@ -0,0 +1,164 @@
+"""
+================================================================================
+⚠️ FINANK - RISCO DA CARTEIRA (VOLATILIDADE, VaR, DRAWDOWN)
+================================================================================
+A página da Carteira mostra quanto cada ativo subiu ou caiu (Var_%), mas não
+diz quanto a carteira INTEIRA costuma balançar. Aqui, a partir dos retornos
+diários de todos os ativos (um "painel": dias x ativos), eu calculo:
+
+1. Covariância: como os ativos andam juntos (e a correlação, mais fácil de ler).
+2. Volatilidade da carteira: o desvio padrão dos retornos diários, anualizado
+   (x raiz de 252 pregões). Já conta que ativos diferentes se compensam.
+3. VaR (Value at Risk) de 1 dia: "em 95% dos dias, não perco mais que X".
+   - Histórico: o pior 5% dos dias que a carteira de HOJE teria vivido.
+   - Paramétrico: supondo retornos "normais" (média e desvio padrão).
+4. CVaR: a perda MÉDIA nesses 5% piores dias (o "quanto dói" quando dá ruim).
+5. Drawdown máximo: a maior queda de um pico até o fundo seguinte.
+6. Contribuição de risco: quanto da volatilidade vem de cada ativo
+   (as contribuições somam 100%; um ativo pode "pesar" pouco e contribuir muito).
+
+Tudo em matrizes do numpy: 200 ativos x 1 ano de pregões é instantâneo.
+Renda Fixa, Tesouro e ativos sem cotação entram como "sem oscilação".
+
+As contas só são refeitas quando a carteira (quanto tenho de cada ativo) ou o
+painel de preços mudam; o painel é reaproveitado por FRESCOR_HISTORICO segundos.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from motor.config import FRESCOR_HISTORICO
+from motor.historico import obter_historicos
+from motor.mercado import simbolos_yahoo
+
+DIAS_UTEIS_ANO = 252
+CONFIANCA = 0.95
+MINIMO_DIAS = 20 # Com menos pregões que isso, as contas não querem dizer nada
+
+_PAINEIS = {}               # (símbolos, período) -> (quando, retornos)
+_MEDIDAS = OrderedDict()    # (exposições, assinatura do painel, confiança) -> medidas
+_MAXIMO_MEDIDAS = 32
+_TRAVA = threading.Lock()
+
+
+# Função Principal: o risco das posições da página (colunas Tipo, Ativo e Saldo_Atual)
+# Devolve o dicionário de medir_risco() ou None se não houver histórico suficiente.
+def risco_da_carteira(posicoes, confianca=CONFIANCA, periodo="1y"):
+    if posicoes.empty or posicoes["Saldo_Atual"].sum() <= 0: return None
+    simbolos = simbolos_yahoo(posicoes)
+    valores = posicoes.groupby("Ativo", sort=True)["Saldo_Atual"].sum()
+    simbolo_do_ativo = simbolos.groupby(posicoes["Ativo"]).first().reindex(valores.index)
+
+    retornos = painel_retornos(simbolo_do_ativo.dropna().tolist(), periodo)
+    chave = (tuple(valores.round(2).items()), _assinatura(retornos), confianca)
+    with _TRAVA:
+        if chave in _MEDIDAS:
+            _MEDIDAS.move_to_end(chave)
+            return _MEDIDAS[chave]
+
+    # Cada ativo com a coluna de retornos do seu símbolo (sem símbolo: zeros)
+    colunas = retornos.reindex(columns=simbolo_do_ativo.fillna("").tolist())
+    colunas.columns = valores.index
+    medidas = medir_risco(colunas, valores, confianca)
+    with _TRAVA:
+        _MEDIDAS[chave] = medidas
+        while len(_MEDIDAS) > _MAXIMO_MEDIDAS: _MEDIDAS.popitem(last=False)
+    return medidas
+
+
+# Retornos diários (dias úteis x símbolos), a partir do histórico em disco (motor/historico.py).
+# Preço ajustado: o dividendo entra no retorno. Dia sem pregão repete o último preço.
+def painel_retornos(simbolos, periodo="1y"):
+    chave = (tuple(sorted(set(simbolos))), periodo)
+    with _TRAVA: guardado = _PAINEIS.get(chave)
+    if guardado and time.time() - guardado[0] < FRESCOR_HISTORICO: return guardado[1]
+
+    historicos = obter_historicos(list(chave[0]), periodo=periodo) if chave[0] else {}
+    fechamentos = {s: df["Close"] for s, df in historicos.items() if not df.empty}
+    if fechamentos:
+        precos = pd.DataFrame(fechamentos).sort_index().ffill()
+        # Cripto negocia no fim de semana: o movimento do sábado e do domingo entra na segunda
+        precos = precos[precos.index.dayofweek < 5]
+        retornos = precos.pct_change().iloc[1:]
+    else: retornos = pd.DataFrame()
+    with _TRAVA: _PAINEIS[chave] = (time.time(), retornos)
+    return retornos
+
+
+# As contas (sem internet, sem cache): 'retornos' é dias x ativos, 'valores' é R$ em cada ativo
+# (na mesma ordem das colunas). Retorno que falta (antes do ativo existir) conta como zero.
+def medir_risco(retornos, valores, confianca=CONFIANCA):
+    if len(retornos) < MINIMO_DIAS: return None
+    nomes = list(retornos.columns)
+    total = float(np.sum(valores))
+    pesos = np.asarray(valores, dtype=float) / total
+    R = np.nan_to_num(retornos.to_numpy(dtype=float))
+
+    covariancia = np.atleast_2d(np.cov(R, rowvar=False))
+    diario = R @ pesos # Retorno da carteira de hoje em cada dia do passado
+    sigma = float(np.sqrt(max(pesos @ covariancia @ pesos, 0.0)))
+
+    # Histórico: os piores (1 - confiança) dos dias
+    corte = np.quantile(diario, 1 - confianca)
+    var_historico = -corte
+    cvar_historico = -diario[diario <= corte].mean()
+
+    # Paramétrico (normal): média - z x desvio; o CVaR usa a densidade no ponto de corte
+    normal = NormalDist()
+    z = normal.inv_cdf(confianca)
+    media = float(diario.mean())
+    var_parametrico = -(media - z * sigma)
+    cvar_parametrico = -(media - sigma * normal.pdf(z) / (1 - confianca))
+
+    # Drawdown: o valor da carteira (começando em 1) contra o maior valor até ali
+    curva = np.cumprod(1 + diario)
+    drawdown = curva / np.maximum.accumulate(curva) - 1
+
+    # Contribuição de risco: peso x (covariância com a carteira) / volatilidade da carteira
+    marginal = covariancia @ pesos / sigma if sigma > 0 else np.zeros_like(pesos)
+    contribuicao = pesos * marginal
+    volatilidades = np.sqrt(np.diag(covariancia) * DIAS_UTEIS_ANO)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        desvios = np.sqrt(np.diag(covariancia))
+        correlacao = np.nan_to_num(covariancia / np.outer(desvios, desvios))
+    np.fill_diagonal(correlacao, 1.0)
+
+    return {
+        "total": total,
+        "dias": len(R),
+        "confianca": confianca,
+        "volatilidade_anual": sigma * np.sqrt(DIAS_UTEIS_ANO),
+        "var_historico": var_historico,
+        "cvar_historico": cvar_historico,
+        "var_parametrico": var_parametrico,
+        "cvar_parametrico": cvar_parametrico,
+        "drawdown_maximo": float(drawdown.min()),
+        "contribuicoes": pd.DataFrame({
+            "Ativo": nomes,
+            "Peso": pesos,
+            "Volatilidade_Anual": volatilidades,
+            "Contribuicao": contribuicao / sigma if sigma > 0 else np.zeros_like(pesos), # Fração do risco (soma 1)
+        }).sort_values("Contribuicao", ascending=False, ignore_index=True),
+        "covariancia": pd.DataFrame(covariancia * DIAS_UTEIS_ANO, index=nomes, columns=nomes),
+        "correlacao": pd.DataFrame(correlacao, index=nomes, columns=nomes),
+    }
+
+
+# Esvazia os painéis e as medidas guardadas (testes e benchmarks)
+def limpar_memoria():
+    with _TRAVA:
+        _PAINEIS.clear()
+        _MEDIDAS.clear()
+
+
+# --- FUNÇÕES INTERNAS ---
+
+# O que identifica um painel sem olhar os números todos: tamanho, último dia e o último retorno de cada ativo
+def _assinatura(retornos):
+    if retornos.empty: return ()
+    return (retornos.shape, retornos.index[-1], tuple(retornos.columns), tuple(retornos.iloc[-1].round(10).fillna(0.0)))
@@ -0,0 +1,124 @@
+"""
+================================================================================
+🏛️ FINANK - ÍNDICE DE NOMES DO TESOURO DIRETO
+================================================================================
+Cada pessoa escreve o nome do título de um jeito: "TESOURO IPCA+ 2045",
+"IPCA 2045", "NTN-B Principal 2045"... e a lista oficial usa outro. Antes eu
+procurava "o nome digitado está DENTRO de algum nome oficial?", título por
+título, e ficava com o primeiro que aparecesse (que nem sempre era o certo).
+
+Agora cada nome vira uma "chave" com três partes:
+1. Família: SELIC, PREFIXADO, IPCA, IGPM, RENDA+ ou EDUCA+
+   (também entende os nomes técnicos: LFT, LTN, NTN-F, NTN-B, NTN-C).
+2. Ano de vencimento: 2045 (ou só "45").
+3. Paga juros semestrais (cupom)? Sim / Não / Não disse.
+
+O índice é montado UMA vez para cada lista de preços do Tesouro; depois disso
+achar um título é só olhar num dicionário. Se o nome não der uma chave completa
+(um erro de digitação, por exemplo), tento o nome oficial mais parecido, mas
+nunca de outro ano de vencimento.
+"""
+
+import difflib
+import re
+import threading
+import unicodedata
+
+# (família, palavras que indicam essa família), das mais específicas para as mais gerais.
+# As palavras só valem inteiras: "PRE" não confunde com "PRECO".
+FAMILIAS = [
+    ("RENDA+", ("RENDA",)),
+    ("EDUCA+", ("EDUCA",)),
+    ("IGPM", ("IGPM", "IGP M", "NTNC")),
+    ("IPCA", ("IPCA", "NTNB")),
+    ("SELIC", ("SELIC", "LFT")),
+    ("PREFIXADO", ("PREFIXADO", "PRE", "LTN", "NTNF")),
+]
+
+_PALAVRAS_CUPOM = ("JUROS SEMESTRAIS", "SEMESTRAIS", "SEMESTRAL", "CUPOM", "JS")
+
+
+# Texto sem acento, em maiúsculas, só com letras, números e "+"
+def limpar(nome):
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode().upper()
+    texto = re.sub(r"NTN\s*-?\s*([BCF])", r"NTN\1", texto) # "NTN-B" e "NTN B" viram "NTNB"
+    texto = re.sub(r"[^A-Z0-9+]+", " ", texto)
+    return " ".join(texto.split())
+
+
+# Nome -> (família, ano, cupom). Partes que não deu para descobrir ficam None.
+def normalizar(nome):
+    texto = limpar(nome)
+    palavras = f" {texto.replace('+', ' ')} "
+
+    familia = None
+    for candidata, sinais in FAMILIAS:
+        if any(f" {sinal} " in palavras for sinal in sinais):
+            familia = candidata
+            break
+
+    # Ano: 4 dígitos (2045) ou, se não tiver, 2 dígitos soltos (45)
+    ano = re.search(r"\b(20\d{2})\b", texto) or re.search(r"\b(\d{2})\b", texto)
+    ano = (int(ano.group(1)) if len(ano.group(1)) == 4 else 2000 + int(ano.group(1))) if ano else None
+
+    # Cupom: os nomes técnicos já dizem; senão, procuro "juros semestrais" e parecidos
+    if " PRINCIPAL " in palavras or " LTN " in palavras: cupom = False
+    elif any(f" {sinal} " in palavras for sinal in ("NTNB", "NTNC", "NTNF")): cupom = True
+    elif any(f" {sinal} " in palavras for sinal in _PALAVRAS_CUPOM): cupom = True
+    else: cupom = None
+    return familia, ano, cupom
+
+
+class IndiceTesouro:
+    def __init__(self, mapa_precos):
+        self.precos = {str(nome).upper(): preco for nome, preco in mapa_precos.items()}
+        self.por_chave = {}  # (família, ano, cupom) -> nome oficial
+        self.por_limpo = {}  # nome oficial "limpo" -> nome oficial (para a busca aproximada)
+        for nome in self.precos:
+            familia, ano, cupom = normalizar(nome)
+            if familia and ano: self.por_chave.setdefault((familia, ano, bool(cupom)), nome)
+            self.por_limpo[limpar(nome)] = nome
+        self._achados = {} # Nome digitado -> nome oficial (cada nome diferente é resolvido uma vez)
+
+    # Nome digitado -> nome oficial (ou None se não existir título compatível)
+    def procurar(self, nome):
+        if nome not in self._achados: self._achados[nome] = self._procurar(nome)
+        return self._achados[nome]
+
+    # Nome digitado -> preço do título (ou None)
+    def preco(self, nome):
+        oficial = self.procurar(nome)
+        return self.precos.get(oficial) if oficial else None
+
+    def _procurar(self, nome):
+        if str(nome).upper() in self.precos: return str(nome).upper()
+        familia, ano, cupom = normalizar(nome)
+
+        if familia and ano:
+            # Sem dizer o cupom, prefiro o título sem cupom (o mais comum na pessoa física).
+            # Se o cupom pedido não existe nesse ano, o outro é o único candidato da família.
+            ordem = [False, True] if cupom is None else [cupom, not cupom]
+            for com_cupom in ordem:
+                if (familia, ano, com_cupom) in self.por_chave: return self.por_chave[(familia, ano, com_cupom)]
+            return None
+
+        # Não deu para montar a chave: o nome oficial mais parecido (do mesmo ano, se tiver ano)
+        parecidos = difflib.get_close_matches(limpar(nome), list(self.por_limpo), n=3, cutoff=0.6)
+        for parecido in parecidos:
+            oficial = self.por_limpo[parecido]
+            if ano is None or normalizar(oficial)[1] == ano: return oficial
+        return None
+
+
+# O índice da última lista de preços (a lista muda no máximo a cada hora)
+_ULTIMO = {}
+_TRAVA = threading.Lock()
+
+
+# Função Principal: o índice de uma lista {nome oficial: preço}, montado uma vez por lista
+def indice_tesouro(mapa_precos):
+    chave = tuple(sorted(mapa_precos.items()))
+    with _TRAVA:
+        if _ULTIMO.get("chave") != chave:
+            _ULTIMO["chave"], _ULTIMO["indice"] = chave, IndiceTesouro(mapa_precos)
+        return _ULTIMO["indice"]
@@ -0,0 +1,18 @@
+"""
+================================================================================
+🌎 FINANK - TRADUTOR
+================================================================================
+As descrições do Yahoo vêm em inglês. Todas as páginas traduzem por aqui, para
+o Google Tradutor também poder ser gravado e reproduzido (motor/gravacao.py).
+"""
+
+from deep_translator import GoogleTranslator
+
+from motor.config import TRADUCAO_ATIVA
+from motor.gravacao import gravavel
+
+
+@gravavel("google_tradutor")
+def traduzir(texto, destino='pt'):
+    if not TRADUCAO_ATIVA: return texto
+    return GoogleTranslator(source='auto', target=destino).translate(texto)
@@ -0,0 +1,72 @@
+"""
+================================================================================
+🛫 FINANK - BUSCA ÚNICA ("SINGLE-FLIGHT")
+================================================================================
+Problema: às 10h da manhã o cache expira e 30 pessoas abrem a Carteira no mesmo
+segundo. Cada uma dispara o SEU download no Yahoo, e o Yahoo nos bloqueia.
+
+Solução: a primeira pessoa que pede uma coisa vira a "líder" e faz a busca.
+Quem chegar pedindo a MESMA coisa enquanto ela está em andamento não busca
+nada: só espera a líder terminar e recebe uma cópia do mesmo resultado.
+"""
+
+import copy
+import functools
+import threading
+
+from motor.chaves import chave_argumentos, identificar_funcao
+
+_VOOS = {}
+_TRAVA = threading.Lock()
+
+
+# Um "voo" é uma busca em andamento; quem espera fica parado no 'pronto'.
+class _Voo:
+    def __init__(self):
+        self.pronto = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+# Função Principal: Executar só UMA vez por chave
+# Se já existe uma busca igual rodando, espero por ela (até 'espera_maxima'
+# segundos; se a líder travar, eu mesmo faço a busca para não ficar preso).
+def executar_uma_vez(chave, funcao, *args, espera_maxima=60, **kwargs):
+    with _TRAVA:
+        voo = _VOOS.get(chave)
+        lider = voo is None
+        if lider:
+            voo = _Voo()
+            _VOOS[chave] = voo
+
+    if not lider:
+        if voo.pronto.wait(espera_maxima):
+            if voo.erro is not None: raise voo.erro
+            # Cópia: cada sessão pode mexer no seu resultado sem afetar as outras
+            return copy.deepcopy(voo.resultado)
+        return funcao(*args, **kwargs)
+
+    try:
+        voo.resultado = funcao(*args, **kwargs)
+        return voo.resultado
+    except Exception as e:
+        voo.erro = e
+        raise
+    finally:
+        with _TRAVA:
+            _VOOS.pop(chave, None)
+        voo.pronto.set()
+
+
+# O Decorador: @voo_unico
+# A chave é a própria função + os argumentos.
+# Pode ficar embaixo do @st.cache_data: quando o cache expira e várias sessões
+# erram o cache juntas, só uma delas vai de fato à internet.
+def voo_unico(funcao):
+    id_funcao = identificar_funcao(funcao)
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        return executar_uma_vez((id_funcao, chave_argumentos(args, kwargs)), funcao, *args, **kwargs)
+
+    return envoltorio
@@ -0,0 +1,192 @@
+"""
+================================================================================
+📈 FINANK - PONTO ÚNICO DE CONTATO COM O YAHOO FINANCE
+================================================================================
+Todas as chamadas ao yfinance do app passam por aqui. Assim dá para gravar e
+reproduzir as respostas (motor/gravacao.py) sem mexer em cada página.
+
+Quem precisa de preços em lote deve preferir motor/mercado.py (painel) ou
+motor/historico.py (OHLCV em disco), que já usam as funções abaixo.
+
+O yfinance não deixa trocar o endereço do Yahoo. Então, com o servidor simulado
+ligado (FINANK_SIMULADOR), eu mesmo leio os endpoints "chart" e "quote" do
+Yahoo por HTTP e monto os DataFrames no MESMO formato que o yfinance devolve.
+
+O yfinance também não conta QUAL ativo falhou nem POR QUÊ (só escreve no log).
+Então o download guarda o motivo de cada ativo que falhou em `dados.attrs["erros"]`,
+e falha_de_rede() separa "a internet / o Yahoo falhou" de "esse código não existe".
+"""
+
+import ast
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+from motor import cliente_http
+from motor.config import URL_SIMULADOR
+from motor.gravacao import gravavel
+
+URL_GRAFICO = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+URL_COTACAO = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+# Pool próprio do modo simulado (o do motor/paralelo.py pode estar ocupado
+# justamente com quem chamou o download)
+_POOL_SIMULADO = ThreadPoolExecutor(max_workers=8, thread_name_prefix="finank-yahoo")
+
+# Motivos que são problema do caminho até o Yahoo (rede, bloqueio, servidor fora),
+# e não do código pedido ("possibly delisted; no price data found" não entra aqui)
+_MOTIVOS_DE_REDE = re.compile(
+    r"timeout|timed out|connection|resolve|max retries|ssl|curl|ratelimit|rate limit|"
+    r"too many requests|httperror|http error|server error|circuitoaberto|requestexception",
+    re.IGNORECASE,
+)
+
+
+# yf.download com os mesmos parâmetros de sempre.
+# Os ativos que falharam vêm em dados.attrs["erros"] ({símbolo: motivo}), inclusive na gravação.
+@gravavel("yahoo")
+def download(simbolos, **kwargs):
+    if URL_SIMULADOR: return _download_http(simbolos, **kwargs)
+    _CAPTURA.local.erros = erros = {}
+    try:
+        dados = yf.download(simbolos, **kwargs)
+    finally:
+        del _CAPTURA.local.erros
+    if dados is None: dados = pd.DataFrame()
+    dados.attrs["erros"] = erros
+    return dados
+
+
+# O motivo de uma falha foi a rede / o Yahoo (e não um código sem dados)?
+def falha_de_rede(motivo):
+    return bool(_MOTIVOS_DE_REDE.search(str(motivo)))
+
+
+# Dados cadastrais e fundamentos (P/L, DY, setor, resumo...)
+@gravavel("yahoo")
+def info(ticker):
+    if URL_SIMULADOR:
+        resposta = cliente_http.get("yahoo", URL_COTACAO, params={"symbols": ticker}).json()
+        resultado = resposta.get("quoteResponse", {}).get("result") or [{}]
+        return resultado[0]
+    return yf.Ticker(ticker).info
+
+
+# Série de dividendos pagos (índice = data com)
+@gravavel("yahoo")
+def dividendos(ticker):
+    if URL_SIMULADOR:
+        divs = _grafico(ticker, periodo="max")["Dividends"]
+        return divs[divs > 0]
+    return yf.Ticker(ticker).dividends
+
+
+# Histórico curto de um ativo só (ex.: câmbio do dia)
+@gravavel("yahoo")
+def historico_ticker(ticker, periodo="1d"):
+    if URL_SIMULADOR:
+        return _ajustar(_grafico(ticker, periodo=periodo))
+    return yf.Ticker(ticker).history(period=periodo)
+
+
+# --- FUNÇÕES INTERNAS (MODO SIMULADO) ---
+
+# Imita o yf.download: colunas (Campo, Ticker), ou (Ticker, Campo) com group_by="ticker"
+def _download_http(simbolos, period=None, interval="1d", start=None, auto_adjust=True,
+                   actions=False, group_by="column", **_):
+    simbolos = [simbolos] if isinstance(simbolos, str) else list(simbolos)
+
+    def um_ativo(s):
+        # O yfinance também não explode por 1 ativo ruim: guardo o motivo e sigo
+        try: df = _grafico(s, periodo=period, inicio=start, intervalo=interval)
+        except Exception as e: return s, repr(e)
+        if df.empty: return s, None
+        if auto_adjust: df = _ajustar(df)
+        if not actions: df = df.drop(columns=["Dividends", "Stock Splits"])
+        return s, df
+
+    resultados = list(_POOL_SIMULADO.map(um_ativo, simbolos))
+    quadros = {s: df for s, df in resultados if isinstance(df, pd.DataFrame)}
+    erros = {s: df for s, df in resultados if isinstance(df, str)}
+    if not quadros: dados = pd.DataFrame()
+    else:
+        dados = pd.concat(quadros, axis=1, names=["Ticker", "Price"])
+        if group_by != "ticker":
+            dados = dados.swaplevel(axis=1)
+            dados.columns.names = ["Price", "Ticker"]
+    dados.attrs["erros"] = erros
+    return dados
+
+
+# Lê o endpoint "chart" e devolve Open/High/Low/Close/Adj Close/Volume/Dividends/Stock Splits
+def _grafico(ticker, periodo=None, inicio=None, intervalo="1d"):
+    params = {"interval": intervalo, "events": "div,splits"}
+    if inicio is not None:
+        params["period1"] = int(pd.Timestamp(inicio).timestamp())
+        params["period2"] = int(pd.Timestamp.now().timestamp())
+    else:
+        params["range"] = periodo or "1mo"
+    resposta = cliente_http.get("yahoo", URL_GRAFICO.format(ticker=ticker), params=params)
+    if resposta.status_code in cliente_http.STATUS_DE_FALHA: resposta.raise_for_status() # Servidor fora, não "sem dados"
+    resultado = (resposta.json().get("chart") or {}).get("result")
+    if not resultado: return pd.DataFrame()
+
+    r = resultado[0]
+    datas = pd.to_datetime(r.get("timestamp", []), unit="s").normalize()
+    cotacao = r["indicators"]["quote"][0]
+    df = pd.DataFrame({
+        "Open": cotacao["open"], "High": cotacao["high"], "Low": cotacao["low"],
+        "Close": cotacao["close"], "Volume": cotacao["volume"],
+    }, index=datas, dtype=float)
+    ajustado = r["indicators"].get("adjclose", [{}])[0].get("adjclose")
+    df["Adj Close"] = ajustado if ajustado is not None else df["Close"]
+
+    eventos = r.get("events", {})
+    df["Dividends"] = 0.0
+    for ev in eventos.get("dividends", {}).values():
+        data = pd.to_datetime(ev["date"], unit="s").normalize()
+        if data in df.index: df.loc[data, "Dividends"] += ev["amount"]
+    df["Stock Splits"] = 0.0
+    for ev in eventos.get("splits", {}).values():
+        data = pd.to_datetime(ev["date"], unit="s").normalize()
+        if data in df.index: df.loc[data, "Stock Splits"] = ev["numerator"] / ev["denominator"]
+
+    df.index.name = "Date"
+    return df
+
+
+# auto_adjust=True: preços corrigidos pelo "Adj Close" e sem a coluna dele
+def _ajustar(df):
+    if df.empty: return df
+    fator = df["Adj Close"] / df["Close"]
+    df = df.drop(columns="Adj Close")
+    for coluna in ("Open", "High", "Low", "Close"): df[coluna] = df[coluna] * fator
+    return df
+
+
+# --- FUNÇÕES INTERNAS (MOTIVOS DO MODO NORMAL) ---
+
+# O yf.download escreve no log, da thread de quem chamou, uma linha por motivo:
+# "['PETR4.SA', 'VALE3.SA']: ConnectionError(...)". Eu leio essas linhas de volta.
+# Cada thread só enxerga o próprio download (threading.local), então sessões juntas não se misturam.
+class _CapturaDeErros(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.local = threading.local()
+
+    def emit(self, registro):
+        erros = getattr(self.local, "erros", None)
+        if erros is None: return
+        linha = re.match(r"(\[.*?\]): (.*)", registro.getMessage(), re.DOTALL)
+        if not linha: return # O cabeçalho "N Failed downloads:"
+        try: simbolos = ast.literal_eval(linha.group(1))
+        except (ValueError, SyntaxError): return
+        for simbolo in simbolos: erros[simbolo] = linha.group(2).strip()
+
+
+_CAPTURA = _CapturaDeErros()
+logging.getLogger("yfinance").addHandler(_CAPTURA)
@@ -14,14 +14,14 @@ DIFERENCIAIS DESTE CÓDIGO:
 """
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 import urllib.parse
 import math
 import plotly.graph_objects as go
-from deep_translator import GoogleTranslator
+from motor.historico import obter_historico
+from motor.traducao import traduzir
+from motor import cliente_http, proventos, yahoo
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO VISUAL
@@ -49,7 +49,7 @@ def buscar_noticias_fii(ticker_limpo):
     noticias = []
     try:
         headers = {'User-Agent': 'Mozilla/5.0'}
-        resposta = requests.get(url, headers=headers)
+        resposta = cliente_http.get("google_news", url, headers=headers)
         soup = BeautifulSoup(resposta.content, features='xml')
         itens = soup.find_all('item')
         # Pego só as 5 primeiras para não poluir a tela
@@ -62,7 +62,7 @@ def buscar_noticias_fii(ticker_limpo):
 # Às vezes o resumo do fundo vem em inglês na API, então garantimos a tradução.
 @st.cache_data
 def traduzir_texto(texto):
-    try: return GoogleTranslator(source='auto', target='pt').translate(texto)
+    try: return traduzir(texto, 'pt')
     except: return texto
 
 # ==============================================================================
@@ -101,14 +101,14 @@ if input_usuario:
 
     try:
         # Busca os dados no Yahoo Finance
-        fii = yf.Ticker(ticker_yfinance)
-        hist = fii.history(period="1y")
+        # (o histórico de 1 ano fica salvo em disco; só as barras novas são baixadas)
+        hist = obter_historico(ticker_yfinance, "1y")
 
         if hist.empty:
             st.error(f"Fundo '{ticker_visual}' não encontrado. Verifique o código.")
         else:
             # Dados fundamentais
-            info = fii.info
+            info = yahoo.info(ticker_yfinance)
             preco_atual = hist['Close'].iloc[-1]
             
             # --- CÁLCULO DE DIVIDENDOS (A PARTE CRÍTICA) ---
@@ -117,9 +117,12 @@ if input_usuario:
             dy_anual_decimal = 0
             media_mensal = 0
             minimo_12m = 0
+            dividendos = pd.Series(dtype=float)
 
             try:
-                dividendos = fii.dividends
+                # Do mesmo histórico de 1 ano que acabei de ler (e que a Carteira usa para os proventos):
+                # nenhuma ida extra ao Yahoo
+                dividendos = proventos.dividendos(ticker_yfinance, "1y")
                 # Filtra apenas o último ano
                 um_ano_atras = pd.Timestamp.now(tz=dividendos.index.tz) - pd.DateOffset(days=365)
                 divs_12m = dividendos[dividendos.index >= um_ano_atras]
@@ -230,7 +233,7 @@ if input_usuario:
             with tab_graf:
                 st.line_chart(hist['Close'])
                 # Gráfico de barras para mostrar histórico de pagamento de dividendos
-                if not fii.dividends.empty: st.bar_chart(fii.dividends, color="#00ff41")
+                if not dividendos.empty: st.bar_chart(dividendos, color="#00ff41")
 
             with tab_news:
                 news = buscar_noticias_fii(ticker_visual)
@@ -15,13 +15,15 @@ TECNOLOGIAS USADAS AQUI:
 """
 
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from deep_translator import GoogleTranslator
-import requests
 from bs4 import BeautifulSoup
 import urllib.parse
+from motor.mercado import baixar_precos, resumo_variacao, descrever_erros
+from motor.historico import obter_historico
+from motor.paralelo import buscar_em_paralelo
+from motor.traducao import traduzir
+from motor import cliente_http, yahoo
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO VISUAL (CSS)
@@ -59,32 +61,21 @@ CESTA_BDRS = ['AAPL34.SA', 'MSFT34.SA', 'GOGL34.SA', 'AMZO34.SA', 'TSLA34.SA', '
 # Função Genérica de Ranking
 # O que ela faz: Recebe uma lista de códigos, baixa o preço de ontem e de hoje,
 # calcula quem subiu mais e me devolve o TOP 3.
+# O download é em lote (uma chamada para a cesta inteira) e os códigos que
+# falharem voltam em 'erros', sem derrubar o ranking dos outros.
 @st.cache_data(ttl=300) 
 def buscar_top_3_generico(lista_ativos):
+    painel, erros = baixar_precos(lista_ativos, periodo="2d")
     ranking = []
-    try:
-        # Baixa dados em lote para ser rápido
-        tickers = yf.Tickers(" ".join(lista_ativos))
-        for t in lista_ativos:
-            try:
-                hist = tickers.tickers[t].history(period="2d")
-                if len(hist) >= 2:
-                    fechamento_ontem = hist['Close'].iloc[-2]
-                    fechamento_hoje = hist['Close'].iloc[-1]
-                    
-                    # Cálculo da porcentagem de variação
-                    if fechamento_ontem > 0:
-                        var_pct = ((fechamento_hoje - fechamento_ontem) / fechamento_ontem) * 100
-                    else: var_pct = 0.0
-                    
-                    nome_limpo = t.replace('.SA', '')
-                    ranking.append({'ticker': nome_limpo, 'var': var_pct, 'preco': fechamento_hoje})
-            except: pass
-    except: pass
+    for t, dados in resumo_variacao(painel).items():
+        # Sem o fechamento de ontem não dá para comparar, então fica de fora
+        if painel[t].dropna().shape[0] < 2: continue
+        nome_limpo = t.replace('.SA', '')
+        ranking.append({'ticker': nome_limpo, 'var': dados['var'], 'preco': dados['preco']})
     
     # Ordena do maior para o menor e pega os 3 primeiros
     ranking.sort(key=lambda x: x['var'], reverse=True)
-    return ranking[:3]
+    return ranking[:3], erros
 
 # Função de Análise de Sentimento (NLP Simples)
 # Eu criei um dicionário de palavras "boas" e "ruins".
@@ -119,7 +110,7 @@ def buscar_noticias_inteligentes(termo_busca):
     headers = {'User-Agent': 'Mozilla/5.0'}
     noticias = []
     try:
-        resposta = requests.get(url, headers=headers)
+        resposta = cliente_http.get("google_news", url, headers=headers)
         # O BeautifulSoup organiza o XML bagunçado que o Google devolve
         try: soup = BeautifulSoup(resposta.content, features='xml')
         except: soup = BeautifulSoup(resposta.content, features='html.parser')
@@ -144,7 +135,7 @@ def buscar_noticias_inteligentes(termo_busca):
 # Usado para traduzir a descrição de empresas americanas (que vem em inglês do Yahoo)
 @st.cache_data
 def traduzir_texto(texto, destino='pt'):
-    try: return GoogleTranslator(source='auto', target=destino).translate(texto)
+    try: return traduzir(texto, destino)
     except: return texto 
 
 # Conversor de Moedas
@@ -154,7 +145,7 @@ def obter_taxa_cambio(origem, destino):
     if origem == destino: return 1.0
     try:
         par = f"{origem}{destino}=X"
-        return yf.Ticker(par).history(period="1d")['Close'].iloc[-1]
+        return yahoo.historico_ticker(par, "1d")['Close'].iloc[-1]
     except: return 1.0
 
 # ==============================================================================
@@ -192,9 +183,9 @@ if input_usuario:
 
     try:
         # Busca os dados no Yahoo Finance
-        ativo = yf.Ticker(ticker_yfinance)
-        info = ativo.info
-        hist = ativo.history(period="5d")
+        # (o histórico vem do disco e só as barras novas são baixadas)
+        info = yahoo.info(ticker_yfinance)
+        hist = obter_historico(ticker_yfinance, "5d")
 
         if hist.empty:
             st.error(f"Ativo '{ticker_visual}' não encontrado no mercado selecionado ({mercado}).")
@@ -291,12 +282,23 @@ else:
     lista_acoes = CESTA_ACOES_BR if "Nacional" in mercado else CESTA_ACOES_US
     
     with st.spinner("Analisando o mercado..."):
-        top3_acoes = buscar_top_3_generico(lista_acoes)
+        tarefas = {"acoes": (buscar_top_3_generico, lista_acoes)}
         
         # Se for Brasil, busca também os rankings de ETFs e BDRs
+        # (os três rankings são baixados AO MESMO TEMPO, não um depois do outro)
         if "Nacional" in mercado:
-            top3_etfs = buscar_top_3_generico(CESTA_ETFS)
-            top3_bdrs = buscar_top_3_generico(CESTA_BDRS)
+            tarefas["etfs"] = (buscar_top_3_generico, CESTA_ETFS)
+            tarefas["bdrs"] = (buscar_top_3_generico, CESTA_BDRS)
+        
+        # Quem não responder a tempo fica vazio e a tela mostra "Carregando..."
+        rankings, falhas = buscar_em_paralelo(tarefas)
+        top3_acoes, erros_acoes = rankings.get("acoes", ([], {}))
+        top3_etfs, erros_etfs = rankings.get("etfs", ([], {}))
+        top3_bdrs, erros_bdrs = rankings.get("bdrs", ([], {}))
+    
+    # Ranking que não chegou (tempo esgotado ou erro): mostra o motivo, não só o card vazio
+    nomes_rankings = {"acoes": "Ações", "etfs": "ETFs", "bdrs": "BDRs"}
+    if falhas: st.caption(f"⚠️ Rankings indisponíveis: {descrever_erros({nomes_rankings[n]: motivo for n, motivo in falhas.items()})}")
     
     # Exibe Cards das Ações
     col1, col2, col3 = st.columns(3)
@@ -306,6 +308,7 @@ else:
         col2.metric(top3_acoes[1]['ticker'], f"{moeda_simbolo} {top3_acoes[1]['preco']:.2f}", f"{top3_acoes[1]['var']:.2f}%")
         col3.metric(top3_acoes[2]['ticker'], f"{moeda_simbolo} {top3_acoes[2]['preco']:.2f}", f"{top3_acoes[2]['var']:.2f}%")
     else: st.warning("Mercado fechado ou dados indisponíveis.")
+    if erros_acoes: st.caption(f"⚠️ Sem cotação para: {descrever_erros(erros_acoes)}")
 
     # 2. RANKING DE ETFs (Só aparece se for Brasil)
     if "Nacional" in mercado:
@@ -318,6 +321,7 @@ else:
             c2.metric(top3_etfs[1]['ticker'], f"R$ {top3_etfs[1]['preco']:.2f}", f"{top3_etfs[1]['var']:.2f}%")
             c3.metric(top3_etfs[2]['ticker'], f"R$ {top3_etfs[2]['preco']:.2f}", f"{top3_etfs[2]['var']:.2f}%")
         else: st.info("Carregando ETFs...")
+        if erros_etfs: st.caption(f"⚠️ Sem cotação para: {descrever_erros(erros_etfs)}")
 
     # 3. RANKING DE BDRs (Só aparece se for Brasil)
     if "Nacional" in mercado:
@@ -329,4 +333,5 @@ else:
             c1.metric(top3_bdrs[0]['ticker'], f"R$ {top3_bdrs[0]['preco']:.2f}", f"{top3_bdrs[0]['var']:.2f}%")
             c2.metric(top3_bdrs[1]['ticker'], f"R$ {top3_bdrs[1]['preco']:.2f}", f"{top3_bdrs[1]['var']:.2f}%")
             c3.metric(top3_bdrs[2]['ticker'], f"R$ {top3_bdrs[2]['preco']:.2f}", f"{top3_bdrs[2]['var']:.2f}%")
-        else: st.info("Carregando BDRs...")
\ No newline at end of file
+        else: st.info("Carregando BDRs...")
+        if erros_bdrs: st.caption(f"⚠️ Sem cotação para: {descrever_erros(erros_bdrs)}")
\ No newline at end of file
@@ -10,97 +10,92 @@ O GRANDE TRUQUE (A LÓGICA HÍBRIDA):
 1. Ações/Cripto/FIIs: Buscamos o preço atual no Yahoo Finance.
 2. Tesouro Direto: Buscamos o preço no site oficial do Tesouro (API JSON).
 3. Renda Fixa/Outros: Se não acharmos o preço, usamos Matemática Financeira
-   (Juros Compostos) para projetar quanto vale hoje baseado na taxa que você contratou.
+   (o contrato: prefixado, % do CDI ou IPCA + taxa, em dias úteis) para projetar
+   quanto vale hoje baseado na taxa que você contratou.
 
 Ninguém fica para trás. Todo ativo tem seu valor atualizado.
 """
 
 import streamlit as st
 import pandas as pd
-import os
 import plotly.express as px
-import yfinance as yf
-import requests
 import numpy as np
 from datetime import datetime
+from motor.cache import cache_swr
+from motor.voo_unico import voo_unico
+from motor import cliente_http
+from motor.disjuntor import lembrar, ultimo_bom
+from motor import carteiras
+from motor.mercado import baixar_precos, simbolos_yahoo
+from motor.patrimonio import curva_patrimonio
+from motor.risco import risco_da_carteira
+from motor.proventos import proventos_da_carteira
+from motor import importacao, rebalanceamento, renda_fixa
+from motor.custo import METODOS
+from motor.titulos_tesouro import indice_tesouro
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO INICIAL
 # ==============================================================================
 st.set_page_config(page_title="Minha Carteira", layout="wide", page_icon="💰")
 
-# Defino o nome do nosso "Banco de Dados" (que na verdade é um arquivo de texto simples)
-ARQUIVO_DB = "carteira.csv"
+# Cada pessoa/conta tem a sua carteira (motor/carteiras.py), com o seu próprio livro.
+# Onde ficam os lançamentos: por padrão um banco SQLite (motor/armazenamento.py).
+# A "carteira.csv" antiga é importada sozinha na primeira vez (vira a carteira "Principal")
+# e o CSV continua existindo como formato de importação/exportação
+# (ou como banco, com FINANK_ARMAZENAMENTO=csv).
+CONSOLIDADO = "🧮 Todas (consolidado)"
+
+st.sidebar.header("👤 Carteira")
+nomes_carteiras = carteiras.listar_carteiras()
+escolha_carteira = st.sidebar.selectbox("Carteira", list(nomes_carteiras.values()) + [CONSOLIDADO])
+with st.sidebar.expander("➕ Nova carteira"):
+    nome_nova = st.text_input("Nome (ex: Conta da Maria)")
+    if st.button("Criar carteira"):
+        try:
+            carteiras.criar_carteira(nome_nova)
+            st.rerun()
+        except ValueError as e: st.error(str(e))
+
+id_carteira = next((i for i, nome in nomes_carteiras.items() if nome == escolha_carteira), None)
+armazenamento = carteiras.abrir(id_carteira) if id_carteira else None
 
 # ==============================================================================
 # 2. MOTOR DE DADOS & CÁLCULOS (O CÉREBRO)
 # ==============================================================================
 
-# Função 1: Carregar o Banco de Dados
-# Se o arquivo não existir, eu crio um vazio. Se existir, eu leio.
+# Função 1: Carregar o Banco de Dados (todos os lançamentos)
 def carregar_dados():
-    if not os.path.exists(ARQUIVO_DB):
-        # Cria as colunas que precisamos
-        df = pd.DataFrame(columns=["Data", "Ativo", "Tipo", "Operacao", "Quantidade", "Preco", "Taxa"])
-        df.to_csv(ARQUIVO_DB, index=False)
-        return df
-    try:
-        df = pd.read_csv(ARQUIVO_DB)
-        # Garante que a coluna 'Taxa' existe (para compatibilidade com versões antigas)
-        if "Taxa" not in df.columns: df["Taxa"] = 0.0
-        return df
+    try: return armazenamento.carregar()
     except: return pd.DataFrame()
 
 # Função 2: Salvar uma Nova Compra/Venda
-# Pega o que você digitou no formulário e adiciona uma nova linha no CSV.
+# Só ACRESCENTA um lançamento (não reescreve a carteira inteira).
 def salvar_operacao(data, ativo, tipo, operacao, qtd, preco, taxa):
-    df = carregar_dados()
-    novo = pd.DataFrame({
-        "Data": [data], "Ativo": [ativo.upper()], "Tipo": [tipo], 
-        "Operacao": [operacao], "Quantidade": [qtd], "Preco": [preco], "Taxa": [taxa]
+    armazenamento.registrar({
+        "Data": data, "Ativo": ativo.upper(), "Tipo": tipo,
+        "Operacao": operacao, "Quantidade": qtd, "Preco": preco, "Taxa": taxa
     })
-    # Concatena (junta) o antigo com o novo e salva
-    pd.concat([df, novo], ignore_index=True).to_csv(ARQUIVO_DB, index=False)
     st.success("✅ Operação salva com sucesso!")
     st.rerun() # Recarrega a página para mostrar os dados novos
 
 # Função 3: Calcular a Posição Atual (A Matemática)
 # Transforma o histórico "Comprei 10, Vendi 2" em "Tenho 8".
-def calcular_posicao_atual(df):
-    if df.empty: return pd.DataFrame()
-    carteira = df.copy()
-    
-    carteira['Data'] = pd.to_datetime(carteira['Data'])
-    
-    # Se for VENDA, transformo a quantidade em negativo para subtrair
-    carteira['Qtd_Sinal'] = carteira.apply(lambda x: x['Quantidade'] * -1 if x['Operacao'] == 'Venda' else x['Quantidade'], axis=1)
-    carteira['Financeiro'] = carteira['Qtd_Sinal'] * carteira['Preco']
-
-    # Agrupo tudo por Ativo (Ex: Soma todas as compras de PETR4)
-    resumo = carteira.groupby(['Tipo', 'Ativo']).agg({
-        'Qtd_Sinal': 'sum',      # Quantas sobraram
-        'Financeiro': 'sum',     # Quanto gastei no total
-        'Taxa': 'mean',          # Média da taxa contratada
-        'Data': 'min'            # Data da primeira compra (para calcular o tempo)
-    }).reset_index()
-    
-    # Renomeio para ficar bonito
-    resumo.rename(columns={'Qtd_Sinal': 'Qtd_Atual', 'Financeiro': 'Total_Investido', 'Data': 'Data_Inicial'}, inplace=True)
-    
-    # Filtro só o que eu ainda tenho (Qtd > 0)
-    resumo = resumo[resumo['Qtd_Atual'] > 0]
-    
-    # Calculo o Preço Médio (PM) -> Total Gasto / Quantidade
-    resumo['PM'] = resumo['Total_Investido'] / resumo['Qtd_Atual']
-    return resumo
+# Quem soma é o próprio armazenamento (no SQLite, as posições pelo preço médio já ficam prontas no banco).
+# O resultado fica na memória (motor/carteiras.py) até o livro desta carteira mudar.
+def calcular_posicao_atual(metodo="medio"):
+    return carteiras.posicoes(id_carteira, metodo)
 
 # --- MOTOR DO TESOURO DIRETO (API OFICIAL) ---
 # Aqui eu acesso o "backstage" do site do Tesouro para pegar os preços reais.
+# Quando o cache vence e várias sessões pedem ao mesmo tempo, só UMA vai ao site
+# (@voo_unico); as outras esperam e recebem o mesmo resultado.
 @st.cache_data(ttl=3600) # Cache de 1 hora para não sobrecarregar
+@voo_unico
 def buscar_dados_tesouro_direto():
     url = "https://www.tesourodireto.com.br/json/br/com/b3/tesourodireto/service/api/treasurybondsinfo.json"
     try:
-        response = requests.get(url, verify=False, timeout=5)
+        response = cliente_http.get("tesouro", url, verify=False)
         dados = response.json()
         mapa_precos = {}
         
@@ -115,95 +110,136 @@ def buscar_dados_tesouro_direto():
                 preco = titulo.get('untrInvstmtVal')
             
             if preco: mapa_precos[nome] = float(preco)
+        lembrar("tesouro_precos", mapa_precos)
         return mapa_precos
-    except: return {}
+    # Site fora (ou disjuntor aberto)? Uso os últimos preços que deram certo.
+    except: return ultimo_bom("tesouro_precos", {})
 
 # Função 4: O Grande Orquestrador de Preços
 # Essa função decide de onde vem o preço de cada ativo.
-@st.cache_data(ttl=300)
+# Ela mesma não tem cache: a única parte cara (o Yahoo) fica em cotacoes_online,
+# com uma chave pequena. O resto é uma junção em colunas que leva milissegundos.
 def buscar_precos_online(df_posicao):
     if df_posicao.empty: return df_posicao
-    
-    # 1. Pego os dados do Tesouro
-    mapa_tesouro = buscar_dados_tesouro_direto()
-    
-    # 2. Preparo a lista para o Yahoo Finance (Ações, FIIs, Cripto)
-    tickers_map = {}
-    for idx, row in df_posicao.iterrows():
-        t_yahoo = None
-        # Regra para saber se é Brasil (.SA) ou EUA
-        if row['Tipo'] in ["Ação", "FII", "ETF", "BDR"]:
-            ativo = row['Ativo']
-            if "." in ativo: t_yahoo = ativo
-            elif any(char.isdigit() for char in ativo): t_yahoo = ativo + ".SA" # Tem número? É Brasil.
-            else: t_yahoo = ativo # Só letras? É EUA.
-                
-        elif row['Tipo'] == "Cripto":
-            t_yahoo = row['Ativo'] + "-USD" if not "-" in row['Ativo'] else row['Ativo']
-            
-        if t_yahoo: tickers_map[t_yahoo] = row['Ativo']
 
-    # 3. Baixo tudo do Yahoo de uma vez
-    cotacoes_yahoo = {}
-    if tickers_map:
-        lista_download = list(tickers_map.keys())
-        try:
-            dados = yf.download(lista_download, period="1d", progress=False)['Close']
-            # Tratamento de erro se vier só 1 ativo ou vários
-            if len(lista_download) == 1:
-                cotacoes_yahoo[tickers_map[lista_download[0]]] = float(dados.iloc[-1])
-            else:
-                for t_y in lista_download:
-                    try: cotacoes_yahoo[tickers_map[t_y]] = float(dados[t_y].iloc[-1])
-                    except: pass
-        except: pass
-
-    # 4. Aplico o preço correto linha por linha
-    def get_price(row):
-        ativo_nome = row['Ativo']
-        tipo = row['Tipo']
-        
-        # Estratégia A: É Tesouro Direto?
-        if tipo == "Tesouro Direto":
-            # Tenta achar o nome exato ou parecido na lista oficial
-            if ativo_nome in mapa_tesouro: return mapa_tesouro[ativo_nome]
-            for nome_oficial, preco in mapa_tesouro.items():
-                if ativo_nome in nome_oficial: return preco
-            
-        # Estratégia B: É Ação/FII/Cripto? (Veio do Yahoo)
-        if ativo_nome in cotacoes_yahoo: return cotacoes_yahoo[ativo_nome]
-        
-        # Estratégia C: É Renda Fixa sem cotação? (Juros Compostos)
-        # Se o usuário informou uma TAXA, eu calculo quanto rendeu matematicamente.
-        if row['Taxa'] > 0:
-            hoje = datetime.now()
-            anos_passados = (hoje - row['Data_Inicial']).days / 365.25
-            if anos_passados <= 0: return row['PM'] # Acabou de comprar
-            
-            # Fórmula: Valor Futuro = Valor Presente * (1 + taxa)^tempo
-            taxa_decimal = row['Taxa'] / 100
-            preco_calculado = row['PM'] * ((1 + taxa_decimal) ** anos_passados)
-            return preco_calculado
-        
-        # Se nada der certo, assume que o preço não mudou (Preço Médio)
-        return row['PM']
-
-    # Aplica a lógica e calcula os lucros
-    df_posicao['Preco_Atual'] = df_posicao.apply(get_price, axis=1)
-    df_posicao['Saldo_Atual'] = df_posicao['Qtd_Atual'] * df_posicao['Preco_Atual']
-    df_posicao['Lucro_R$'] = df_posicao['Saldo_Atual'] - df_posicao['Total_Investido']
-    df_posicao['Var_%'] = ((df_posicao['Preco_Atual'] / df_posicao['PM']) - 1) * 100
-    
-    # Função para dar o veredito (Emoji)
-    def recomendar(var):
-        if var > 20: return "🚀 Lucro Forte"
-        if var > 5: return "🟢 No Azul"
-        if var >= -0.01: return "⚪ Estável"
-        if var > -15: return "🟡 Queda Leve"
-        return "🔴 Desconto"
-        
-    df_posicao['Status'] = df_posicao['Var_%'].apply(recomendar)
-    return df_posicao
+    # 1. Símbolo do Yahoo de cada linha (Ações, FIIs, Cripto...)
+    simbolos = simbolos_yahoo(df_posicao)
+
+    # 2. Cotações de todos os símbolos (um download só, guardado pela lista de símbolos)
+    cotacoes = cotacoes_online(tuple(sorted(simbolos.dropna().unique())))
+
+    # 3. Tesouro Direto: o índice de nomes (motor/titulos_tesouro.py) entende "IPCA 2045",
+    # "NTN-B 2045"... e é montado uma vez por lista de preços do site
+    indice = indice_tesouro(buscar_dados_tesouro_direto())
+    return avaliar_posicoes(df_posicao, simbolos, cotacoes, indice)
+
+# Função 5: Cotações do Yahoo (a parte cara, a única com cache)
+# A chave é só a tupla ORDENADA de símbolos: montar e comparar custa quase nada
+# (antes a tabela inteira era resumida a cada clique) e qualquer tabela com os
+# mesmos ativos reaproveita o download, mude o que mudar nas outras colunas.
+# As cotações valem por 5 min; depois disso o último resultado aparece na hora
+# e o novo é buscado em segundo plano (por até 1 hora).
+@cache_swr(ttl=300, ttl_maximo=3600, valido=bool)
+def cotacoes_online(simbolos):
+    # O mesmo download em lote do resto do app (motor/mercado.py): disjuntor, erros e colunas num lugar só
+    painel, _ = baixar_precos(list(simbolos), periodo="1d")
+    if painel.empty: return {}
+    return painel.ffill().iloc[-1].dropna().astype(float).to_dict()
+
+# Função 6: Preços -> Saldo, Lucro e Status de cada posição
+# Não altera 'df_posicao' (devolve uma tabela nova) e não vai à internet:
+# com as mesmas entradas, sai sempre o mesmo resultado.
+# Tudo em colunas inteiras (nada de laço linha a linha): com centenas de posições
+# continua levando frações de segundo.
+def avaliar_posicoes(df_posicao, simbolos, cotacoes, indice):
+    # Tesouro: cada nome DIFERENTE é procurado uma vez só
+    eh_tesouro = df_posicao['Tipo'] == "Tesouro Direto"
+    precos_tesouro = {nome: indice.preco(nome) for nome in df_posicao.loc[eh_tesouro, 'Ativo'].unique()}
+
+    # Junto as fontes na ordem de prioridade: Tesouro -> Yahoo -> Contrato da Renda Fixa -> PM
+    preco = df_posicao['Ativo'].map(pd.Series(precos_tesouro, dtype=float)).where(eh_tesouro)
+    preco = preco.fillna(simbolos.map(pd.Series(cotacoes, dtype=float)))
+
+    # Sem cotação: o PM corrigido pelo contrato (prefixado, % do CDI, IPCA + taxa...), em dias
+    # úteis e com os índices do Banco Central (motor/renda_fixa.py), só nas linhas que faltam
+    faltando = preco.isna()
+    if faltando.any():
+        corrigido = renda_fixa.precos_corrigidos(df_posicao[faltando])
+        preco = preco.fillna(pd.Series(corrigido, index=preco.index[faltando]))
+
+    # Calcula os lucros
+    saldo = df_posicao['Qtd_Atual'] * preco
+    var = ((preco / df_posicao['PM']) - 1) * 100
+
+    # O veredito (Emoji), pela faixa de variação
+    status = np.select(
+        [var > 20, var > 5, var >= -0.01, var > -15],
+        ["🚀 Lucro Forte", "🟢 No Azul", "⚪ Estável", "🟡 Queda Leve"],
+        default="🔴 Desconto"
+    )
+    return df_posicao.assign(**{
+        'Preco_Atual': preco, 'Saldo_Atual': saldo, 'Lucro_R$': saldo - df_posicao['Total_Investido'],
+        'Var_%': var, 'Status': status,
+    })
+
+# ==============================================================================
+# VISÃO CONSOLIDADA (TODAS AS CARTEIRAS)
+# ==============================================================================
+# Só leitura: as posições de cada carteira (já somadas) são juntadas uma a uma
+# e os preços são buscados UMA vez para todos os ativos.
+if armazenamento is None:
+    st.title("🧮 Patrimônio da Família")
+    consolidado = carteiras.consolidar()
+    if consolidado.empty:
+        st.info("👋 Nenhuma carteira tem posições ainda.")
+        st.stop()
+
+    with st.spinner("Atualizando preços de mercado..."):
+        avaliado = buscar_precos_online(consolidado)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("💰 Valor Investido", f"R$ {avaliado['Total_Investido'].sum():,.2f}")
+    c2.metric("📈 Saldo Atual", f"R$ {avaliado['Saldo_Atual'].sum():,.2f}", delta=f"{avaliado['Lucro_R$'].sum():,.2f}")
+    c3.metric("👤 Carteiras", avaliado['Carteira'].nunique())
+
+    col_grafico, col_resumo = st.columns([1.5, 1])
+    with col_grafico:
+        st.subheader("🎨 Alocação por Carteira")
+        fig = px.sunburst(avaliado, path=['Carteira', 'Tipo', 'Ativo'], values='Saldo_Atual')
+        fig.update_traces(textinfo="label+percent entry", textfont=dict(color='white'))
+        fig.update_layout(height=400, margin=dict(t=0, l=0, r=0, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+    with col_resumo:
+        st.subheader("👤 Por Carteira")
+        por_carteira = avaliado.groupby('Carteira')[['Total_Investido', 'Saldo_Atual', 'Lucro_R$']].sum().reset_index()
+        st.dataframe(
+            por_carteira.sort_values(by="Saldo_Atual", ascending=False),
+            column_config={
+                "Total_Investido": st.column_config.NumberColumn("Investido", format="R$ %.2f"),
+                "Saldo_Atual": st.column_config.NumberColumn("Saldo", format="R$ %.2f"),
+                "Lucro_R$": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+            },
+            hide_index=True, use_container_width=True
+        )
+
+    # O mesmo ativo em carteiras diferentes vira uma linha só (os saldos já avaliados são somados)
+    st.subheader("📋 Ativos Somados")
+    saldos = avaliado.groupby(['Tipo', 'Ativo'], as_index=False)[['Saldo_Atual']].sum()
+    somados = carteiras.agrupar_por_ativo(consolidado).merge(saldos, on=['Tipo', 'Ativo'])
+    somados['Preco_Atual'] = somados['Saldo_Atual'] / somados['Qtd_Atual']
+    somados['Lucro_R$'] = somados['Saldo_Atual'] - somados['Total_Investido']
+    st.dataframe(
+        somados.sort_values(by="Saldo_Atual", ascending=False),
+        column_order=["Tipo", "Ativo", "Qtd_Atual", "PM", "Preco_Atual", "Saldo_Atual", "Lucro_R$"],
+        column_config={
+            "Qtd_Atual": st.column_config.NumberColumn("Qtd", format="%.4f"),
+            "PM": st.column_config.NumberColumn("PM", format="R$ %.2f"),
+            "Preco_Atual": st.column_config.NumberColumn("Valor Hoje", format="R$ %.2f"),
+            "Saldo_Atual": st.column_config.NumberColumn("Saldo", format="R$ %.2f"),
+            "Lucro_R$": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+        },
+        hide_index=True, use_container_width=True
+    )
+    st.stop()
 
 # ==============================================================================
 # 3. INTERFACE LATERAL (BARRA DE CONTROLE)
@@ -252,7 +288,15 @@ with st.sidebar.form("form_operacao"):
         qtd_op = c1.number_input("Qtd", min_value=0.01, step=0.1, format="%.2f", value=1.0)
         preco_op = c2.number_input("Aporte (PU)", min_value=0.01, format="%.2f", value=1000.00)
         
-        if exibir_taxa:
+        if tipo_op == "Renda Fixa":
+            # O índice vai no nome do ativo (ex: "CDB BANCO X CDI"), que é como motor/renda_fixa.py lê o contrato
+            # (dentro do formulário o rótulo não muda sozinho, então ele explica os três casos)
+            indexador = st.selectbox("Indexador", ["Prefixado", "% do CDI", "% da Selic", "IPCA +"])
+            taxa_op = st.number_input("Taxa (Pré: % a.a. | CDI/Selic: % do índice | IPCA+: % a.a. acima)",
+                                      value=10.0, step=0.1, format="%.2f")
+            sufixo = {"% do CDI": "CDI", "% da Selic": "SELIC", "IPCA +": "IPCA"}.get(indexador)
+            if ativo_op and sufixo and sufixo not in ativo_op.split(): ativo_op = f"{ativo_op} {sufixo}"
+        elif exibir_taxa:
             taxa_op = st.number_input("Rentabilidade Contratada (% a.a.)", value=10.0, step=0.1, format="%.2f")
         else: taxa_op = 0.0
     
@@ -277,6 +321,7 @@ if tipo_op == "Renda Fixa":
     * **CDI:** Taxa base (segue a Selic).
     * **Pré:** Taxa fixa (ex: 12%).
     * **Pós:** Segue o CDI ou IPCA.
+    * **No nome:** "CDB X 110% CDI", "CDB Y IPCA+ 6" ou "CDB Z CDI + 2" já dizem o contrato.
     
     ⚠️ *Consulte seu banco para investir.*
     """)
@@ -284,6 +329,7 @@ if tipo_op == "Renda Fixa":
 elif tipo_op == "Tesouro Direto":
     with st.sidebar.expander("🔍 Ver Nomes Oficiais (Tesouro)"):
         st.caption("Se a lista não carregar, use os nomes do site do Tesouro.")
+        st.caption("Formas curtas também funcionam: IPCA 2045, NTN-B 2045, Selic 2029, Prefixado 2031.")
         try:
             mapa_oficial = buscar_dados_tesouro_direto()
             if mapa_oficial:
@@ -314,13 +360,15 @@ elif tipo_op == "BDR":
 # ==============================================================================
 st.title("💰 Gestão de Patrimônio")
 
-df_historico = carregar_dados()
+total_lancamentos = armazenamento.contar()
 
-if not df_historico.empty:
-    df_base = calcular_posicao_atual(df_historico)
+if total_lancamentos > 0:
+    # Preço Médio (padrão da Receita) ou PEPS: muda o custo do que sobrou e o lucro das vendas
+    rotulo_custo = st.radio("Método de custo", list(METODOS.values()), horizontal=True)
+    metodo_custo = next(metodo for metodo, rotulo in METODOS.items() if rotulo == rotulo_custo)
     
     with st.spinner("Atualizando preços de mercado..."):
-        df_final = buscar_precos_online(df_base)
+        df_final = carteiras.avaliacao(id_carteira, buscar_precos_online, metodo_custo)
     
     if not df_final.empty:
         # Cálculos de KPI (Key Performance Indicators)
@@ -328,10 +376,20 @@ if not df_historico.empty:
         saldo_atual_total = df_final['Saldo_Atual'].sum()
         lucro_total = df_final['Lucro_R$'].sum()
         
-        c1, c2, c3 = st.columns(3)
+        c1, c2, c3, c4 = st.columns(4)
         c1.metric("💰 Valor Investido", f"R$ {patrimonio_bruto:,.2f}")
         c2.metric("📈 Saldo Atual", f"R$ {saldo_atual_total:,.2f}", delta=f"{lucro_total:,.2f}")
-        c3.metric("📦 Ativos", len(df_final))
+        c3.metric("✅ Lucro Realizado", f"R$ {df_final['Lucro_Realizado'].sum():,.2f}")
+        c4.metric("📦 Ativos", len(df_final))
+
+        # Renda Fixa lançada no formulário antigo (Taxa em % a.a.) com "CDI" no nome: fica como prefixada
+        ambiguos = renda_fixa.contratos_ambiguos(df_final)
+        if ambiguos:
+            st.warning(
+                f"⚠️ {', '.join(ambiguos[:10])}{'...' if len(ambiguos) > 10 else ''}: o nome cita CDI/Selic, mas a Taxa "
+                f"(abaixo de {renda_fixa.PERCENTUAL_MINIMO:.0f}) parece ser % ao ano. Por isso continuam rendendo como "
+                "prefixados. Se forem pós-fixados, escreva o percentual no nome (ex: \"CDB X 110% CDI\")."
+            )
 
         st.markdown("---")
 
@@ -374,11 +432,58 @@ if not df_historico.empty:
                 height=400
             )
 
+        # Metas de alocação (motor/rebalanceamento.py): a conta é refeita a cada número digitado
+        with st.expander("🎯 Metas e Rebalanceamento"):
+            metas = rebalanceamento.ler_metas(id_carteira)
+            if metas.empty:
+                # Primeira vez: sugiro a alocação de hoje por classe, para a pessoa só ajustar
+                # (arredondo para baixo: arredondar normal pode somar 100,1% e a meta não salva)
+                metas = np.floor(df_final.groupby("Tipo")["Saldo_Atual"].sum() / saldo_atual_total * 1000) / 10
+                metas = metas.reset_index()
+                metas = pd.DataFrame({"Nivel": "Tipo", "Nome": metas["Tipo"], "Meta": metas["Saldo_Atual"]})
+            st.caption("Meta por classe (Tipo) ou por ativo, em % da carteira. A meta de um ativo sai da meta da classe dele.")
+            metas_editadas = st.data_editor(
+                metas, num_rows="dynamic", hide_index=True, use_container_width=True, key=f"metas_{id_carteira}",
+                column_config={
+                    "Nivel": st.column_config.SelectboxColumn("Nível", options=list(rebalanceamento.NIVEIS), required=True),
+                    "Nome": st.column_config.TextColumn("Classe ou Ativo", required=True),
+                    "Meta": st.column_config.NumberColumn("Meta (%)", min_value=0.0, max_value=100.0, format="%.1f %%"),
+                }
+            )
+            if st.button("💾 Salvar metas"):
+                try:
+                    rebalanceamento.guardar_metas(id_carteira, metas_editadas)
+                    st.success("✅ Metas salvas!")
+                except ValueError as e: st.error(str(e))
+
+            m1, m2 = st.columns(2)
+            aporte = m1.number_input("Aporte (R$)", min_value=0.0, step=100.0)
+            tolerancia = m2.slider("Tolerância (pontos %)", 0.0, 20.0, rebalanceamento.TOLERANCIA, 0.5)
+            try:
+                ordens, troco = rebalanceamento.calcular_ordens(df_final, metas_editadas, aporte, tolerancia)
+            except ValueError as e: st.error(str(e))
+            else:
+                if ordens.empty: st.info("👌 Tudo dentro das bandas: nenhuma ordem necessária.")
+                else:
+                    pesos = ["Peso_Atual", "Peso_Meta", "Peso_Depois"]
+                    st.dataframe(
+                        ordens.assign(**{c: ordens[c] * 100 for c in pesos}), hide_index=True, use_container_width=True,
+                        column_config={
+                            "Quantidade": st.column_config.NumberColumn("Qtd", format="%g"),
+                            "Preco_Atual": st.column_config.NumberColumn("Preço", format="R$ %.2f"),
+                            "Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f"),
+                            "Peso_Atual": st.column_config.NumberColumn("Peso Hoje", format="%.1f %%"),
+                            "Peso_Meta": st.column_config.NumberColumn("Meta", format="%.1f %%"),
+                            "Peso_Depois": st.column_config.NumberColumn("Peso Depois", format="%.1f %%"),
+                        }
+                    )
+                    st.caption(f"Sobram R$ {troco:,.2f} sem alocar (não dá para comprar frações de ação).")
+
         st.markdown("---")
         # A Super Tabela com todos os detalhes (Lucro, PM, Taxas)
         st.subheader("🚀 Monitor de Rentabilidade")
         
-        colunas_ordem = ["Status", "Tipo", "Ativo", "Taxa", "Qtd_Atual", "PM", "Preco_Atual", "Var_%", "Lucro_R$"]
+        colunas_ordem = ["Status", "Tipo", "Ativo", "Taxa", "Qtd_Atual", "PM", "Preco_Atual", "Var_%", "Lucro_R$", "Lucro_Realizado"]
         
         st.dataframe(
             df_final.sort_values(by="Var_%", ascending=False),
@@ -390,6 +495,7 @@ if not df_historico.empty:
                 "Preco_Atual": st.column_config.NumberColumn("Valor Hoje", format="R$ %.2f"),
                 "Var_%": st.column_config.NumberColumn("Var %", format="%.2f %%"),
                 "Lucro_R$": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+                "Lucro_Realizado": st.column_config.NumberColumn("Lucro Realizado", format="R$ %.2f"),
                 "Qtd_Atual": st.column_config.NumberColumn("Qtd", format="%.4f"),
             },
             hide_index=True,
@@ -398,9 +504,161 @@ if not df_historico.empty:
 
     else: st.warning("Saldo zerado.")
 
+    # Todos os ativos, inclusive os que já vendi inteiros (é onde mora o lucro realizado)
+    with st.expander("🧾 Custos e Lucro Realizado"):
+        custos = carteiras.custos(id_carteira, metodo_custo)
+        st.dataframe(
+            custos,
+            column_config={
+                "Total_Investido": st.column_config.NumberColumn("Custo", format="R$ %.2f"),
+                "PM": st.column_config.NumberColumn("PM", format="R$ %.2f"),
+                "Taxa": st.column_config.NumberColumn("Taxa", format="%.2f %%"),
+                "Lucro_Realizado": st.column_config.NumberColumn("Lucro Realizado", format="R$ %.2f"),
+                "Qtd_Atual": st.column_config.NumberColumn("Qtd", format="%.4f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.download_button(
+            "⬇️ Baixar custos.csv", custos.to_csv(index=False).encode("utf-8"), file_name="custos.csv", mime="text/csv"
+        )
+
+    # Curva diária do patrimônio (motor/patrimonio.py). Fica guardada em disco: depois
+    # da primeira vez, só os dias novos são calculados.
+    if st.toggle("📈 Mostrar evolução do patrimônio"):
+        with st.spinner("Montando a curva do patrimônio..."):
+            curva = curva_patrimonio(armazenamento, carteira=id_carteira)
+        if curva.empty: st.info("Ainda não há histórico para mostrar.")
+        else:
+            fig_curva = px.line(
+                curva, y=["Patrimonio", "Aportes"],
+                labels={"value": "R$", "Data": "", "variable": ""},
+                color_discrete_map={"Patrimonio": "#00D4FF", "Aportes": "#95a5a6"}
+            )
+            fig_curva.update_layout(height=400, margin=dict(t=10, l=0, r=0, b=0), hovermode="x unified")
+            st.plotly_chart(fig_curva, use_container_width=True)
+
+    # Painel de risco (motor/risco.py): retornos diários do último ano de todos os ativos.
+    # Só é refeito quando as posições ou os preços mudam.
+    if st.toggle("⚠️ Mostrar painel de risco"):
+        with st.spinner("Calculando o risco da carteira..."):
+            risco = risco_da_carteira(df_final)
+        if risco is None: st.info("Ainda não há histórico de preços suficiente para medir o risco.")
+        else:
+            confianca = f"{risco['confianca']:.0%}"
+            r1, r2, r3, r4 = st.columns(4)
+            r1.metric("📉 Volatilidade (ano)", f"{risco['volatilidade_anual']:.1%}")
+            r2.metric(f"VaR {confianca} (1 dia)", f"R$ {risco['var_historico'] * risco['total']:,.2f}",
+                      f"{risco['var_historico']:.2%} da carteira", delta_color="off")
+            r3.metric(f"CVaR {confianca} (1 dia)", f"R$ {risco['cvar_historico'] * risco['total']:,.2f}",
+                      f"{risco['cvar_historico']:.2%} da carteira", delta_color="off")
+            r4.metric("🕳️ Maior Queda (drawdown)", f"{risco['drawdown_maximo']:.1%}")
+            st.caption(
+                f"Com a carteira de hoje nos últimos {risco['dias']} pregões. Paramétrico (curva normal): "
+                f"VaR {risco['var_parametrico']:.2%} | CVaR {risco['cvar_parametrico']:.2%}. "
+                "Renda Fixa, Tesouro e ativos sem cotação contam como sem oscilação."
+            )
+            contribuicoes = risco["contribuicoes"]
+            fig_risco = px.bar(
+                contribuicoes.head(30), x="Ativo", y=["Peso", "Contribuicao"], barmode="group",
+                labels={"value": "% da carteira", "variable": ""},
+                color_discrete_map={"Peso": "#95a5a6", "Contribuicao": "#e74c3c"}
+            )
+            fig_risco.update_layout(height=350, margin=dict(t=10, l=0, r=0, b=0), yaxis_tickformat=".0%")
+            st.plotly_chart(fig_risco, use_container_width=True)
+            with st.expander("Ver correlação entre os ativos"):
+                principais = contribuicoes["Ativo"].head(30).tolist() # Os que mais pesam no risco
+                st.plotly_chart(px.imshow(
+                    risco["correlacao"].loc[principais, principais], zmin=-1, zmax=1, color_continuous_scale="RdBu_r"
+                ), use_container_width=True)
+
+    # Proventos (motor/proventos.py): os dividendos de todos os ativos num download só,
+    # cruzados com a quantidade que eu tinha em cada data ex
+    if st.toggle("💸 Mostrar proventos recebidos"):
+        with st.spinner("Somando dividendos e rendimentos..."):
+            renda = proventos_da_carteira(armazenamento, carteira=id_carteira)
+        if renda is None: st.info("Nenhum provento recebido pelas Ações, FIIs, ETFs e BDRs da carteira ainda.")
+        else:
+            p1, p2, p3, p4 = st.columns(4)
+            p1.metric("💸 Recebido (12 meses)", f"R$ {renda['recebido_12m']:,.2f}")
+            p2.metric("📅 Média por Mês (12m)", f"R$ {renda['recebido_12m'] / 12:,.2f}")
+            p3.metric("🏦 Recebido (desde o início)", f"R$ {renda['recebido_total']:,.2f}")
+            p4.metric("🎯 Yield on Cost (12m)", f"{renda['yield_on_cost']:.2%}")
+            fig_renda = px.bar(
+                renda["mensal"].tail(36), labels={"value": "R$", "Mes": "", "Tipo": ""},
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            fig_renda.update_layout(height=350, margin=dict(t=10, l=0, r=0, b=0), hovermode="x unified")
+            st.plotly_chart(fig_renda, use_container_width=True)
+            st.caption("Yield on Cost: o que cada cota pagou nos últimos 12 meses dividido pelo preço médio que você pagou.")
+            st.dataframe(
+                renda["por_ativo"].assign(Yield_on_Cost=renda["por_ativo"]["Yield_on_Cost"] * 100),
+                column_order=["Tipo", "Ativo", "Qtd_Atual", "PM", "Proventos_12m", "Renda_12m", "Yield_on_Cost", "Ultimo_Provento"],
+                column_config={
+                    "Qtd_Atual": st.column_config.NumberColumn("Qtd", format="%.4f"),
+                    "PM": st.column_config.NumberColumn("PM", format="R$ %.2f"),
+                    "Proventos_12m": st.column_config.NumberColumn("Por Cota (12m)", format="R$ %.4f"),
+                    "Renda_12m": st.column_config.NumberColumn("Renda (12m)", format="R$ %.2f"),
+                    "Yield_on_Cost": st.column_config.NumberColumn("Yield on Cost", format="%.2f %%"),
+                    "Ultimo_Provento": st.column_config.DateColumn("Último Provento", format="DD/MM/YYYY"),
+                },
+                hide_index=True, use_container_width=True
+            )
+
     with st.expander("Ver Extrato de Lançamentos"):
-        st.dataframe(df_historico.sort_values("Data", ascending=False), use_container_width=True)
-        if st.button("🗑️ Resetar Tudo"):
-            os.remove(ARQUIVO_DB)
+        # Os filtros rodam no banco: só as linhas pedidas vêm para a tela
+        f1, f2, f3 = st.columns(3)
+        filtro_tipo = f1.selectbox("Filtrar categoria", ["Todas", "Ação", "FII", "Cripto", "Tesouro Direto", "Renda Fixa", "ETF", "BDR"])
+        filtro_ativo = f2.text_input("Filtrar ativo").upper().strip()
+        limite = f3.selectbox("Mostrar", [100, 1000, 10000])
+        extrato = armazenamento.extrato(
+            tipo=None if filtro_tipo == "Todas" else filtro_tipo, ativo=filtro_ativo or None, limite=limite
+        )
+        st.caption(f"Mostrando {len(extrato)} de {total_lancamentos} lançamentos (mais recentes primeiro).")
+        st.dataframe(extrato, use_container_width=True, hide_index=True)
+        b1, b2 = st.columns(2)
+        # As posições são atualizadas a cada lançamento; este botão refaz a soma do zero
+        if b1.button("🔄 Recalcular posições"):
+            armazenamento.reconstruir_posicoes()
+            st.rerun()
+        if b2.button("🗑️ Resetar Tudo"):
+            armazenamento.apagar()
+            st.rerun()
+else: st.info("👋 Lance sua primeira operação na barra lateral!")
+
+# --- IMPORTAR / EXPORTAR (CSV, EXCEL, PARQUET, B3) ---
+with st.expander("📂 Importar / Exportar"):
+    arquivo_csv = st.file_uploader(
+        "Importar lançamentos (CSV, Excel ou Parquet: a carteira.csv ou o extrato de negociação da B3)",
+        type=["csv", "xlsx", "parquet"]
+    )
+    st.caption("Linhas que já estão na carteira são puladas: importar o mesmo arquivo duas vezes não duplica nada.")
+    tipo_importacao = st.selectbox(
+        "Categoria (se o arquivo não tiver)", ["Detectar pelo código", "Ação", "FII", "Cripto", "Tesouro Direto", "Renda Fixa", "ETF", "BDR"]
+    )
+    if tipo_importacao == "Detectar pelo código":
+        st.caption(
+            "Detectar: PETR4 → Ação, MXRF11 → FII (units como TAEE11 e ETFs como BOVA11 são reconhecidos), "
+            f"AAPL34 → BDR, TESOURO... → Tesouro, BTC-USD → Cripto. Código não reconhecido entra como **{importacao.TIPO_NAO_RECONHECIDO}**."
+        )
+    # O resumo da última importação sobrevive ao recarregamento da página
+    resumo = st.session_state.pop("resumo_importacao", None)
+    if resumo:
+        st.success(f"✅ {resumo['importados']} lançamentos importados!")
+        if resumo["repetidos"]: st.info(f"{resumo['repetidos']} já estavam na carteira e foram pulados.")
+        if resumo["descartados"]: st.warning(f"{resumo['descartados']} linhas sem dados suficientes (ou que não são compra/venda) ficaram de fora.")
+        if resumo.get("sem_categoria"):
+            st.warning(f"{resumo['sem_categoria']} lançamentos com código não reconhecido entraram como "
+                       f"{importacao.TIPO_NAO_RECONHECIDO}. Confira no extrato e corrija se for preciso.")
+    if arquivo_csv is not None and st.button("📥 Importar"):
+        try:
+            with st.spinner("Importando..."):
+                st.session_state["resumo_importacao"] = armazenamento.importar(
+                    arquivo_csv, nome=arquivo_csv.name,
+                    tipo_padrao=None if tipo_importacao == "Detectar pelo código" else tipo_importacao
+                )
             st.rerun()
-else: st.info("👋 Lance sua primeira operação na barra lateral!")
\ No newline at end of file
+        except Exception as e: st.error(f"Não consegui importar o arquivo: {e}")
+    # A exportação lê a carteira inteira, então só é montada quando pedida
+    if total_lancamentos > 0 and st.button("📤 Preparar exportação"):
+        st.download_button("⬇️ Baixar carteira.csv", armazenamento.exportar_csv(), file_name="carteira.csv", mime="text/csv")
\ No newline at end of file
@@ -15,10 +15,13 @@ O QUE ESTE CÓDIGO FAZ:
 """
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from motor.historico import obter_historicos
+from motor.mercado import descrever_erros
+from motor.paralelo import buscar_em_paralelo
+from motor import yahoo
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO VISUAL & CSS (O ESTILO DA ARENA)
@@ -93,7 +96,7 @@ def tratar_nome(t):
 @st.cache_data(ttl=1800)
 def buscar_destaques(lista_ativos):
     try:
-        dados = yf.download(lista_ativos, period="2d", progress=False)['Close']
+        dados = yahoo.download(lista_ativos, period="2d", progress=False)['Close']
         if len(dados) >= 2:
             # Pega o último dia e calcula a variação percentual
             variacao = dados.pct_change().iloc[-1] * 100
@@ -110,16 +113,16 @@ def obter_dados_grafico_corr(ticker1, ticker2, periodo_selecionado):
     t1_code = tratar_nome(ticker1)
     t2_code = tratar_nome(ticker2)
     try:
-        # Baixa os dados históricos
-        ativo_a = yf.Ticker(t1_code).history(period=periodo_selecionado, auto_adjust=False)['Close']
-        ativo_b = yf.Ticker(t2_code).history(period=periodo_selecionado, auto_adjust=False)['Close']
+        # Busca os dados históricos (sem ajuste de dividendos, como antes).
+        # Eles ficam salvos em disco: numa comparação de 5 anos, só as barras
+        # que faltam desde a última visita são baixadas.
+        # O histórico em disco já vem sem fuso horário.
+        historicos = obter_historicos([t1_code, t2_code], periodo_selecionado, ajustado=False)
+        ativo_a = historicos[t1_code]['Close']
+        ativo_b = historicos[t2_code]['Close']
         
         if ativo_a.empty or ativo_b.empty: return None, None, 0, t1_code, t2_code
         
-        # Limpa o fuso horário para não dar erro
-        ativo_a.index = ativo_a.index.tz_localize(None)
-        ativo_b.index = ativo_b.index.tz_localize(None)
-        
         # Junta os dois em uma tabela só
         df = pd.concat([ativo_a, ativo_b], axis=1)
         df.columns = [t1_code, t2_code]
@@ -147,7 +150,7 @@ def obter_dados_grafico_corr(ticker1, ticker2, periodo_selecionado):
 # Função 3: Buscar Fundamentos (P/L, PVP, DY)
 @st.cache_data(ttl=3600)
 def obter_fundamentos(ticker):
-    try: return yf.Ticker(ticker).info
+    try: return yahoo.info(ticker)
     except: return {}
 
 # Formatação bonita dos números (Bilhões, Porcentagem, Moeda)
@@ -190,6 +193,15 @@ with st.sidebar:
 # --- SCANNER DE DESTAQUES (TOPO DA PÁGINA) ---
 st.title("🔥 Destaques do Mercado Agora")
 
+# Os dois scanners (Ações e FIIs) são buscados ao mesmo tempo
+destaques, falhas_destaques = buscar_em_paralelo({
+    "acoes": (buscar_destaques, UNIV_ACOES),
+    "fiis": (buscar_destaques, UNIV_FIIS),
+})
+# Scanner que não chegou (tempo esgotado ou erro): mostra o motivo além do "Carregando..."
+nomes_scanners = {"acoes": "Ações", "fiis": "FIIs"}
+if falhas_destaques: st.caption(f"⚠️ Destaques indisponíveis: {descrever_erros({nomes_scanners[n]: motivo for n, motivo in falhas_destaques.items()})}")
+
 # Expander aberto por padrão para mostrar o pulso do mercado
 with st.expander("Ver Top 5 do Dia (Ao Vivo)", expanded=True):
     col_acoes, col_div, col_fiis = st.columns([1, 0.1, 1])
@@ -197,7 +209,7 @@ with st.expander("Ver Top 5 do Dia (Ao Vivo)", expanded=True):
     # Lado Esquerdo: Ações
     with col_acoes:
         st.subheader("📈 Ações em Alta")
-        top_acoes = buscar_destaques(UNIV_ACOES)
+        top_acoes = destaques.get("acoes")
         if top_acoes is not None:
             cols = st.columns(5)
             for i, (ticker, val) in enumerate(top_acoes.items()):
@@ -219,7 +231,7 @@ with st.expander("Ver Top 5 do Dia (Ao Vivo)", expanded=True):
     # Lado Direito: FIIs
     with col_fiis:
         st.subheader("🏢 FIIs em Alta")
-        top_fiis = buscar_destaques(UNIV_FIIS)
+        top_fiis = destaques.get("fiis")
         if top_fiis is not None:
             cols = st.columns(5)
             for i, (ticker, val) in enumerate(top_fiis.items()):
@@ -240,7 +252,18 @@ st.markdown("---")
 if input1 and input2:
     st.header(f"⚔️ ARENA FINAL: {input1} vs {input2}")
     
-    df_final, volatildade, corr, nome1, nome2 = obter_dados_grafico_corr(input1, input2, mapa_tempo[tempo_user])
+    # O gráfico e os fundamentos dos dois lutadores não dependem um do outro,
+    # então disparo as três buscas juntas
+    with st.spinner("Preparando a arena..."):
+        lutas, falhas_lutas = buscar_em_paralelo({
+            "grafico": (obter_dados_grafico_corr, input1, input2, mapa_tempo[tempo_user]),
+            "info1": (obter_fundamentos, tratar_nome(input1)),
+            "info2": (obter_fundamentos, tratar_nome(input2)),
+        })
+    # Gráfico ou fundamentos que não chegaram: avisa o motivo (os cards ficam com "--")
+    nomes_lutas = {"grafico": "Gráfico", "info1": f"Fundamentos de {input1}", "info2": f"Fundamentos de {input2}"}
+    if falhas_lutas: st.warning(f"⚠️ Parte da arena não carregou: {descrever_erros({nomes_lutas[n]: motivo for n, motivo in falhas_lutas.items()})}")
+    df_final, volatildade, corr, nome1, nome2 = lutas.get("grafico", (None, None, 0, tratar_nome(input1), tratar_nome(input2)))
 
     if df_final is not None and not df_final.empty:
         # Pega a rentabilidade acumulada final
@@ -285,9 +308,8 @@ if input1 and input2:
         st.markdown("---")
         st.subheader("📊 Tale of the Tape")
         
-        with st.spinner("Carregando indicadores..."):
-            info1 = obter_fundamentos(nome1)
-            info2 = obter_fundamentos(nome2)
+        info1 = lutas.get("info1", {})
+        info2 = lutas.get("info2", {})
         
         col_f1, col_f2 = st.columns(2)
         metricas = [
@@ -15,13 +15,15 @@ DIFERENCIAIS DESTE CÓDIGO:
 """
 
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
-from deep_translator import GoogleTranslator
 from datetime import datetime
 import pandas as pd # Importante para manipular os dados do gráfico
+from motor.mercado import baixar_precos, descrever_erros
+from motor.historico import obter_historico
+from motor.traducao import traduzir
+from motor import cliente_http, yahoo
+from motor.disjuntor import lembrar, ultimo_bom
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO VISUAL
@@ -63,7 +65,7 @@ st.markdown("""
 def buscar_medo_ganancia():
     url = "https://api.alternative.me/fng/?limit=1"
     try:
-        response = requests.get(url).json()
+        response = cliente_http.get("alternative_me", url).json()
         data = response['data'][0]
         valor = int(data['value'])
         texto_ingles = data['value_classification']
@@ -77,16 +79,18 @@ def buscar_medo_ganancia():
             "Extreme Greed": "Ganância Extrema 🚀"
         }
         texto_pt = traducoes.get(texto_ingles, texto_ingles)
+        lembrar("medo_ganancia", (valor, texto_pt))
         return valor, texto_pt
     except:
-        return 50, "Neutro" # Valor padrão se a API falhar
+        # Último valor conhecido ou, se nunca deu certo, o valor padrão
+        return ultimo_bom("medo_ganancia", (50, "Neutro"))
 
 # Função 2: Cotação do Dólar
 # Como cripto é dolarizada, precisamos saber o dólar para converter para Real.
 @st.cache_data(ttl=600)
 def obter_taxa_usd_brl():
     try:
-        return yf.Ticker("BRL=X").history(period="1d")['Close'].iloc[-1]
+        return yahoo.historico_ticker("BRL=X", "1d")['Close'].iloc[-1]
     except:
         return 5.80 # Fallback seguro
 
@@ -99,7 +103,7 @@ def buscar_top_3_coingecko(moeda_alvo):
     dados = []
     mapa_nomes = {"bitcoin": "BTC", "ethereum": "ETH", "solana": "SOL"}
     try:
-        response = requests.get(url).json()
+        response = cliente_http.get("coingecko", url).json()
         for id_coin, info in response.items():
             preco = info[currency]
             var = info[f"{currency}_24h_change"]
@@ -107,31 +111,34 @@ def buscar_top_3_coingecko(moeda_alvo):
             dados.append({'ticker': ticker, 'preco': preco, 'var': var})
         # Ordena pelo preço (BTC primeiro)
         dados.sort(key=lambda x: x['preco'], reverse=True)
-    except: pass
+        lembrar(("coingecko", currency), dados)
+    except:
+        # CoinGecko fora (ou disjuntor aberto): últimas cotações conhecidas
+        dados = ultimo_bom(("coingecko", currency), [])
     return dados
 
 # Função 4: Gráfico Comparativo (Normalizado)
 # Mostra a performance de BTC, ETH e SOL nos últimos 30 dias.
 # Normalizar significa fazer todos começarem em 0%, para ver quem cresceu mais proporcionalmente.
+# As três moedas vêm num único download em lote.
 @st.cache_data(ttl=600)
 def obter_dados_grafico_comparativo():
     tickers = {'BTC': 'BTC-USD', 'ETH': 'ETH-USD', 'SOL': 'SOL-USD'}
+    painel, erros = baixar_precos(list(tickers.values()), periodo="1mo")
     df_final = pd.DataFrame()
     
-    try:
-        for nome, ticker in tickers.items():
-            hist = yf.Ticker(ticker).history(period="1mo")['Close']
-            if not hist.empty:
-                # A Fórmula Mágica da Normalização:
-                # (Preço Atual / Preço Inicial - 1) * 100
-                df_final[nome] = (hist / hist.iloc[0] - 1) * 100
-    except: pass
-    return df_final
+    for nome, ticker in tickers.items():
+        hist = painel[ticker].dropna() if ticker in painel.columns else pd.Series(dtype=float)
+        if not hist.empty:
+            # A Fórmula Mágica da Normalização:
+            # (Preço Atual / Preço Inicial - 1) * 100
+            df_final[nome] = (hist / hist.iloc[0] - 1) * 100
+    return df_final, erros
 
 # Tradutor (Google Translator)
 @st.cache_data
 def traduzir_texto(texto, destino='pt'):
-    try: return GoogleTranslator(source='auto', target=destino).translate(texto)
+    try: return traduzir(texto, destino)
     except: return texto 
 
 # Resumos Prontos (Didática)
@@ -188,13 +195,12 @@ if input_usuario:
     st.title(f"₿ Análise: {input_usuario}")
     ticker_base = f"{input_usuario}-USD"
     try:
-        cripto = yf.Ticker(ticker_base)
-        hist = cripto.history(period="1mo")
+        hist = obter_historico(ticker_base, "1mo")
         
         if hist.empty:
              st.error(f"Cripto '{input_usuario}' não encontrada. Tente o código padrão (Ex: BTC).")
         else:
-            info = cripto.info
+            info = yahoo.info(ticker_base)
             nome_completo = info.get('name', input_usuario)
             
             # Exibe o resumo educativo
@@ -291,7 +297,7 @@ else:
             st.subheader("📊 Comparativo de Performance (30 Dias)")
             st.caption("Veja quem está crescendo mais percentualmente, independente do preço.")
             
-            df_comp = obter_dados_grafico_comparativo()
+            df_comp, erros_comp = obter_dados_grafico_comparativo()
             if not df_comp.empty:
                 fig_comp = go.Figure()
                 colors = {'BTC': '#F7931A', 'ETH': '#627EEA', 'SOL': '#14F195'}
@@ -312,6 +318,7 @@ else:
                     legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
                 )
                 st.plotly_chart(fig_comp, use_container_width=True)
+            if erros_comp: st.caption(f"⚠️ Sem histórico para: {descrever_erros(erros_comp)}")
 
         else:
             st.warning("CoinGecko indisponível no momento.")
\ No newline at end of file
@@ -15,9 +15,11 @@ FUNCIONAMENTO:
 
 import streamlit as st
 import pandas as pd
-import requests
 import plotly.graph_objects as go
 from datetime import datetime
+from motor.cache import cache_swr
+from motor import cliente_http
+from motor.disjuntor import obter_disjuntor, lembrar, ultimo_bom
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO VISUAL
@@ -47,7 +49,10 @@ st.markdown("""
 # ==============================================================================
 
 # Função Principal: Buscar Taxas
-@st.cache_data(ttl=3600) # Cache de 1h
+# Cache de 1h. Depois disso, mostro as taxas anteriores na hora e atualizo em
+# segundo plano (por até 1 dia). Se a atualização cair no Plano B (offline),
+# continuo mostrando as últimas taxas reais.
+@cache_swr(ttl=3600, ttl_maximo=24*3600, valido=lambda df: not df['Offline'].iloc[0])
 def buscar_dados_tesouro():
     # URL Secreta que alimenta o site oficial
     url = "https://www.tesourodireto.com.br/json/br/com/b3/tesourodireto/service/balcao/precos-taxas.json"
@@ -58,8 +63,8 @@ def buscar_dados_tesouro():
     }
     
     try:
-        # Tenta conectar com timeout curto (5 segundos)
-        response = requests.get(url, headers=headers, verify=True, timeout=5).json()
+        # Tenta conectar com timeout curto (5 segundos, definido no cliente_http)
+        response = cliente_http.get("tesouro", url, headers=headers).json()
         titulos = response['response']['TrsrBdTradgList']
         
         lista_final = []
@@ -85,9 +90,16 @@ def buscar_dados_tesouro():
                 "Offline": False # Marca que veio da API oficial
             })
             
-        return pd.DataFrame(lista_final)
+        df = pd.DataFrame(lista_final)
+        lembrar("tesouro_taxas", df) # Guardo como "último dado bom"
+        return df
 
     except Exception as e:
+        # Se o site caiu mas eu já vi as taxas reais antes, mostro as últimas conhecidas.
+        # (Com o disjuntor aberto, chegamos aqui na hora, sem esperar timeout.)
+        ultimas = ultimo_bom("tesouro_taxas")
+        if ultimas is not None: return ultimas
+
         # --- PLANO B: DADOS DE CONTINGÊNCIA (SE O SITE CAIR) ---
         # Isso garante que a tela nunca fique vazia/vermelha com erro.
         # São dados aproximados de mercado para referência.
@@ -137,8 +149,12 @@ st.markdown("Investimentos garantidos pelo Tesouro Nacional.")
 df_tesouro = buscar_dados_tesouro()
 
 # Aviso inteligente: Só mostra alerta se estiver no Plano B
+# E se o disjuntor estiver aberto, digo quando o sistema vai tentar de novo.
+disjuntor_tesouro = obter_disjuntor("tesouro").situacao()
 if df_tesouro['Offline'].iloc[0]:
     st.warning("⚠️ O site do Tesouro Nacional está instável. Exibindo taxas de referência estimadas.")
+elif disjuntor_tesouro['estado'] != "fechado":
+    st.info(f"🟡 Tesouro Nacional fora do ar. Exibindo as últimas taxas conhecidas (nova tentativa em {disjuntor_tesouro['segundos_restantes']}s).")
 else:
     st.success("🟢 Conectado ao Tesouro Nacional em tempo real.")
 
@@ -0,0 +1,122 @@
+"""
+================================================================================
+🧪 FINANK - TESTES DO CUSTO DE AQUISIÇÃO (motor/custo.py)
+================================================================================
+Os casos que já deixaram o Preço Médio torto uma vez:
+- venda parcial (o PM não pode mudar),
+- vender tudo e comprar de novo (o custo antigo não pode "vazar" para a nova posição),
+- lançamento com data no passado (o SQLite refaz o ativo na ordem certa),
+- PEPS x Preço Médio (mesmo livro, lucros diferentes, mesmo custo total).
+
+Rodar: python -m pytest -q
+"""
+
+import pandas as pd
+import pytest
+
+from motor import armazenamento, config, custo
+
+COLUNAS = ["Data", "Ativo", "Tipo", "Operacao", "Quantidade", "Preco", "Taxa"]
+
+
+# Um livro pequeno: cada linha é (data, operação, quantidade, preço) de um mesmo ativo
+def livro(*linhas, ativo="PETR4", tipo="Ação"):
+    return pd.DataFrame(
+        [(data, ativo, tipo, operacao, quantidade, preco, 0.0) for data, operacao, quantidade, preco in linhas],
+        columns=COLUNAS,
+    )
+
+
+# A linha de um ativo na tabela de custos, como dicionário
+def linha(tabela, ativo="PETR4"):
+    return tabela.set_index("Ativo").loc[ativo].to_dict()
+
+
+# Um banco SQLite novo numa pasta temporária (nada de mexer em finank_dados)
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PASTA_DADOS", str(tmp_path))
+    return armazenamento.ArmazenamentoSQLite("teste.db")
+
+
+# Venda parcial: o PM continua o mesmo e sai do custo só "quantidade vendida x PM"
+def test_venda_parcial_nao_muda_o_preco_medio():
+    df = livro(("2024-01-02", "Compra", 10, 10.0), ("2024-01-03", "Compra", 10, 20.0), ("2024-01-04", "Venda", 5, 30.0))
+    resultado = linha(custo.custos_de_lancamentos(df))
+    assert resultado["Qtd_Atual"] == pytest.approx(15)
+    assert resultado["PM"] == pytest.approx(15.0)
+    assert resultado["Total_Investido"] == pytest.approx(225.0)
+    assert resultado["Lucro_Realizado"] == pytest.approx(5 * 30.0 - 5 * 15.0)
+
+
+# Vendi tudo e comprei de novo: a posição nova começa do zero, o lucro antigo fica guardado
+@pytest.mark.parametrize("metodo", list(custo.METODOS))
+def test_vender_tudo_e_comprar_de_novo(metodo):
+    df = livro(("2024-01-02", "Compra", 10, 10.0), ("2024-02-01", "Venda", 10, 12.0), ("2024-03-01", "Compra", 5, 20.0))
+    resultado = linha(custo.custos_de_lancamentos(df, metodo))
+    assert resultado["Qtd_Atual"] == pytest.approx(5)
+    assert resultado["PM"] == pytest.approx(20.0)
+    assert resultado["Total_Investido"] == pytest.approx(100.0)
+    assert resultado["Lucro_Realizado"] == pytest.approx(20.0)
+
+
+# O livro fora de ordem dá o mesmo resultado que o livro em ordem
+def test_livro_fora_de_ordem_e_ordenado_pela_data():
+    em_ordem = livro(("2024-01-10", "Compra", 10, 10.0), ("2024-02-01", "Compra", 10, 16.0), ("2024-03-01", "Venda", 5, 20.0))
+    fora_de_ordem = em_ordem.iloc[[0, 2, 1]]
+    pd.testing.assert_frame_equal(custo.custos_de_lancamentos(fora_de_ordem), custo.custos_de_lancamentos(em_ordem))
+
+
+# Lançamento com data no passado no SQLite: a tabela de posições é refeita para o ativo,
+# e fica igual à conta do zero (e à reconstrução completa)
+def test_lancamento_retroativo_no_sqlite(banco):
+    banco.registrar_varios(livro(("2024-01-10", "Compra", 10, 10.0), ("2024-03-01", "Venda", 5, 20.0)))
+    banco.registrar_varios(livro(("2024-02-01", "Compra", 10, 16.0))) # Antes da venda
+    gravada = linha(banco.custos())
+    assert gravada["Qtd_Atual"] == pytest.approx(15)
+    assert gravada["PM"] == pytest.approx(13.0)
+    assert gravada["Lucro_Realizado"] == pytest.approx(5 * 20.0 - 5 * 13.0)
+
+    do_zero = linha(custo.custos_de_lancamentos(banco.carregar()))
+    banco.reconstruir_posicoes()
+    reconstruida = linha(banco.custos())
+    for coluna in ["Qtd_Atual", "Total_Investido", "PM", "Lucro_Realizado"]:
+        assert gravada[coluna] == pytest.approx(do_zero[coluna])
+        assert gravada[coluna] == pytest.approx(reconstruida[coluna])
+
+
+# PEPS x Preço Médio: o PEPS vende o lote mais barato (o mais antigo) primeiro.
+# Nos dois, custo que saiu + custo que sobrou = tudo que comprei (só muda QUANDO o lucro aparece).
+def test_peps_e_preco_medio():
+    df = livro(("2024-01-02", "Compra", 10, 10.0), ("2024-01-03", "Compra", 10, 20.0), ("2024-01-04", "Venda", 15, 25.0))
+    medio = linha(custo.custos_de_lancamentos(df, "medio"))
+    peps = linha(custo.custos_de_lancamentos(df, "peps"))
+
+    assert medio["PM"] == pytest.approx(15.0)
+    assert medio["Lucro_Realizado"] == pytest.approx(15 * 25.0 - 15 * 15.0)
+    # PEPS: o lote de 10 a R$ 10 inteiro e 5 do lote a R$ 20; sobram 5 a R$ 20
+    assert peps["PM"] == pytest.approx(20.0)
+    assert peps["Lucro_Realizado"] == pytest.approx(15 * 25.0 - (10 * 10.0 + 5 * 20.0))
+    assert medio["Qtd_Atual"] == pytest.approx(peps["Qtd_Atual"])
+    for resultado in (medio, peps):
+        custo_que_saiu = 15 * 25.0 - resultado["Lucro_Realizado"]
+        assert custo_que_saiu + resultado["Total_Investido"] == pytest.approx(10 * 10.0 + 10 * 20.0)
+
+
+# A conta vetorizada do modo CSV (armazenamento.calcular_posicao_atual) bate com o laço do motor/custo.py
+def test_posicao_vetorizada_bate_com_o_preco_medio():
+    df = pd.concat([
+        livro(("2024-01-02", "Compra", 10, 10.0), ("2024-01-03", "Compra", 10, 20.0), ("2024-01-04", "Venda", 5, 30.0)),
+        livro(("2024-01-02", "Compra", 10, 10.0), ("2024-02-01", "Venda", 10, 12.0), ("2024-03-01", "Compra", 5, 20.0), ativo="VALE3"),
+        livro(("2024-03-01", "Venda", 5, 20.0), ("2024-01-10", "Compra", 10, 10.0), ("2024-02-01", "Compra", 10, 16.0), ativo="ITSA4"),
+    ], ignore_index=True)
+    vetorizada = armazenamento.calcular_posicao_atual(df).reset_index(drop=True)
+    laco = custo.custos_de_lancamentos(df)
+    laco = laco[laco["Qtd_Atual"] > 0].reset_index(drop=True)
+    pd.testing.assert_frame_equal(vetorizada, laco, check_dtype=False)
+
+
+# Método errado é erro na hora, não um resultado torto
+def test_metodo_desconhecido():
+    with pytest.raises(ValueError):
+        custo.Posicao("ueps")
@@ -0,0 +1,90 @@
+"""
+================================================================================
+🧪 FINANK - TESTES DA IMPORTAÇÃO EM LOTE (motor/importacao.py)
+================================================================================
+- "1.000": mil ou um? A resposta é do ARQUIVO, não de cada pedaço lido.
+- Repetidos: reimportar não duplica, e duas compras iguais no mesmo dia
+  continuam valendo duas (inclusive quando caem em pedaços diferentes).
+
+Rodar: python -m pytest -q
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from motor import armazenamento, config, importacao
+
+CABECALHO = "Data,Ativo,Tipo,Operacao,Quantidade,Preco\n"
+
+
+# Um arquivo CSV "enviado pela página" (aberto, com nome)
+def arquivo(texto, nome="extrato.csv"):
+    conteudo = io.BytesIO(texto.encode("utf-8"))
+    conteudo.name = nome
+    return conteudo
+
+
+# Todos os pedaços já padronizados, num DataFrame só
+def importar_tudo(origem, tamanho):
+    partes = [importacao.padronizar(bruto)[0] for bruto in importacao.ler_extrato(origem, tamanho=tamanho)]
+    return pd.concat(partes, ignore_index=True)
+
+
+# Os dois armazenamentos, cada um numa pasta temporária
+@pytest.fixture(params=["sqlite", "csv"])
+def carteira(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PASTA_DADOS", str(tmp_path))
+    if request.param == "sqlite": return armazenamento.ArmazenamentoSQLite("teste.db")
+    return armazenamento.ArmazenamentoCSV(str(tmp_path / "carteira.csv"))
+
+
+# Arquivo com vírgula separando colunas e ponto nos decimais: o "10.5" do 1º pedaço
+# vale para o "1.000" do 2º (um, não mil), com qualquer tamanho de pedaço
+@pytest.mark.parametrize("tamanho", [1, 2, 10_000])
+def test_ponto_decimal_decidido_pelo_arquivo_inteiro(tamanho):
+    texto = CABECALHO + "2024-01-02,PETR4,Ação,Compra,10,10.5\n2024-01-03,PETR4,Ação,Compra,1.000,20\n"
+    df = importar_tudo(arquivo(texto), tamanho)
+    assert df["Quantidade"].tolist() == [10.0, 1.0]
+    assert df["Preco"].tolist() == [10.5, 20.0]
+
+
+# O mesmo, com o número que decide no ÚLTIMO pedaço
+def test_formato_decidido_por_um_pedaco_posterior():
+    texto = CABECALHO + "2024-01-02,PETR4,Ação,Compra,1.000,20\n2024-01-03,PETR4,Ação,Compra,2,0.125\n"
+    df = importar_tudo(arquivo(texto), tamanho=1)
+    assert df["Quantidade"].tolist() == [1.0, 2.0]
+
+
+# Separado por ";" (Excel brasileiro): "1.000" é mil em todos os pedaços
+def test_arquivo_brasileiro_le_milhar():
+    texto = "Data;Ativo;Operacao;Quantidade;Preco\n05/01/2024;PETR4;Compra;1.000;32,50\n06/01/2024;VALE3;Compra;2.000;60\n"
+    df = importar_tudo(arquivo(texto), tamanho=1)
+    assert df["Quantidade"].tolist() == [1000.0, 2000.0]
+    assert df["Preco"].tolist() == [32.5, 60.0]
+
+
+# Nada no arquivo diz o formato: erro em vez de adivinhar
+def test_arquivo_ambiguo_para_a_importacao():
+    texto = CABECALHO + "2024-01-02,PETR4,Ação,Compra,1.000,20\n"
+    with pytest.raises(ValueError, match="1.000"):
+        importar_tudo(arquivo(texto), tamanho=10_000)
+
+
+# Duas compras iguais no mesmo dia valem duas; reimportar o arquivo não duplica nada;
+# um arquivo com três iguais (duas já no livro) acrescenta só uma.
+# Pedaços de 1 linha: as iguais caem em pedaços diferentes.
+def test_repetidos_identicos(carteira, monkeypatch):
+    monkeypatch.setattr(importacao, "TAMANHO_PEDACO", 1)
+    linha = "2024-01-02,PETR4,Ação,Compra,100,32.5\n"
+
+    resumo = carteira.importar(arquivo(CABECALHO + linha * 2))
+    assert (resumo["importados"], resumo["repetidos"]) == (2, 0)
+
+    resumo = carteira.importar(arquivo(CABECALHO + linha * 2))
+    assert (resumo["importados"], resumo["repetidos"]) == (0, 2)
+
+    resumo = carteira.importar(arquivo(CABECALHO + linha * 3))
+    assert (resumo["importados"], resumo["repetidos"]) == (1, 2)
+    assert carteira.contar() == 3
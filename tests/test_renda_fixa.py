@@ -0,0 +1,89 @@
+"""
+================================================================================
+🧪 FINANK - TESTES DO RENDIMENTO DA RENDA FIXA (motor/renda_fixa.py)
+================================================================================
+Índices fixos (nada de Banco Central): CDI de 0,04% ao dia e IPCA de 0,5% ao mês.
+Assim cada fator tem uma conta fechada para comparar:
+- prefixado 12% a.a.       -> 1,12^(dias úteis / 252)
+- 110% do CDI              -> (1 + 0,0004 x 1,10)^(dias úteis)
+- IPCA + 6%                -> IPCA do mês pro rata dos dias úteis x 1,06^(dias úteis / 252)
+- compra num sábado        -> rende a partir da segunda-feira
+
+Março de 2024 tem 20 dias úteis (Sexta-feira Santa em 29/3).
+
+Rodar: python -m pytest -q
+"""
+
+import pandas as pd
+import pytest
+
+from motor import indices, renda_fixa
+
+CDI_DIA = 0.04  # % ao dia
+IPCA_MES = 0.5  # % ao mês
+
+
+# Séries fixas no lugar das do Banco Central
+@pytest.fixture(autouse=True)
+def indices_fixos(monkeypatch):
+    def obter_serie(nome, inicio):
+        if nome in indices.MENSAIS:
+            meses = pd.date_range("2020-01-01", "2030-12-01", freq="MS")
+            return pd.Series(IPCA_MES, index=meses)
+        dias = pd.bdate_range("2020-01-01", "2030-12-31")
+        return pd.Series(CDI_DIA, index=dias)
+    monkeypatch.setattr(indices, "obter_serie", obter_serie)
+
+
+# Fator de UMA posição entre a compra e cada data
+def fator(ativo, taxa, inicio, *datas, tipo="Renda Fixa"):
+    contratos = pd.DataFrame({"Ativo": [ativo], "Tipo": [tipo], "Taxa": [taxa]})
+    return renda_fixa.fatores(contratos, [pd.Timestamp(inicio)], pd.DatetimeIndex(datas))[:, 0]
+
+
+# Nome + Taxa -> (índice, % do índice, taxa por cima)
+@pytest.mark.parametrize("nome, taxa, esperado", [
+    ("CDB BANCO X", 12, (None, 100.0, 12.0)),
+    ("CDB BANCO X 110% CDI", 0, ("CDI", 110.0, 0.0)),
+    ("LCI BANCO Y CDI", 95, ("CDI", 95.0, 0.0)),
+    ("CDB Z IPCA+ 6", 0, ("IPCA", 100.0, 6.0)),
+    ("CDB Z IPCA", 6, ("IPCA", 100.0, 6.0)),
+    ("CDB W CDI + 2", 0, ("CDI", 100.0, 2.0)),
+    ("CDB X CDI", 12, (None, 100.0, 12.0)),  # Formulário antigo: % a.a., fica prefixado
+])
+def test_contrato(nome, taxa, esperado):
+    assert renda_fixa.contrato(nome, "Renda Fixa", taxa) == esperado
+
+
+# "CDB X CDI" com Taxa 12 aparece na lista para a pessoa conferir; "CDB X 110% CDI" não
+def test_contratos_ambiguos():
+    posicoes = pd.DataFrame({"Tipo": ["Renda Fixa"] * 3, "Ativo": ["CDB X CDI", "CDB X 110% CDI", "CDB Y"], "Taxa": [12, 0, 12]})
+    assert renda_fixa.contratos_ambiguos(posicoes) == ["CDB X CDI"]
+
+
+# Prefixado 12% a.a.: de segunda a segunda são 5 dias úteis; antes da compra, fator 1
+def test_prefixado():
+    resultado = fator("CDB BANCO X", 12, "2024-03-04", "2024-03-01", "2024-03-11")
+    assert resultado == pytest.approx([1.0, 1.12 ** (5 / 252)])
+
+
+# 110% do CDI: cada dia útil rende 110% da taxa do dia
+def test_percentual_do_cdi():
+    resultado = fator("CDB BANCO X 110% CDI", 0, "2024-03-04", "2024-03-11")
+    assert resultado == pytest.approx([(1 + CDI_DIA / 100 * 1.10) ** 5])
+
+
+# IPCA + 6%: o mês inteiro rende o IPCA do mês; meio mês (10 de 20 dias úteis), a raiz dele
+def test_ipca_mais_taxa():
+    resultado = fator("CDB Z IPCA+ 6", 0, "2024-03-01", "2024-03-15", "2024-04-01")
+    ipca = 1 + IPCA_MES / 100
+    assert resultado == pytest.approx([ipca ** (10 / 20) * 1.06 ** (10 / 252), ipca * 1.06 ** (20 / 252)])
+
+
+# Compra num sábado rende igual a uma compra na segunda-feira seguinte
+@pytest.mark.parametrize("nome", ["CDB BANCO X", "CDB BANCO X 110% CDI", "CDB Z IPCA+ 6"])
+def test_compra_em_dia_sem_pregao(nome):
+    sabado = fator(nome, 12, "2024-03-02", "2024-03-04", "2024-03-11", "2024-04-01")
+    segunda = fator(nome, 12, "2024-03-04", "2024-03-04", "2024-03-11", "2024-04-01")
+    assert sabado == pytest.approx(segunda)
+    assert sabado[0] == pytest.approx(1.0)